@@ -0,0 +1,390 @@
+"""Headless HTTP/JSON API over the inventory database
+
+Serves read-only JSON for the e-commerce frontend and scanners without the
+Tkinter GUI, using the same schema (create_tables()) and connection pool as
+main.py:
+
+    python api_server.py --port 8080
+
+Endpoints (GET or HEAD):
+
+    /garments            ?after=&limit=&search=&category=&size=
+    /garments/<id>
+    /suppliers           ?after=&limit=&search=
+    /orders              ?after=&limit=&status=
+    /sales               ?after=&limit=&start=&end=   (ISO dates, end exclusive)
+    /stock               ?ids=1,2,3
+    /stock/<id>
+    /dashboard
+    /health
+
+Lists are paged by cursor: each response carries "next_after", which is
+passed back as ?after= for the following page (null on the last page).
+Responses carry an ETag and honour If-None-Match with 304, and are gzipped
+for clients that accept it. Identical requests within --cache-ttl seconds
+share one database round trip, except /stock and /health, which are always
+answered fresh (stock levels from main's write-invalidated stock cache, which
+trails writes made by other processes by at most main.STOCK_SYNC_INTERVAL).
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+
+import mysql.connector
+
+import main
+
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 500
+API_CACHE_TTL = 1.0          # Seconds a rendered response is reused for identical requests
+API_GZIP_MIN_BYTES = 1024    # Smaller bodies are sent uncompressed
+API_MAX_HEADER_BYTES = 16384
+API_KEEPALIVE_TIMEOUT = 15   # Seconds an idle keep-alive connection is held open
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+# Request parameters
+def int_param(params, name, default, maximum=None):
+    value = params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if value < 0:
+        raise ValueError(f"{name} must not be negative")
+    return min(value, maximum) if maximum is not None else value
+
+def date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+def paging(params):
+    return int_param(params, "after", 0), int_param(params, "limit", API_DEFAULT_LIMIT, API_MAX_LIMIT) or 1
+
+def page_of(rows, limit):
+    """List payload with the cursor for the next page"""
+    return {
+        "items": [row._asdict() for row in rows],
+        "next_after": rows[-1].id if len(rows) == limit else None
+    }
+
+
+# Endpoints - plain functions run on the worker threads
+def list_garments(params):
+    after_id, limit = paging(params)
+    filters = (params.get("search") or None, params.get("category") or None, params.get("size") or None)
+    return page_of(main.garment_repo.after(after_id, limit, filters), limit)
+
+def get_garment(params, garment_id):
+    garment = main.garment_repo.get(garment_id)
+    if garment is None:
+        raise LookupError(f"No garment with id {garment_id}")
+    return garment._asdict()
+
+def list_suppliers(params):
+    # The supplier list is small and cached by main, so it is paged in memory
+    after_id, limit = paging(params)
+    rows = [row for row in main.supplier_repo.search(params.get("search", "")) if row.id > after_id]
+    return page_of(rows[:limit], limit)
+
+def list_orders(params):
+    after_id, limit = paging(params)
+    status = params.get("status") or None
+    if status and status not in main.ORDER_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(main.ORDER_STATUSES)}")
+    return page_of(main.order_repo.list(status, after_id, limit), limit)
+
+def list_sales(params):
+    after_id, limit = paging(params)
+    return page_of(main.sale_repo.list(date_param(params, "start"), date_param(params, "end"),
+                                       after_id, limit), limit)
+
+def stock_payload(level):
+    return {"garment_id": level.garment_id, "quantity": level.quantity, "reserved": level.reserved,
+            "available": level.available, "version": level.version}
+
+def list_stock(params):
+    try:
+        ids = [int(value) for value in params.get("ids", "").split(",") if value.strip()]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of garment ids")
+    if not ids or len(ids) > API_MAX_LIMIT:
+        raise ValueError(f"ids must name between 1 and {API_MAX_LIMIT} garments")
+    levels = main.stock_cache.get_many(ids)
+    return {"items": [stock_payload(levels[garment_id]) for garment_id in ids if garment_id in levels]}
+
+def get_stock(params, garment_id):
+    level = main.stock_cache.get(garment_id)
+    if level is None:
+        raise LookupError(f"No garment with id {garment_id}")
+    return stock_payload(level)
+
+def dashboard(params):
+    today = date.today()
+    summary = main.garment_repo.summary()
+    return {
+        "total_items": sum(row.item_count for row in summary),
+        "total_value": sum(row.total_value for row in summary),
+        "low_stock": sum(row.low_stock_count for row in summary),
+        "total_orders": main.order_repo.total(),
+        "categories": [row._asdict() for row in summary],
+        "monthly_sales": [
+            {"month": month, "revenue": revenue, "units": units, "profit": profit}
+            for month, revenue, units, profit in main.sale_repo.series(
+                "month", main.month_start(today, 1 - main.DASHBOARD_SALES_MONTHS), today)
+        ]
+    }
+
+def health(params):
+    return {"status": "ok", "pool": main.db_pool.stats()}
+
+ROUTES = {
+    "/garments": list_garments,
+    "/suppliers": list_suppliers,
+    "/orders": list_orders,
+    "/sales": list_sales,
+    "/stock": list_stock,
+    "/dashboard": dashboard,
+    "/health": health
+}
+ITEM_ROUTES = {"/garments": get_garment, "/stock": get_stock}  # /<collection>/<id>
+UNCACHED_ROUTES = {"/stock", "/health"}
+
+def resolve(path):
+    """(handler, extra args) for a request path, or None"""
+    path = path.rstrip("/") or "/"
+    if path in ROUTES:
+        return ROUTES[path], ()
+    prefix, _, item_id = path.rpartition("/")
+    if prefix in ITEM_ROUTES and item_id.isdigit():
+        return ITEM_ROUTES[prefix], (int(item_id),)
+    return None
+
+def cacheable(path):
+    collection = "/" + path.strip("/").split("/")[0]
+    return collection not in UNCACHED_ROUTES
+
+
+# Responses
+def json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+ENTITY_TAG = re.compile(r'(?:W/)?"[^"]*"')
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value names etag
+
+    The header is "*" or a comma-separated list of entity tags. Tags are
+    compared weakly, as If-None-Match requires: a W/ prefix on either side
+    is ignored and the quoted values must be equal.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in ENTITY_TAG.findall(if_none_match))
+
+class Rendered:
+    """A response body with its ETag and, when worth it, a gzipped copy"""
+
+    __slots__ = ("status", "body", "gzipped", "etag")
+
+    def __init__(self, status, payload):
+        self.status = status
+        self.body = json.dumps(payload, default=json_default, separators=(",", ":")).encode()
+        self.gzipped = gzip.compress(self.body, compresslevel=5) if len(self.body) >= API_GZIP_MIN_BYTES else None
+        self.etag = f'W/"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 server; database work runs on a thread pool sized to the connection pool"""
+
+    def __init__(self, cache_ttl=API_CACHE_TTL, workers=None):
+        self.cache_ttl = cache_ttl
+        self.executor = ThreadPoolExecutor(max_workers=workers or main.db_pool.size,
+                                           thread_name_prefix="api")
+        self._cache = {}      # target -> (Rendered, expires_at)
+        self._inflight = {}   # target -> Future shared by concurrent identical requests
+        self.requests = 0
+
+    async def render(self, target):
+        """Rendered response for a request target, from cache or the database"""
+        now = time.monotonic()
+        entry = self._cache.get(target)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        future = self._inflight.get(target)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self._render, target)
+            self._inflight[target] = future
+            try:
+                # Shielded so a client hanging up does not cancel the query for everyone waiting on it
+                rendered = await asyncio.shield(future)
+            finally:
+                del self._inflight[target]
+            if self.cache_ttl and rendered.status == 200 and cacheable(urlsplit(target).path):
+                self._cache[target] = (rendered, time.monotonic() + self.cache_ttl)
+                if len(self._cache) > 10000:
+                    self._cache = {key: value for key, value in self._cache.items() if value[1] > now}
+            return rendered
+        return await asyncio.shield(future)
+
+    def _render(self, target):
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        route = resolve(url.path)
+        if route is None:
+            return Rendered(404, {"error": f"No endpoint at {url.path}"})
+        handler, args = route
+        try:
+            return Rendered(200, handler(params, *args))
+        except ValueError as e:
+            return Rendered(400, {"error": str(e)})
+        except LookupError as e:
+            return Rendered(404, {"error": str(e)})
+        except mysql.connector.Error as e:
+            return Rendered(503, {"error": f"Database unavailable: {e}"})
+        except Exception as e:
+            print(f"{target}: {e!r}", file=sys.stderr)
+            return Rendered(500, {"error": "Internal error"})
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), API_KEEPALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, "GET", Rendered(431, {"error": "Headers too large"}), {}, False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, "GET", Rendered(400, {"error": "Malformed request line"}), {}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                # Bodies are not used by any endpoint; read and drop them to stay in sync
+                if headers.get("content-length", "0").isdigit() and int(headers.get("content-length", "0")):
+                    try:
+                        await asyncio.wait_for(reader.readexactly(int(headers["content-length"])),
+                                               API_KEEPALIVE_TIMEOUT)
+                    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                        # Truncated or stalled body - the stream can no longer be framed
+                        await self.respond(writer, "GET", Rendered(400, {"error": "Incomplete request body"}),
+                                           {}, False)
+                        break
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                self.requests += 1
+                if method not in ("GET", "HEAD"):
+                    rendered = Rendered(405, {"error": "Only GET and HEAD are supported"})
+                else:
+                    rendered = await self.render(target)
+                await self.respond(writer, method, rendered, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass  # Client went away mid-response
+        finally:
+            writer.close()
+
+    async def respond(self, writer, method, rendered, headers, keep_alive):
+        status, body = rendered.status, rendered.body
+        response_headers = [
+            ("Content-Type", "application/json"),
+            ("ETag", rendered.etag),
+            ("Vary", "Accept-Encoding"),
+            ("Connection", "keep-alive" if keep_alive else "close")
+        ]
+        if status == 200 and etag_matches(headers.get("if-none-match", ""), rendered.etag):
+            status, body = 304, b""
+        elif rendered.gzipped is not None and "gzip" in headers.get("accept-encoding", ""):
+            body = rendered.gzipped
+            response_headers.append(("Content-Encoding", "gzip"))
+        if status == 304:
+            response_headers = [header for header in response_headers if header[0] != "Content-Type"]
+        else:
+            response_headers.append(("Content-Length", str(len(body))))
+
+        head = f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in response_headers) + "\r\n"
+        writer.write(head.encode("latin-1") + (body if method != "HEAD" else b""))
+        await writer.drain()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, limit=API_MAX_HEADER_BYTES)
+        address = server.sockets[0].getsockname()
+        print(f"Serving the inventory API on http://{address[0]}:{address[1]}", file=sys.stderr, flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db-host", default=main.DB_CONFIG["host"])
+    parser.add_argument("--db-user", default=main.DB_CONFIG["user"])
+    parser.add_argument("--db-password", default=main.DB_CONFIG["password"])
+    parser.add_argument("--database", default=main.DB_CONFIG["database"])
+    parser.add_argument("--pool-size", type=int, default=main.DB_POOL_SIZE,
+                        help="database connections, and worker threads running queries")
+    parser.add_argument("--cache-ttl", type=float, default=API_CACHE_TTL,
+                        help="seconds identical requests share a response; 0 disables")
+    args = parser.parse_args(argv)
+
+    main.db_pool = main.ConnectionPool(size=args.pool_size, host=args.db_host, user=args.db_user,
+                                       password=args.db_password, database=args.database)
+    # Non-interactive: there is no display for tkinter message boxes, so errors are raised
+    try:
+        main.create_tables(interactive=False)
+        main.load_settings(interactive=False)
+        # Threshold overrides, used by the writers' low-stock rollup deltas
+        main.low_stock_alerts.refresh()
+    except (mysql.connector.Error, main.MigrationLockError) as err:
+        main.db_pool.close_all()
+        sys.exit(f"Cannot start: {err}")
+
+    server = ApiServer(cache_ttl=args.cache_ttl, workers=args.pool_size)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=False)
+        main.stock_cache.close()
+        main.db_pool.close_all()
+
+if __name__ == "__main__":
+    main_cli()
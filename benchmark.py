@@ -0,0 +1,385 @@
+"""Benchmark the queries behind the main screens on synthetic data
+
+Seeds a scratch MySQL database with the create_tables() schema at each
+requested scale, times the same calls the screens make, and writes a JSON
+report that can be compared across releases:
+
+    python benchmark.py --scales 10000,100000,1000000 --output bench.json
+
+A scale is the number of rows in the largest tables (sales and activity_log);
+the other tables are sized from VOLUME_RATIOS unless overridden with
+--volumes garments=50000,orders=20000.
+
+With --api-requests N, api_server.py is also started against the seeded
+database and N keep-alive GET requests are spread over --api-concurrency
+connections, reporting throughput and latency.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+import api_server
+import main
+
+BENCH_DATABASE = "garment_inventory_bench"
+SEED_BATCH_SIZE = 5000
+SEED_HISTORY_DAYS = 730  # Sales, orders and activity are spread over this many days
+DEFAULT_REPEAT = 5
+
+# Rows per table as a fraction of the scale, with a floor for small scales
+VOLUME_RATIOS = {
+    "users": (0.0005, 5),
+    "suppliers": (0.002, 10),
+    "garments": (0.1, 100),
+    "orders": (0.5, 100),
+    "sales": (1.0, 100),
+    "activity_log": (1.0, 100)
+}
+
+CATEGORIES = main.DEFAULT_CATEGORIES
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+COLORS = ["Black", "White", "Navy", "Red", "Olive", "Beige", "Grey", "Blue"]
+NAME_WORDS = ["Classic", "Slim", "Relaxed", "Vintage", "Cotton", "Linen", "Denim", "Summer", "Winter", "Basic"]
+
+
+# Data generation
+def volumes_for(scale, overrides):
+    volumes = {table: max(floor, int(scale * ratio)) for table, (ratio, floor) in VOLUME_RATIOS.items()}
+    volumes.update(overrides)
+    return volumes
+
+def random_time(rng, now):
+    return now - timedelta(seconds=rng.randrange(SEED_HISTORY_DAYS * 86400))
+
+def generate_rows(table, count, volumes, rng, now):
+    """Yield insert rows for table, in the column order of SEED_QUERIES"""
+    if table == "users":
+        for i in range(count):
+            yield (f"user{i}", "password", "admin" if i == 0 else "staff", f"user{i}@example.com")
+    elif table == "suppliers":
+        for i in range(count):
+            yield (f"Supplier {i} Textiles", f"Contact {i}", f"555-{i:04d}", f"supplier{i}@example.com",
+                   f"{i} Mill Road", rng.randint(1, 5))
+    elif table == "garments":
+        for i in range(count):
+            category = rng.choice(CATEGORIES)
+            price = round(rng.uniform(5, 200), 2)
+            yield (f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {rng.choice(COLORS)} {i}", category,
+                   rng.choice(SIZES), rng.choice(COLORS), rng.randint(0, 500), price,
+                   round(price * rng.uniform(0.4, 0.8), 2), rng.randint(1, volumes["suppliers"]))
+    elif table == "orders":
+        for i in range(count):
+            yield (rng.randint(1, volumes["garments"]), rng.randint(1, 20), random_time(rng, now),
+                   rng.choice(main.ORDER_STATUSES), f"Customer {rng.randint(1, 10 * count)}", "555-0100")
+    elif table == "sales":
+        for i in range(count):
+            quantity = rng.randint(1, 5)
+            price = round(rng.uniform(5, 200), 2)
+            yield (rng.randint(1, volumes["garments"]), quantity, price, random_time(rng, now),
+                   round(price * quantity * 0.3, 2), rng.randint(1, volumes["users"]))
+    elif table == "activity_log":
+        for i in range(count):
+            yield (rng.randint(1, volumes["users"]), f"Benchmark activity {i}", random_time(rng, now))
+
+SEED_QUERIES = {
+    "users": "INSERT INTO users (username, password, role, email) VALUES (%s, %s, %s, %s)",
+    "suppliers": """INSERT INTO suppliers (supplier_name, contact_person, phone, email, address, rating)
+                    VALUES (%s, %s, %s, %s, %s, %s)""",
+    "garments": main.GARMENT_INSERT_QUERY,
+    "orders": """INSERT INTO orders (garment_id, quantity, order_date, status, customer_name, customer_contact)
+                 VALUES (%s, %s, %s, %s, %s, %s)""",
+    "sales": """INSERT INTO sales (garment_id, quantity, sale_price, sale_date, profit, user_id)
+                VALUES (%s, %s, %s, %s, %s, %s)""",
+    "activity_log": "INSERT INTO activity_log (user_id, activity, timestamp) VALUES (%s, %s, %s)"
+}
+
+
+# Database setup
+def recreate_database(config, database):
+    server = dict(config)
+    server.pop("database", None)
+    db = mysql.connector.connect(**server)
+    cursor = db.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+    cursor.execute(f"CREATE DATABASE {database}")
+    db.close()
+
+def use_database(config, database):
+    """Point main at the benchmark database with a fresh pool and empty caches"""
+    main.db_pool.close_all()
+    main.db_pool = main.ConnectionPool(**dict(config, database=database))
+    main.reference_cache.invalidate()
+    main.stock_cache = main.StockCache()
+    main.reset_inventory_pages()
+
+def seed(volumes, seed_value):
+    """Fill every table, then rebuild the rollups the app keeps incrementally"""
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    timings = {}
+    with main.db_pool.connection() as db:
+        cursor = db.cursor()
+        for table in VOLUME_RATIOS:
+            started = time.perf_counter()
+            batch = []
+            for row in generate_rows(table, volumes[table], volumes, rng, now):
+                batch.append(row)
+                if len(batch) >= SEED_BATCH_SIZE:
+                    cursor.executemany(SEED_QUERIES[table], batch)
+                    batch = []
+            if batch:
+                cursor.executemany(SEED_QUERIES[table], batch)
+            db.commit()
+            timings[table] = round(time.perf_counter() - started, 3)
+
+        # Derived data, rebuilt exactly as the migrations would on an existing database
+        started = time.perf_counter()
+        main.rebuild_reservations(cursor)
+        main.rebuild_dashboard_summary(cursor)
+        main.rebuild_sales_daily(cursor)
+        # Re-partition so the seeded history gets its monthly partitions
+        cursor.execute("ALTER TABLE activity_log REMOVE PARTITIONING")
+        main.partition_activity_log(cursor)
+        db.commit()
+        timings["rollups"] = round(time.perf_counter() - started, 3)
+    return timings
+
+
+# Timed queries
+def benchmark_cases():
+    """Name -> function making the same calls as the screen it is named after"""
+    last_page = max(1, -(-main.garment_repo.count() // main.inventory_page_size))
+    return {
+        "show_dashboard": main.load_dashboard_data,
+        "display_inventory.count": lambda: (main.reset_inventory_pages(), main.garment_repo.count())[1],
+        "display_inventory.first_page": lambda: main.garment_repo.page(1),
+        "display_inventory.last_page": lambda: (main.reset_inventory_pages(),
+                                                main.garment_repo.page(last_page))[1],
+        "display_inventory.search": lambda: (main.reset_inventory_pages(),
+                                             main.garment_repo.page(1, ("classic", None, None)))[1],
+        "display_inventory.category_size": lambda: (main.reset_inventory_pages(),
+                                                    main.garment_repo.page(1, (None, "Pants", "M")))[1],
+        "display_inventory.all": main.garment_repo.snapshot,
+        "view_sales_reports": main.sale_repo.report,
+        "view_orders": main.order_repo.list,
+        "view_orders.pending": lambda: main.order_repo.list("pending"),
+        "check_low_inventory": lambda: main.garment_repo.low_stock(main.inventory_threshold),
+        "stock_cache.hot_sku": lambda: main.stock_cache.get(1),
+        "stock_cache.cold_sku": lambda: (main.stock_cache.invalidate([1]), main.stock_cache.get(1))[1]
+    }
+
+def result_size(result):
+    if isinstance(result, dict):
+        return sum(len(value) for value in result.values() if isinstance(value, list))
+    if hasattr(result, "__len__"):
+        return len(result)
+    return 1 if result is not None else 0
+
+def time_case(func, repeat):
+    func()  # Warm the buffer pool and the connection pool
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    stats = {
+        "rows": result_size(result),
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3)
+    }
+    if hasattr(result, "nbytes"):
+        stats["bytes"] = result.nbytes  # Resident size of a columnar result
+    return stats
+
+
+# API load
+API_PATHS = [
+    "/garments?limit=50",
+    "/garments?limit=50&category=Pants",
+    "/garments/1",
+    "/stock/1",
+    "/orders?status=pending&limit=50",
+    "/sales?limit=100",
+    "/suppliers",
+    "/dashboard"
+]
+API_STARTUP_TIMEOUT = 30  # Seconds to wait for the API server to accept connections
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_api_server(args, port):
+    """Run api_server.py in its own process so it does not share our GIL"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_server.py")
+    process = subprocess.Popen([sys.executable, script, "--port", str(port), "--database", args.database,
+                                "--db-host", args.host, "--db-user", args.user, "--db-password", args.password,
+                                "--cache-ttl", str(args.api_cache_ttl)])
+    deadline = time.monotonic() + API_STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("api_server.py exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("api_server.py did not start listening in time")
+
+async def api_load(port, requests, concurrency):
+    """Issue requests GETs over concurrency keep-alive connections; returns per-request latencies"""
+    latencies = []
+    statuses = {}
+
+    async def client(count, offset):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for i in range(count):
+            path = API_PATHS[(offset + i) % len(API_PATHS)]
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: gzip\r\n\r\n".encode())
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").lower()
+            length = int(head.split("content-length:", 1)[1].split("\r\n", 1)[0]) if "content-length:" in head else 0
+            await reader.readexactly(length)
+            latencies.append((time.perf_counter() - started) * 1000)
+            status = head.split(" ", 2)[1]
+            statuses[status] = statuses.get(status, 0) + 1
+        writer.close()
+
+    share, extra = divmod(requests, concurrency)
+    await asyncio.gather(*(client(share + (i < extra), i) for i in range(concurrency)))
+    return latencies, statuses
+
+def benchmark_api(args):
+    port = free_port()
+    process = start_api_server(args, port)
+    try:
+        asyncio.run(api_load(port, len(API_PATHS), 1))  # Warm the server's pool and caches
+        started = time.perf_counter()
+        latencies, statuses = asyncio.run(api_load(port, args.api_requests, args.api_concurrency))
+        seconds = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": args.api_concurrency,
+        "cache_ttl": args.api_cache_ttl,
+        "statuses": statuses,
+        "seconds": round(seconds, 3),
+        "requests_per_sec": round(len(latencies) / seconds, 1),
+        "median_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3)
+    }
+
+
+# Report
+def server_version():
+    with main.db_pool.connection() as db:
+        cursor = db.cursor()
+        cursor.execute("SELECT VERSION()")
+        return cursor.fetchone()[0]
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_volumes(text):
+    overrides = {}
+    for item in filter(None, (text or "").split(",")):
+        table, _, count = item.partition("=")
+        if table not in VOLUME_RATIOS:
+            raise SystemExit(f"Unknown table in --volumes: {table}")
+        overrides[table] = int(count)
+    return overrides
+
+def run(args):
+    config = dict(main.DB_CONFIG, host=args.host, user=args.user, password=args.password)
+    overrides = parse_volumes(args.volumes)
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "scales": {}
+    }
+
+    for scale in args.scales:
+        volumes = volumes_for(scale, overrides)
+        print(f"Scale {scale}: {'reusing ' + args.database if args.skip_seed else volumes}", file=sys.stderr)
+        if not args.skip_seed:
+            recreate_database(config, args.database)
+        use_database(config, args.database)
+        if args.skip_seed:
+            seed_seconds = None
+        else:
+            main.create_tables(interactive=False)
+            seed_seconds = seed(volumes, args.seed)
+        main.load_settings(interactive=False)
+        report.setdefault("mysql", server_version())
+
+        queries = {}
+        for name, func in benchmark_cases().items():
+            queries[name] = time_case(func, args.repeat)
+            print(f"  {name:<36} {queries[name]['median_ms']:>10.2f} ms  ({queries[name]['rows']} rows)",
+                  file=sys.stderr)
+        report["scales"][str(scale)] = {"volumes": None if args.skip_seed else volumes,
+                                        "seed_seconds": seed_seconds, "queries": queries}
+        if args.api_requests:
+            api = report["scales"][str(scale)]["api"] = benchmark_api(args)
+            print(f"  {'api_server':<36} {api['requests_per_sec']:>10.1f} req/s (p95 {api['p95_ms']:.2f} ms)",
+                  file=sys.stderr)
+
+    main.db_pool.close_all()
+    return report
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="10000,100000,1000000",
+                        type=lambda text: [int(value) for value in text.split(",")])
+    parser.add_argument("--volumes", help="per-table row counts, e.g. garments=50000,orders=20000")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the generated data")
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    parser.add_argument("--host", default=main.DB_CONFIG["host"])
+    parser.add_argument("--user", default=main.DB_CONFIG["user"])
+    parser.add_argument("--password", default=main.DB_CONFIG["password"])
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in --database")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--api-requests", type=int, default=0, help="also load-test api_server.py with this many GETs")
+    parser.add_argument("--api-concurrency", type=int, default=50, help="keep-alive connections for the API load test")
+    parser.add_argument("--api-cache-ttl", type=float, default=api_server.API_CACHE_TTL, help="--cache-ttl passed to api_server.py")
+    args = parser.parse_args(argv)
+
+    if args.database == main.DB_CONFIG["database"]:
+        raise SystemExit("Refusing to benchmark against the production database")
+
+    report = run(args)
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main_cli()
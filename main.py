@@ -3,12 +3,23 @@ from tkinter import messagebox, ttk, filedialog, simpledialog
 import mysql.connector
 from PIL import Image, ImageTk
 import os
-from datetime import datetime
+import csv
+import gzip
+import sys
+from datetime import datetime, date, timedelta
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import random
 import time
 import threading
+import queue
+import itertools
+import re
+import atexit
+import cProfile
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager, nullcontext
 
 # Color scheme
 COLORS = {
@@ -26,24 +37,449 @@ COLORS = {
 current_user = None
 current_role = None
 inventory_threshold = 10  # Default threshold for low inventory alerts
-notifications = []
+inventory_page_size = 50  # Rows shown per page on the inventory screen
+activity_retention_months = 12  # Months of activity_log kept online before archiving
+slow_query_ms = 200  # Statements slower than this are logged with their EXPLAIN plan
+NOTIFICATION_HISTORY = 200  # Notifications kept for the alerts panel
+notifications = deque(maxlen=NOTIFICATION_HISTORY)
 
 # Database Connection
-def connect_db():
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "root",
+    "database": "garment_inventory"
+}
+DB_POOL_SIZE = 5              # Maximum open connections kept by the pool
+DB_POOL_TIMEOUT = 5           # Seconds to wait for a free connection before giving up
+DB_HEALTH_CHECK_INTERVAL = 30 # Ping idle connections older than this (seconds) on checkout
+
+
+class PoolTimeoutError(mysql.connector.Error):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+
+
+class PooledConnection:
+    """Wrapper around a MySQL connection whose close() hands it back to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._cursors = []
+        self.last_used = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+        self._cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        if self._pool is not None:
+            # Record statements whose rows were never read to the end
+            for cursor in self._cursors:
+                cursor.finish()
+            self._cursors = []
+            pool, self._pool = self._pool, None
+            pool.release(self)
+
+    def abandon(self):
+        """Close the connection instead of returning it, leaving any unread rows unread"""
+        if self._pool is not None:
+            for cursor in self._cursors:
+                cursor.finish()
+            self._cursors = []
+            pool, self._pool = self._pool, None
+            pool._discard(self)
+
+
+class ConnectionPool:
+    """Thread-safe pool of MySQL connections with checkout statistics"""
+
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 health_check_interval=DB_HEALTH_CHECK_INTERVAL, **config):
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.config = config or dict(DB_CONFIG)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {
+            "hits": 0,            # Checkouts served by an idle connection
+            "misses": 0,          # Checkouts that had to open a new connection
+            "waits": 0,           # Checkouts that blocked because the pool was exhausted
+            "timeouts": 0,        # Checkouts that gave up after waiting
+            "health_failures": 0, # Idle connections found dead and replaced
+            "total_wait": 0.0,
+            "max_wait": 0.0
+        }
+
+    def _open(self):
+        conn = mysql.connector.connect(**self.config)
+        return PooledConnection(self, conn)
+
+    def _is_healthy(self, wrapper):
+        if time.monotonic() - wrapper.last_used < self.health_check_interval:
+            return True
+        try:
+            return wrapper._conn.is_connected()
+        except mysql.connector.Error:
+            return False
+
+    def _discard(self, wrapper):
+        with self._lock:
+            self._created -= 1
+        try:
+            wrapper._conn.close()
+        except mysql.connector.Error:
+            pass
+
+    def get_connection(self, timeout=None):
+        """Check out a connection, opening one if the pool is not yet full"""
+        timeout = self.timeout if timeout is None else timeout
+
+        while True:
+            try:
+                wrapper = self._idle.get_nowait()
+                hit = True
+            except queue.Empty:
+                wrapper = None
+                hit = False
+
+            if wrapper is None:
+                with self._lock:
+                    can_open = self._created < self.size
+                    if can_open:
+                        self._created += 1
+                if can_open:
+                    try:
+                        wrapper = self._open()
+                    except mysql.connector.Error:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    with self._lock:
+                        self._stats["misses"] += 1
+                    return wrapper
+
+                # Pool exhausted - wait for another caller to release
+                started = time.monotonic()
+                try:
+                    wrapper = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        msg=f"No database connection available after {timeout}s "
+                            f"(pool size {self.size})")
+                waited = time.monotonic() - started
+                with self._lock:
+                    self._stats["waits"] += 1
+                    self._stats["total_wait"] += waited
+                    self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+
+            if not self._is_healthy(wrapper):
+                with self._lock:
+                    self._stats["health_failures"] += 1
+                self._discard(wrapper)
+                continue
+
+            if hit:
+                with self._lock:
+                    self._stats["hits"] += 1
+            wrapper._pool = self
+            return wrapper
+
+    def release(self, wrapper):
+        """Return a connection to the pool, ending any open transaction"""
+        try:
+            # Drop unread rows and roll back so the next user starts from a fresh snapshot
+            wrapper._conn.consume_results()
+            if wrapper._conn.in_transaction:
+                wrapper._conn.rollback()
+        except mysql.connector.Error:
+            self._discard(wrapper)
+            return
+        wrapper.last_used = time.monotonic()
+        self._idle.put(wrapper)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        wrapper = self.get_connection(timeout)
+        try:
+            yield wrapper
+        finally:
+            wrapper.close()
+
+    def stats(self):
+        """Snapshot of pool usage counters for sizing under load"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["open"] = self._created
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["open"] - stats["idle"]
+        checkouts = stats["hits"] + stats["misses"] + stats["waits"]
+        stats["hit_rate"] = stats["hits"] / checkouts if checkouts else 0.0
+        stats["avg_wait"] = stats["total_wait"] / stats["waits"] if stats["waits"] else 0.0
+        return stats
+
+    def close_all(self):
+        while True:
+            try:
+                wrapper = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(wrapper)
+
+
+db_pool = ConnectionPool()
+
+
+def connect_db(interactive=True):
+    """A pooled connection, or None after showing the error
+
+    With interactive=False (no GUI, e.g. the API server) the error is raised instead.
+    """
     try:
-        return mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="root",
-            database="garment_inventory"
-        )
+        return db_pool.get_connection()
     except mysql.connector.Error as err:
+        if not interactive:
+            raise
         messagebox.showerror("Database Connection Error", f"Failed to connect to database: {err}")
         return None
 
-# Create Tables
-def create_tables():
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled connection; yields None if the database is unreachable"""
     db = connect_db()
+    try:
+        yield db
+    finally:
+        if db:
+            db.close()
+
+
+def get_pool_stats():
+    return db_pool.stats()
+
+
+# Query instrumentation
+# Every cursor handed out by the pool is wrapped so each statement's time
+# (execute plus reading its rows), row count and the screen that issued it are
+# recorded. Statements slower than slow_query_ms are EXPLAINed on a background
+# thread and appended to SLOW_QUERY_LOG.
+SLOW_QUERY_LOG = "slow_queries.log"
+SLOW_QUERY_HISTORY = 100  # Slow statements kept for the Diagnostics page
+QUERY_HISTOGRAM_BUCKETS = (1, 5, 10, 50, 100, 500, 1000)  # Upper bounds in ms, plus one for slower
+
+_query_context = threading.local()
+active_view = None  # Screen shown in the content area, set by navigate()
+
+
+def current_view():
+    """Screen a statement is issued for: the one a background job was submitted from, or the one on screen"""
+    return getattr(_query_context, "view", None) or active_view or "startup"
+
+
+def with_view(func, view):
+    """Wrap func so statements it runs on another thread are attributed to view"""
+    def run():
+        _query_context.view = view
+        try:
+            return func()
+        finally:
+            _query_context.view = None
+    return run
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and IN lists so one statement shape is counted once"""
+    sql = " ".join(sql.split())
+    return re.sub(r"%s(?:, %s)+", "%s, ...", sql)
+
+
+class QueryStats:
+    """Per-statement timings, row counts and latency histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._statements = {}  # normalized sql -> totals
+        self._slow = deque(maxlen=SLOW_QUERY_HISTORY)
+        self._explain_queue = queue.Queue()
+        self._explainer = None
+
+    def record(self, sql, params, elapsed_ms, rows, view):
+        key = normalize_sql(sql)
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = {
+                    "sql": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "views": set(), "histogram": [0] * (len(QUERY_HISTOGRAM_BUCKETS) + 1)}
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["rows"] += max(rows, 0)
+            entry["views"].add(view)
+            bucket = sum(elapsed_ms > bound for bound in QUERY_HISTOGRAM_BUCKETS)
+            entry["histogram"][bucket] += 1
+
+            if elapsed_ms < slow_query_ms:
+                return
+            slow = {"time": datetime.now(), "view": view, "ms": elapsed_ms, "rows": rows,
+                    "sql": " ".join(sql.split()), "params": params, "plan": None}
+            self._slow.append(slow)
+            if self._explainer is None:
+                self._explainer = threading.Thread(target=self._explain_slow, name="slow-query-explain",
+                                                   daemon=True)
+                self._explainer.start()
+        self._explain_queue.put(slow)
+
+    def _explain_slow(self):
+        while True:
+            slow = self._explain_queue.get()
+            if slow["sql"].upper().startswith("SELECT"):
+                try:
+                    with db_pool.connection() as db:
+                        # A raw cursor, so EXPLAIN itself is not recorded
+                        cursor = db._conn.cursor(dictionary=True)
+                        cursor.execute("EXPLAIN " + slow["sql"], slow["params"])
+                        slow["plan"] = cursor.fetchall()
+                        cursor.close()
+                except mysql.connector.Error as err:
+                    slow["plan"] = [{"error": str(err)}]
+            try:
+                with open(SLOW_QUERY_LOG, "a", encoding="utf-8") as log:
+                    log.write(f"{slow['time']:%Y-%m-%d %H:%M:%S} {slow['view']} {slow['ms']:.1f}ms "
+                              f"{slow['rows']} rows\n  {slow['sql']}\n")
+                    for row in slow["plan"] or []:
+                        log.write(f"  plan: {row}\n")
+            except OSError:
+                pass
+
+    def top(self, n=20):
+        """The n statements with the most total time"""
+        with self._lock:
+            entries = [dict(entry, views=sorted(entry["views"]), histogram=list(entry["histogram"]))
+                       for entry in self._statements.values()]
+        entries.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return entries[:n]
+
+    def slow_queries(self):
+        """Recent slow statements, newest first"""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+
+
+query_stats = QueryStats()
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing each statement until its rows have been read"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._current = None  # [sql, params, view, elapsed_ms, rows] of the statement being read
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._current is not None:
+                self._current[3] += (time.perf_counter() - started) * 1000
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self.finish()
+        self._current = [operation, params, current_view(), 0.0, 0]
+        result = self._timed(lambda: self._cursor.execute(operation, params, *args, **kwargs))
+        if not self._cursor.with_rows:
+            self._current[4] = self._cursor.rowcount
+            self.finish()
+        return result
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self.finish()
+        self._current = [operation, None, current_view(), 0.0, 0]
+        result = self._timed(lambda: self._cursor.executemany(operation, seq_params, *args, **kwargs))
+        self._current[4] = self._cursor.rowcount
+        self.finish()
+        return result
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is None:
+            self.finish()
+        elif self._current is not None:
+            self._current[4] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(lambda: self._cursor.fetchmany(size) if size else self._cursor.fetchmany())
+        if self._current is not None:
+            self._current[4] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        if self._current is not None:
+            self._current[4] += len(rows)
+        self.finish()
+        return rows
+
+    def finish(self):
+        """Record the current statement; called once its rows are read or the cursor is done"""
+        if self._current is not None:
+            sql, params, view, elapsed_ms, rows = self._current
+            self._current = None
+            query_stats.record(sql, params, elapsed_ms, rows, view)
+            render_timings.add_query(view, elapsed_ms)
+
+    def close(self):
+        self.finish()
+        return self._cursor.close()
+
+# Create Tables
+def create_index_if_missing(cursor, table, index_name, definition):
+    """Add an index unless one with the same name already exists on the table"""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index_name))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+
+def add_column_if_missing(cursor, table, column, definition):
+    """Add a column unless the table already has one with that name"""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def create_tables(interactive=True):
+    """Create missing tables and default settings, then run the migrations
+
+    With interactive=False, errors are raised rather than shown in a message box.
+    """
+    db = connect_db(interactive)
     if not db:
         return
         
@@ -131,87 +567,1315 @@ def create_tables():
     except mysql.connector.IntegrityError:
         # Settings already exist
         pass
-
+    cursor.execute("INSERT IGNORE INTO settings (setting_name, setting_value) VALUES (%s, %s)",
+                   ("inventory_page_size", str(inventory_page_size)))
+    cursor.execute("INSERT IGNORE INTO settings (setting_name, setting_value) VALUES (%s, %s)",
+                   ("activity_retention_months", str(activity_retention_months)))
+    cursor.execute("INSERT IGNORE INTO settings (setting_name, setting_value) VALUES (%s, %s)",
+                   ("slow_query_ms", str(slow_query_ms)))
     db.commit()
+
+    # Bring indexes and derived tables up to date; rollups depend on the saved threshold
+    load_settings(interactive)
+    try:
+        run_migrations(db)
+    except MigrationLockError as err:
+        db.close()
+        if interactive:
+            messagebox.showerror("Database Upgrade", str(err))
+        raise
+    ensure_activity_partitions(db.cursor())
     db.close()
 
-# Load settings from the database
-def load_settings():
-    global inventory_threshold
-    db = connect_db()
-    if not db:
+# Dashboard summary
+# inventory_summary holds per-category rollups and dashboard_counters holds
+# global counts. Both are updated in the same transaction as the write that
+# changes them, so the dashboard reads a handful of rows instead of scanning
+# garments and orders.
+SUMMARY_QUERY = """
+    SELECT category, item_count, total_quantity, total_value, low_stock_count
+    FROM inventory_summary
+    ORDER BY category
+"""
+
+# Low-stock counts use each garment's effective threshold - its own override,
+# else its category's, else inventory_threshold - the same rule LowStockAlerts
+# applies, so the dashboard card and the Alerts screen agree. IS_LOW_SQL goes
+# in the SELECT list and THRESHOLD_JOINS after "FROM garments g"; both take
+# low_stock_params() in that order.
+IS_LOW_SQL = """g.quantity < COALESCE(CAST(gt.setting_value AS SIGNED),
+                                  CAST(ct.setting_value AS SIGNED), %s)"""
+THRESHOLD_JOINS = """
+    LEFT JOIN settings gt ON gt.setting_name = CONCAT(%s, 'garment.', g.id)
+    LEFT JOIN settings ct ON ct.setting_name = CONCAT(%s, 'category.', g.category)
+"""
+
+def low_stock_params():
+    return (inventory_threshold, THRESHOLD_SETTING_PREFIX, THRESHOLD_SETTING_PREFIX)
+
+def rebuild_dashboard_summary(cursor):
+    """Recompute the rollups from scratch (initial fill, or repair after manual edits)"""
+    cursor.execute("DELETE FROM inventory_summary")
+    cursor.execute(f"""
+        INSERT INTO inventory_summary (category, item_count, total_quantity, total_value, low_stock_count)
+        SELECT g.category, COUNT(*), SUM(g.quantity), SUM(g.quantity * g.price), SUM({IS_LOW_SQL})
+        FROM garments g {THRESHOLD_JOINS}
+        GROUP BY g.category
+    """, low_stock_params())
+    cursor.execute("""
+        INSERT INTO dashboard_counters (counter_name, counter_value)
+        SELECT 'total_orders', COUNT(*) FROM orders
+        ON DUPLICATE KEY UPDATE counter_value = VALUES(counter_value)
+    """)
+
+def recount_low_stock(cursor):
+    """Refresh low-stock counts after the global threshold or an override changes"""
+    cursor.execute(f"""
+        UPDATE inventory_summary s
+        JOIN (SELECT g.category, SUM({IS_LOW_SQL}) AS low_stock
+              FROM garments g {THRESHOLD_JOINS}
+              GROUP BY g.category) l ON l.category = s.category
+        SET s.low_stock_count = l.low_stock
+    """, low_stock_params())
+
+def update_inventory_summary(cursor, garment_id, category, price, old_quantity, new_quantity):
+    """Apply one garment's stock change to its category rollup
+
+    Pass old_quantity=None for a newly added garment. Must run inside the
+    transaction that changes garments so the rollup never drifts.
+    """
+    is_new = old_quantity is None
+    old_quantity = old_quantity or 0
+    threshold = low_stock_alerts.threshold(garment_id, category)
+    low_delta = int(new_quantity < threshold) - (0 if is_new else int(old_quantity < threshold))
+    apply_summary_delta(cursor, category, 1 if is_new else 0, new_quantity - old_quantity,
+                        (new_quantity - old_quantity) * price, low_delta)
+
+def apply_summary_delta(cursor, category, items, quantity, value, low_stock):
+    cursor.execute("""
+        INSERT INTO inventory_summary (category, item_count, total_quantity, total_value, low_stock_count)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            item_count = item_count + VALUES(item_count),
+            total_quantity = total_quantity + VALUES(total_quantity),
+            total_value = total_value + VALUES(total_value),
+            low_stock_count = low_stock_count + VALUES(low_stock_count)
+    """, (category, items, quantity, value, low_stock))
+
+def increment_counter(cursor, name, delta=1):
+    cursor.execute("""
+        INSERT INTO dashboard_counters (counter_name, counter_value) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE counter_value = counter_value + VALUES(counter_value)
+    """, (name, delta))
+
+def rebuild_reservations(cursor):
+    """Recompute reserved_quantity from the pending orders"""
+    cursor.execute("""
+        UPDATE garments g
+        LEFT JOIN (SELECT garment_id, SUM(quantity) AS reserved
+                   FROM orders WHERE status = 'pending' GROUP BY garment_id) o ON o.garment_id = g.id
+        SET g.reserved_quantity = COALESCE(o.reserved, 0)
+    """)
+
+# Sales time series
+# sales_daily keeps one pre-aggregated row per day. Sale writers append to it
+# in the same transaction as the sale, and weekly/monthly series are rolled up
+# from it, so a multi-year chart reads at most a few thousand rows.
+SALES_BUCKETS = {
+    "day": "sale_day",
+    "week": "DATE_SUB(sale_day, INTERVAL WEEKDAY(sale_day) DAY)",
+    "month": "DATE_SUB(sale_day, INTERVAL DAYOFMONTH(sale_day) - 1 DAY)"
+}
+DASHBOARD_SALES_MONTHS = 6
+
+def rebuild_sales_daily(cursor):
+    """Recompute every daily bucket from the sales table"""
+    cursor.execute("DELETE FROM sales_daily")
+    cursor.execute("""
+        INSERT INTO sales_daily (sale_day, sale_count, units, revenue, profit)
+        SELECT DATE(sale_date), COUNT(*), SUM(quantity), SUM(quantity * sale_price), COALESCE(SUM(profit), 0)
+        FROM sales
+        GROUP BY DATE(sale_date)
+    """)
+
+def record_daily_sales(cursor, day, sale_count, units, revenue, profit):
+    """Add sales to a day's bucket; call in the transaction that inserts the sales"""
+    cursor.execute("""
+        INSERT INTO sales_daily (sale_day, sale_count, units, revenue, profit)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            sale_count = sale_count + VALUES(sale_count),
+            units = units + VALUES(units),
+            revenue = revenue + VALUES(revenue),
+            profit = profit + VALUES(profit)
+    """, (day, sale_count, units, revenue, profit))
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def next_bucket(start, bucket):
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+def sales_series(bucket="month", start=None, end=None, cursor=None):
+    """Revenue, units and profit per bucket between start and end (dates, inclusive)
+
+    Returns [(bucket_start, revenue, units, profit)] with empty buckets
+    filled with zeros so the series can be plotted directly.
+    """
+    end = end or date.today()
+    start = bucket_start(start or end - timedelta(days=365), bucket)
+    sql = f"""
+        SELECT {SALES_BUCKETS[bucket]} AS bucket, SUM(revenue), SUM(units), SUM(profit)
+        FROM sales_daily
+        WHERE sale_day BETWEEN %s AND %s
+        GROUP BY bucket
+    """
+
+    if cursor is None:
+        rows = fetch_all(sql, (start, end))
+    else:
+        cursor.execute(sql, (start, end))
+        rows = cursor.fetchall()
+    totals = {row[0]: row[1:] for row in rows}
+
+    series = []
+    current = start
+    while current <= end:
+        revenue, units, profit = totals.get(current, (0, 0, 0))
+        series.append((current, float(revenue or 0), int(units or 0), float(profit or 0)))
+        current = next_bucket(current, bucket)
+    return series
+
+# Activity log partitions
+# activity_log is range-partitioned by month on its timestamp, so old months
+# can be archived and dropped whole and recent-activity reads touch only the
+# newest partitions. Upcoming months are split off the catch-all pmax
+# partition ahead of time. Partitioned tables can't have foreign keys, so the
+# user_id reference is no longer enforced by MySQL.
+ACTIVITY_PARTITIONS_AHEAD = 3  # Months of empty partitions kept ready
+ACTIVITY_ARCHIVE_DIR = "activity_archive"
+
+def month_start(day, offset=0):
+    """First day of the month `offset` months after the month of day"""
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+def activity_partition_clause(months):
+    """Partition definitions holding each of the given months, plus pmax"""
+    parts = [f"PARTITION p{month:%Y%m} VALUES LESS THAN (UNIX_TIMESTAMP('{month_start(month, 1)} 00:00:00'))"
+             for month in months]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ",\n".join(parts)
+
+def month_range(first, last):
+    months = []
+    while first <= last:
+        months.append(first)
+        first = month_start(first, 1)
+    return months
+
+def activity_partitions(cursor):
+    """[(partition_name, month)] of activity_log oldest first, without pmax"""
+    cursor.execute("""
+        SELECT partition_name FROM information_schema.partitions
+        WHERE table_schema = DATABASE() AND table_name = 'activity_log' AND partition_name IS NOT NULL
+        ORDER BY partition_ordinal_position
+    """)
+    return [(name, datetime.strptime(name[1:], "%Y%m").date())
+            for (name,) in cursor.fetchall() if name != "pmax"]
+
+def partition_activity_log(cursor):
+    """Rebuild activity_log as a monthly partitioned table"""
+    # Left behind if a previous run stopped right after the swap
+    cursor.execute("DROP TABLE IF EXISTS activity_log_unpartitioned")
+    if activity_partitions(cursor):
         return
-        
+
+    cursor.execute("SELECT MIN(timestamp) FROM activity_log")
+    oldest = cursor.fetchone()[0]
+    first = month_start(oldest.date() if oldest else date.today())
+    months = month_range(first, month_start(date.today(), ACTIVITY_PARTITIONS_AHEAD))
+
+    cursor.execute("DROP TABLE IF EXISTS activity_log_partitioned")
+    cursor.execute(f"""CREATE TABLE activity_log_partitioned (
+        id INT AUTO_INCREMENT,
+        user_id INT,
+        activity TEXT NOT NULL,
+        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, timestamp),
+        INDEX idx_activity_log_timestamp (timestamp),
+        INDEX idx_activity_log_user (user_id)
+    ) PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+        {activity_partition_clause(months)}
+    )""")
+    cursor.execute("""
+        INSERT INTO activity_log_partitioned (id, user_id, activity, timestamp)
+        SELECT id, user_id, activity, COALESCE(timestamp, CURRENT_TIMESTAMP) FROM activity_log
+    """)
+    cursor.execute("RENAME TABLE activity_log TO activity_log_unpartitioned, "
+                   "activity_log_partitioned TO activity_log")
+    cursor.execute("DROP TABLE activity_log_unpartitioned")
+
+def ensure_activity_partitions(cursor, months_ahead=ACTIVITY_PARTITIONS_AHEAD):
+    """Split monthly partitions off pmax so new rows never land in it"""
+    partitions = activity_partitions(cursor)
+    if not partitions:
+        return
+    months = month_range(month_start(partitions[-1][1], 1), month_start(date.today(), months_ahead))
+    if months:
+        cursor.execute(f"ALTER TABLE activity_log REORGANIZE PARTITION pmax INTO ({activity_partition_clause(months)})")
+
+def archive_activity_log(retention_months=None, archive_dir=ACTIVITY_ARCHIVE_DIR):
+    """Archive and drop the activity_log months older than the retention period
+
+    Each month is written to <archive_dir>/activity_log_YYYYMM.csv.gz before
+    its partition is dropped. Returns [(month, rows, path)].
+    """
+    if retention_months is None:
+        retention_months = activity_retention_months
+    cutoff = month_start(date.today(), -retention_months)
+
+    archived = []
+    with db_pool.connection() as db:
+        cursor = db.cursor()
+        ensure_activity_partitions(cursor)
+        expired = [(name, month) for name, month in activity_partitions(cursor) if month < cutoff]
+        if expired:
+            os.makedirs(archive_dir, exist_ok=True)
+
+        for name, month in expired:
+            path = os.path.join(archive_dir, f"activity_log_{month:%Y%m}.csv.gz")
+            rows = 0
+            # Write to a temporary name so a partial file never looks like a finished archive
+            with gzip.open(path + ".tmp", "wt", newline="", encoding="utf-8") as archive:
+                writer = csv.writer(archive)
+                writer.writerow(["id", "user_id", "activity", "timestamp"])
+                cursor.execute(f"SELECT id, user_id, activity, timestamp FROM activity_log PARTITION ({name}) ORDER BY id")
+                while True:
+                    chunk = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    writer.writerows(chunk)
+                    rows += len(chunk)
+            os.replace(path + ".tmp", path)
+            cursor.execute(f"ALTER TABLE activity_log DROP PARTITION {name}")
+            archived.append((month, rows, path))
+    return archived
+
+# Schema migrations
+# Each migration is (version, description, steps). A step is an index tuple
+# (table, index_name, definition), a SQL statement, or a function taking a
+# cursor. Steps must be safe to re-run, since MySQL commits DDL immediately
+# and a migration interrupted half way is retried from the start.
+MIGRATIONS = [
+    (1, "Search indexes on garments and suppliers", [
+        ("garments", "ft_garments_name_color", "FULLTEXT INDEX ft_garments_name_color (garment_name, color)"),
+        ("garments", "idx_garments_name", "INDEX idx_garments_name (garment_name(32))"),
+        ("garments", "idx_garments_category_size", "INDEX idx_garments_category_size (category, size, id)"),
+        ("suppliers", "ft_suppliers_name", "FULLTEXT INDEX ft_suppliers_name (supplier_name)"),
+        ("suppliers", "idx_suppliers_name", "INDEX idx_suppliers_name (supplier_name(32))")
+    ]),
+    (2, "Indexes for low-stock, dashboard and reporting queries", [
+        ("garments", "idx_garments_quantity", "INDEX idx_garments_quantity (quantity)"),
+        ("garments", "idx_garments_category_quantity", "INDEX idx_garments_category_quantity (category, quantity)"),
+        ("activity_log", "idx_activity_log_timestamp", "INDEX idx_activity_log_timestamp (timestamp)"),
+        ("sales", "idx_sales_date", "INDEX idx_sales_date (sale_date, garment_id)"),
+        ("orders", "idx_orders_status_date", "INDEX idx_orders_status_date (status, order_date)")
+    ]),
+    (3, "Materialized dashboard rollups", [
+        """CREATE TABLE IF NOT EXISTS inventory_summary (
+            category VARCHAR(100) PRIMARY KEY,
+            item_count INT NOT NULL DEFAULT 0,
+            total_quantity BIGINT NOT NULL DEFAULT 0,
+            total_value DOUBLE NOT NULL DEFAULT 0,
+            low_stock_count INT NOT NULL DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS dashboard_counters (
+            counter_name VARCHAR(50) PRIMARY KEY,
+            counter_value BIGINT NOT NULL DEFAULT 0
+        )""",
+        rebuild_dashboard_summary
+    ]),
+    (4, "Daily sales buckets for the time-series engine", [
+        """CREATE TABLE IF NOT EXISTS sales_daily (
+            sale_day DATE PRIMARY KEY,
+            sale_count INT NOT NULL DEFAULT 0,
+            units BIGINT NOT NULL DEFAULT 0,
+            revenue DOUBLE NOT NULL DEFAULT 0,
+            profit DOUBLE NOT NULL DEFAULT 0
+        )""",
+        rebuild_sales_daily
+    ]),
+    (5, "Stock reservations for pending orders", [
+        lambda cursor: add_column_if_missing(cursor, "garments", "reserved_quantity", "INT NOT NULL DEFAULT 0"),
+        # Existing pending orders hold their stock from now on
+        rebuild_reservations
+    ]),
+    (6, "Monthly partitions for activity_log", [
+        partition_activity_log
+    ]),
+    (7, "Purchase orders for replenishment", [
+        """CREATE TABLE IF NOT EXISTS purchase_orders (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            supplier_id INT,
+            status ENUM('draft', 'sent', 'received', 'cancelled') DEFAULT 'draft',
+            created_by INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_purchase_orders_status (status, created_at),
+            FOREIGN KEY (supplier_id) REFERENCES suppliers(id),
+            FOREIGN KEY (created_by) REFERENCES users(id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS purchase_order_lines (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            purchase_order_id INT NOT NULL,
+            garment_id INT NOT NULL,
+            quantity INT NOT NULL,
+            unit_cost FLOAT,
+            FOREIGN KEY (purchase_order_id) REFERENCES purchase_orders(id),
+            FOREIGN KEY (garment_id) REFERENCES garments(id)
+        )"""
+    ]),
+    (8, "Index for the stock cache's change sweep", [
+        ("garments", "idx_garments_last_updated", "INDEX idx_garments_last_updated (last_updated)")
+    ])
+]
+
+MIGRATION_LOCK_TIMEOUT = 60  # Seconds to wait for another client's migration to finish
+
+
+class MigrationLockError(Exception):
+    """Raised when another client holds the migration lock past MIGRATION_LOCK_TIMEOUT"""
+
+
+def run_migrations(db):
+    """Apply every migration newer than the recorded schema version
+
+    Raises MigrationLockError rather than carrying on against a schema that
+    may be half upgraded.
+    """
     cursor = db.cursor()
-    cursor.execute("SELECT setting_name, setting_value FROM settings")
-    for name, value in cursor.fetchall():
-        if name == "inventory_threshold":
-            inventory_threshold = int(value)
-    db.close()
+    cursor.execute("""CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
 
-# Authentication and User Management
-def register_user():
-    def submit_registration():
-        username = reg_username.get()
-        pwd = reg_password.get()
-        role = reg_role.get()
-        email = reg_email.get()
-        
-        if not username or not pwd or not role or not email:
-            show_notification(register_window, "All fields are required", "warning")
-            return
-        
-        if not terms_var.get():
-            show_notification(register_window, "You must accept Terms & Conditions", "warning")
-            return
-            
-        db = connect_db()
-        if not db:
-            return
-            
+    # Serialize concurrent start-ups so only one client migrates
+    cursor.execute("SELECT GET_LOCK('garment_inventory_migrations', %s)", (MIGRATION_LOCK_TIMEOUT,))
+    if not cursor.fetchone()[0]:
+        raise MigrationLockError(
+            f"Another client has been upgrading the database for over {MIGRATION_LOCK_TIMEOUT} seconds. "
+            "Wait for it to finish, then start the application again.")
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current = cursor.fetchone()[0]
+
+        for version, description, steps in MIGRATIONS:
+            if version <= current:
+                continue
+            for step in steps:
+                if isinstance(step, tuple):
+                    create_index_if_missing(cursor, *step)
+                elif callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                           (version, description))
+            db.commit()
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('garment_inventory_migrations')")
+        cursor.fetchone()
+
+# Queries on hot screens whose plans should never fall back to a full table scan
+LOW_STOCK_QUERY = "SELECT id, garment_name, category, quantity FROM garments WHERE quantity < %s"
+RECENT_ACTIVITY_DAYS = 30  # Keeps the dashboard feed within the newest partitions
+
+def hot_queries():
+    """Name -> (sql, params) for the index-dependent queries issued by the screens"""
+    search_where, search_params = build_inventory_filter(("shirt", "Pants", "M"))
+    supplier_where, supplier_params = build_search_filter("textile", ["supplier_name"], "supplier_name")
+    return {
+        "check_low_inventory": (LOW_STOCK_QUERY, (inventory_threshold,)),
+        "dashboard_activity": (ACTIVITY_PAGE_QUERY.format(before=""),
+                               (datetime.now() - timedelta(days=RECENT_ACTIVITY_DAYS), 5)),
+        "activity_page": (ACTIVITY_PAGE_QUERY.format(before=""),
+                          (datetime.now() - timedelta(days=7), ACTIVITY_PAGE_SIZE)),
+        "inventory_page": (INVENTORY_PAGE_QUERY.format(filters=""), (0, inventory_page_size)),
+        "inventory_search": (INVENTORY_PAGE_QUERY.format(filters="AND " + search_where),
+                             [0] + search_params + [inventory_page_size]),
+        "supplier_search": (SUPPLIERS_QUERY.format(filters="WHERE " + supplier_where), supplier_params)
+    }
+
+def verify_query_plans():
+    """EXPLAIN each hot query; returns [(name, uses_index, plan_rows)]"""
+    results = []
+    with db_pool.connection() as db:
+        cursor = db.cursor(dictionary=True)
+        for name, (sql, params) in hot_queries().items():
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchall()
+            # A step without a chosen key and with access type ALL is a full scan
+            uses_index = all(row["type"] != "ALL" or row["key"] for row in plan if row["table"])
+            results.append((name, uses_index, plan))
+    return results
+
+def print_query_plan_report():
+    failures = 0
+    for name, uses_index, plan in verify_query_plans():
+        print(f"{'OK  ' if uses_index else 'SCAN'} {name}")
+        for row in plan:
+            print(f"       {row['table']}: type={row['type']} key={row['key']} rows={row['rows']}")
+        failures += not uses_index
+    return failures
+
+# Background query executor
+QUERY_WORKERS = 3
+QUERY_POLL_INTERVAL = 50       # ms between checks for finished queries
+LOADING_INDICATOR_DELAY = 150  # ms before a running query shows the loading overlay
+
+
+class QueryExecutor:
+    """Runs database calls on worker threads and hands results back to Tk
+
+    Results are queued by the workers and delivered on the Tk thread by a
+    poll loop scheduled with after(). Submitting on a channel cancels any
+    request still pending on that channel, so a screen never receives the
+    results of a query started for the screen the user just left.
+    """
+
+    def __init__(self, workers=QUERY_WORKERS):
+        self.workers = workers
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = {}  # ticket -> (channel, callback, error_callback, on_cancel)
+        self._tickets = itertools.count(1)
+        self._threads = []
+        self._root = None
+        self._poll_id = None
+
+    def attach(self, root):
+        """Deliver results through the event loop of root"""
+        if self._root is not None and self._poll_id is not None:
+            try:
+                self._root.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+        self._root = root
+        self._poll_id = root.after(QUERY_POLL_INTERVAL, self._poll)
+
+    def submit(self, func, callback=None, error_callback=None, channel=None, on_cancel=None):
+        if channel is not None:
+            self.cancel(channel)
+
+        ticket = next(self._tickets)
+        self._pending[ticket] = (channel, callback, error_callback, on_cancel)
+        self._start_workers()
+        self._jobs.put((ticket, with_view(func, current_view())))
+        return ticket
+
+    def cancel(self, channel):
+        """Drop every pending request on channel; their callbacks will never run"""
+        for ticket, job in list(self._pending.items()):
+            if job[0] == channel:
+                del self._pending[ticket]
+                if job[3]:
+                    job[3]()
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._threads.append(worker)
+
+    def _work(self):
+        while True:
+            ticket, func = self._jobs.get()
+            if ticket not in self._pending:
+                continue  # Cancelled before it started
+            try:
+                self._results.put((ticket, True, func()))
+            except Exception as err:
+                self._results.put((ticket, False, err))
+
+    def _poll(self):
+        self._poll_id = self._root.after(QUERY_POLL_INTERVAL, self._poll)
+        while True:
+            try:
+                ticket, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            job = self._pending.pop(ticket, None)
+            if job is None:
+                continue  # Stale result for a cancelled request
+            callback = job[1] if ok else job[2]
+            if callback:
+                callback(value)
+
+
+query_executor = QueryExecutor()
+
+
+def fetch_all(query, params=()):
+    """Run a read query on a pooled connection and return every row"""
+    with db_pool.connection() as db:
         cursor = db.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
+def run_query(parent, func, on_done, message="Loading...", channel="content"):
+    """Run func off the UI thread and pass its result to on_done
+
+    A loading overlay is shown over parent if the query is still running
+    after LOADING_INDICATOR_DELAY ms. Navigating to another screen cancels
+    the request via its channel.
+    """
+    indicator = {}
+    render = render_timings.request_started()
+
+    def timed():
+        # Worker time outside the database is data shaping
+        _query_context.query_ms = 0.0
+        started = time.perf_counter()
         try:
-            cursor.execute("INSERT INTO users (username, password, role, email) VALUES (%s, %s, %s, %s)", 
-                          (username, pwd, role, email))
-            db.commit()
-            
-            # Log activity
-            user_id = cursor.lastrowid
-            cursor.execute("INSERT INTO activity_log (user_id, activity) VALUES (%s, %s)",
-                           (user_id, f"User {username} registered as {role}"))
-            db.commit()
-            
-            show_notification(register_window, "User registered successfully!", "success")
-            
-            # Create success animation
-            success_animation(register_window)
-            
-            register_window.after(2000, register_window.destroy)
-        except mysql.connector.IntegrityError:
-            show_notification(register_window, "Username already exists", "danger")
+            return func()
         finally:
-            db.close()
+            if render is not None:
+                render.add("shaping", (time.perf_counter() - started) * 1000 - _query_context.query_ms)
+            _query_context.query_ms = None
 
-    # Registration Window Setup
-    register_window = tk.Toplevel()
-    register_window.title("Register New User")
-    register_window.geometry("600x600")
-    register_window.configure(bg=COLORS["light"])
-        
-    # Title
-    title_frame = tk.Frame(register_window, bg=COLORS["primary"], padx=10, pady=10)
-    title_frame.pack(fill=tk.X)
-    
-    title_label = tk.Label(title_frame, text="Register New User", font=("Arial", 16, "bold"), 
-                         bg=COLORS["primary"], fg=COLORS["light"])
-    title_label.pack()
-    
-    # Form
-    form_frame = tk.Frame(register_window, bg=COLORS["light"], padx=20, pady=20)
-    form_frame.pack(fill=tk.BOTH, expand=True)
-    
-    # Username
-    tk.Label(form_frame, text="Username:", bg=COLORS["light"], font=("Arial", 12)).grid(row=0, column=0, sticky="w", pady=10)
+    def show_indicator():
+        indicator["overlay"] = loading_animation(parent, message)
+
+    show_id = parent.after(LOADING_INDICATOR_DELAY, show_indicator)
+
+    def finish():
+        try:
+            parent.after_cancel(show_id)
+        except tk.TclError:
+            pass
+        overlay = indicator.get("overlay")
+        if overlay is not None and overlay.winfo_exists():
+            overlay.destroy()
+
+    def done(result):
+        finish()
+        if parent.winfo_exists():
+            with render_phase("build"):
+                on_done(result)
+        render_timings.request_finished(render)
+
+    def failed(err):
+        finish()
+        render_timings.request_finished(render)
+        messagebox.showerror("Database Error", f"Failed to load data: {err}")
+
+    def cancelled():
+        finish()
+        render_timings.request_finished(render)
+
+    return query_executor.submit(timed, done, failed, channel, on_cancel=cancelled)
+
+
+def navigate(view, parent):
+    """Switch the content area to another screen, dropping queries for the old one"""
+    global active_view
+    render = render_timings.start(view.__name__)
+    query_executor.cancel("content")
+    active_view = view.__name__
+    with render_phase("build"):
+        view(parent)
+    render_timings.built(render)
+
+
+# Screen render timing
+# navigate() times each visit to a screen from the click until the results of
+# its last background query are drawn, split into query (database), shaping
+# (worker time outside the database), build (Tk widgets) and chart (matplotlib)
+# time. Time in nested phases is only counted once, in the innermost phase.
+RENDER_HISTORY = 50      # Visits kept per screen for the latency report
+PROFILE_DIR = "profiles"
+profile_screens = False  # Capture a cProfile of every screen render; toggled in Settings
+
+
+class ScreenRender:
+    """Timing of one visit to a screen"""
+
+    def __init__(self, view):
+        self.view = view
+        self.started = time.perf_counter()
+        self.phases = {"query": 0.0, "shaping": 0.0, "build": 0.0, "chart": 0.0}
+        self.pending = 0     # run_query requests not yet drawn
+        self.built = False
+        self.profiler = None
+        self._nested = []    # Tk thread only: time spent in phases nested in each open phase
+        self._lock = threading.Lock()
+
+    def add(self, name, ms):
+        with self._lock:
+            self.phases[name] += max(ms, 0.0)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.add(name, elapsed - self._nested.pop())
+            if self._nested:
+                self._nested[-1] += elapsed
+
+
+class RenderTimings:
+    """Rolling per-screen latency samples and the visit currently being timed"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}  # view -> deque of (total_ms, phases)
+        self.current = None
+        self.last_profile = None
+
+    def start(self, view):
+        self._stop_profiler(self.current)  # A visit left before it finished is not recorded
+        render = self.current = ScreenRender(view)
+        if profile_screens:
+            render.profiler = cProfile.Profile()
+            render.profiler.enable()
+        return render
+
+    def add_query(self, view, ms):
+        in_worker = getattr(_query_context, "query_ms", None) is not None
+        if in_worker:
+            _query_context.query_ms += ms
+        render = self.current
+        if render is None or render.view != view:
+            return
+        render.add("query", ms)
+        if not in_worker and threading.current_thread() is threading.main_thread() and render._nested:
+            render._nested[-1] += ms  # Synchronous query inside a build phase
+
+    def request_started(self):
+        render = self.current
+        if render is not None:
+            render.pending += 1
+        return render
+
+    def request_finished(self, render):
+        if render is not None:
+            render.pending -= 1
+            self._complete_if_done(render)
+
+    def built(self, render):
+        render.built = True
+        self._complete_if_done(render)
+
+    def _complete_if_done(self, render):
+        if render is not self.current or not render.built or render.pending > 0:
+            return
+        self.current = None
+        total = (time.perf_counter() - render.started) * 1000
+        with self._lock:
+            samples = self._samples.setdefault(render.view, deque(maxlen=RENDER_HISTORY))
+            samples.append((total, dict(render.phases)))
+        if render.profiler is not None:
+            render.profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{render.view}_{datetime.now():%Y%m%d_%H%M%S}.prof")
+            render.profiler.dump_stats(path)
+            self.last_profile = path
+
+    def _stop_profiler(self, render):
+        if render is not None and render.profiler is not None:
+            render.profiler.disable()
+
+    def report(self):
+        """Per screen: visits, median and p95 total ms, and mean ms per phase"""
+        with self._lock:
+            samples = {view: list(visits) for view, visits in self._samples.items()}
+        report = []
+        for view, visits in sorted(samples.items()):
+            totals = sorted(total for total, _ in visits)
+            report.append({
+                "view": view,
+                "visits": len(visits),
+                "median_ms": totals[len(totals) // 2],
+                "p95_ms": totals[min(len(totals) - 1, int(len(totals) * 0.95))],
+                "phases": {name: sum(phases[name] for _, phases in visits) / len(visits)
+                           for name in visits[0][1]}
+            })
+        return report
+
+
+render_timings = RenderTimings()
+
+
+def render_phase(name):
+    """Attribute the enclosed Tk work to a phase of the screen being timed"""
+    render = render_timings.current
+    return render.phase(name) if render is not None else nullcontext()
+
+
+# Reference data cache
+REFERENCE_CACHE_TTL = 300  # Seconds before cached reference data is re-read
+DEFAULT_CATEGORIES = ["T-Shirts", "Pants", "Dresses", "Jackets", "Accessories"]
+
+
+class TTLCache:
+    """Thread-safe cache of loaded values that expire after a TTL
+
+    Values are loaded on a miss by the loader passed to get(). Writers call
+    invalidate() for the keys they change, so readers never wait out the
+    TTL after a local edit.
+    """
+
+    def __init__(self, ttl=REFERENCE_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._stats["hits"] += 1
+                return entry[0]
+            self._stats["misses"] += 1
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, now + self.ttl)
+        return value
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or everything when called without arguments"""
+        with self._lock:
+            for key in keys or list(self._entries):
+                if self._entries.pop(key, None) is not None:
+                    self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+reference_cache = TTLCache()
+
+# Stock cache
+# Stock levels are read far more often than they change, and a few hot SKUs take
+# most of the reads. Local writers drop entries as soon as they commit; writes
+# made by other processes are picked up by a sweep on a background thread that
+# re-reads only the garments whose last_updated has moved. A cached level can
+# therefore trail another process's write by up to STOCK_SYNC_INTERVAL - fine
+# for display and pre-checks, never for the decision itself: record_sale and
+# create_order re-check stock under a row lock.
+STOCK_CACHE_SIZE = 10000    # Garments kept; the least recently read are evicted beyond this
+STOCK_SYNC_INTERVAL = 1.0   # Seconds between sweeps for changes made by other processes
+# last_updated is stamped when a transaction's UPDATE runs, not when it commits,
+# so each sweep also re-scans this many seconds before the previous one. It must
+# be longer than the longest transaction that writes garments.
+STOCK_SYNC_OVERLAP = 60
+STOCK_LEVEL_QUERY = "SELECT id, quantity, reserved_quantity, last_updated FROM garments WHERE {filters}"
+
+StockLevel = namedtuple("StockLevel", "garment_id quantity reserved available version")
+
+
+class StockCache:
+    """Read-through LRU cache of per-garment stock levels
+
+    Every writer of garments.quantity or reserved_quantity calls invalidate()
+    after its commit. A load that overlapped an invalidation is returned but
+    not stored, so a level read before a sale is never cached after it. Each
+    entry keeps the row's last_updated as its version; sync() drops entries
+    whose row has a different version, so writes from other processes are
+    seen within sync_interval of their commit. The sweep runs on its own
+    thread, started by the first read, so reads never wait for it.
+    """
+
+    def __init__(self, size=STOCK_CACHE_SIZE, sync_interval=STOCK_SYNC_INTERVAL):
+        self.size = size
+        self.sync_interval = sync_interval
+        self._entries = OrderedDict()  # garment id -> StockLevel, least recently read first
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._writes = 0               # Bumped by invalidate(); checked before storing a load
+        self._watermark = None         # Server time of the last sweep
+        self._thread = None
+        self._closing = threading.Event()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "synced": 0,
+                       "sync_errors": 0}
+
+    def get(self, garment_id):
+        """StockLevel of one garment, or None if it does not exist"""
+        return self.get_many([garment_id]).get(int(garment_id))
+
+    def get_many(self, garment_ids):
+        """{garment id: StockLevel} for those of garment_ids that exist"""
+        self._start_sync()
+        ids = {int(garment_id) for garment_id in garment_ids}
+        found = {}
+        with self._lock:
+            for garment_id in ids:
+                level = self._entries.get(garment_id)
+                if level is not None:
+                    self._entries.move_to_end(garment_id)
+                    found[garment_id] = level
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(ids) - len(found)
+            writes = self._writes
+
+        missing = sorted(ids.difference(found))
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            loaded = self._levels(fetch_all(STOCK_LEVEL_QUERY.format(filters=f"id IN ({placeholders})"), missing))
+            self._store(loaded, writes)
+            found.update((level.garment_id, level) for level in loaded)
+        return found
+
+    def invalidate(self, garment_ids=None):
+        """Drop the given garments, or every entry when called without arguments"""
+        with self._lock:
+            self._writes += 1
+            if garment_ids is None:
+                self._stats["invalidations"] += len(self._entries)
+                self._entries.clear()
+                return
+            for garment_id in garment_ids:
+                if self._entries.pop(int(garment_id), None) is not None:
+                    self._stats["invalidations"] += 1
+
+    def sync(self):
+        """Drop cached garments changed since the last sweep, by this or any other process"""
+        with self._sync_lock, db_pool.connection() as db:
+            cursor = db.cursor()
+            cursor.execute("SELECT NOW()")
+            now = cursor.fetchone()[0]
+            # Rows stamped before the last sweep may have committed after it. The
+            # first sweep looks back the same way, over the entries loaded before it.
+            since = (self._watermark or now) - timedelta(seconds=STOCK_SYNC_OVERLAP)
+            cursor.execute(STOCK_LEVEL_QUERY.format(filters="last_updated >= %s"), (since,))
+            changed = self._levels(cursor.fetchall())
+            self._watermark = now
+
+        # Dropping is always safe; the next read loads the current level
+        with self._lock:
+            for level in changed:
+                cached = self._entries.get(level.garment_id)
+                if cached is not None and cached != level:
+                    del self._entries[level.garment_id]
+                    self._stats["synced"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Stop the background sweep"""
+        self._closing.set()
+
+    def _start_sync(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._sync_loop, name="stock-sync", daemon=True)
+                    self._thread.start()
+
+    def _sync_loop(self):
+        while not self._closing.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception:
+                # Database unavailable; the next sweep starts from the same watermark
+                with self._lock:
+                    self._stats["sync_errors"] += 1
+
+    @staticmethod
+    def _levels(rows):
+        return [StockLevel(garment_id, quantity, reserved, quantity - reserved, version)
+                for garment_id, quantity, reserved, version in rows]
+
+    def _store(self, levels, writes):
+        with self._lock:
+            if writes != self._writes:
+                return  # A writer committed while these were being read
+            for level in levels:
+                self._entries[level.garment_id] = level
+                self._entries.move_to_end(level.garment_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+
+stock_cache = StockCache()
+
+
+def get_settings():
+    """setting_name -> setting_value"""
+    return reference_cache.get("settings", lambda: dict(fetch_all("SELECT setting_name, setting_value FROM settings")))
+
+def get_suppliers():
+    """[(id, supplier_name)] for supplier pickers"""
+    return reference_cache.get("suppliers", lambda: fetch_all("SELECT id, supplier_name FROM suppliers ORDER BY supplier_name"))
+
+def get_supplier_rows():
+    """Full supplier rows for the suppliers screen"""
+    return reference_cache.get("supplier_rows",
+                               lambda: fetch_rows(SupplierRow, SUPPLIERS_QUERY.format(filters="")))
+
+def get_categories():
+    """Categories currently in stock, or the default list for an empty catalogue"""
+    def load():
+        rows = fetch_all("SELECT category FROM inventory_summary WHERE item_count > 0 ORDER BY category")
+        return [row[0] for row in rows] or list(DEFAULT_CATEGORIES)
+    return reference_cache.get("categories", load)
+
+
+# Activity log writer
+# Audit entries are queued in memory and written by one background thread in
+# multi-row inserts, so mutating actions don't pay an extra INSERT and commit.
+ACTIVITY_BATCH_SIZE = 200      # Flush once this many entries are waiting
+ACTIVITY_FLUSH_INTERVAL = 1.0  # ... or this many seconds after the first one
+ACTIVITY_INSERT_QUERY = "INSERT INTO activity_log (user_id, activity, timestamp) VALUES (%s, %s, %s)"
+
+
+class ActivityLogWriter:
+    """Batches activity_log inserts on a background thread
+
+    Entries keep the time they were logged, not the time they were flushed.
+    close() drains the queue; it is registered with atexit so a clean exit
+    never loses entries.
+    """
+
+    def __init__(self, batch_size=ACTIVITY_BATCH_SIZE, interval=ACTIVITY_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closing = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"logged": 0, "written": 0, "flushes": 0, "errors": 0,
+                       "max_depth": 0, "last_flush_ms": 0.0, "total_flush_ms": 0.0}
+
+    def log(self, user_id, activity):
+        with self._lock:
+            if self._closing.is_set():
+                # Too late for the background thread, write synchronously
+                self._write([(user_id, activity, datetime.now())])
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+                self._thread.start()
+            self._queue.put((user_id, activity, datetime.now()))
+            self._stats["logged"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = time.monotonic() + self.interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        """Insert a batch, retrying while the database is unavailable"""
+        while True:
+            started = time.monotonic()
+            try:
+                with db_pool.connection() as db:
+                    cursor = db.cursor()
+                    cursor.executemany(ACTIVITY_INSERT_QUERY, batch)
+                    db.commit()
+            except mysql.connector.Error as err:
+                self._stats["errors"] += 1
+                if self._closing.is_set():
+                    # Last chance on shutdown - keep the entries rather than drop them silently
+                    print(f"Could not write {len(batch)} activity log entries: {err}", file=sys.stderr)
+                    for user_id, activity, timestamp in batch:
+                        print(f"{timestamp:%Y-%m-%d %H:%M:%S}\t{user_id}\t{activity}", file=sys.stderr)
+                    return
+                time.sleep(self.interval)
+                continue
+
+            elapsed = (time.monotonic() - started) * 1000
+            self._stats["written"] += len(batch)
+            self._stats["flushes"] += 1
+            self._stats["last_flush_ms"] = elapsed
+            self._stats["total_flush_ms"] += elapsed
+            return
+
+    def close(self, timeout=30):
+        """Flush everything queued and stop the background thread"""
+        with self._lock:
+            if self._closing.is_set():
+                return
+            self._closing.set()
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_flush_ms"] = stats["total_flush_ms"] / stats["flushes"] if stats["flushes"] else 0.0
+        return stats
+
+
+activity_writer = ActivityLogWriter()
+atexit.register(activity_writer.close)
+
+
+def log_activity(user_id, activity):
+    """Queue an activity_log entry; it is written in the background"""
+    activity_writer.log(user_id, activity)
+
+
+# Low-stock alerts
+# One alert per garment below its threshold. Writers report the new stock of
+# the garments they touched after commit, so alerts follow sales and shipments
+# without rescanning garments; refresh() re-reads them only at start-up and
+# after thresholds change. Thresholds can be overridden per category or per
+# garment with "low_stock_threshold.category.<name>" and
+# "low_stock_threshold.garment.<id>" settings.
+THRESHOLD_SETTING_PREFIX = "low_stock_threshold."
+ALERT_POLL_INTERVAL = 1000  # ms between refreshes of the alert count in the sidebar
+
+def get_stock_thresholds():
+    """(per-category, per-garment) threshold overrides from settings"""
+    by_category, by_garment = {}, {}
+    for name, value in get_settings().items():
+        if not name.startswith(THRESHOLD_SETTING_PREFIX):
+            continue
+        scope, _, key = name[len(THRESHOLD_SETTING_PREFIX):].partition(".")
+        if scope == "category":
+            by_category[key] = int(value)
+        elif scope == "garment":
+            by_garment[int(key)] = int(value)
+    return by_category, by_garment
+
+def set_stock_threshold(scope, key, value):
+    """Save a "category" or "garment" threshold override; None removes it
+
+    The dashboard's low-stock counts are recounted in the same transaction.
+    """
+    name = f"{THRESHOLD_SETTING_PREFIX}{scope}.{key}"
+    with db_pool.connection() as db:
+        cursor = db.cursor()
+        if value is None:
+            cursor.execute("DELETE FROM settings WHERE setting_name = %s", (name,))
+        else:
+            cursor.execute("""
+                INSERT INTO settings (setting_name, setting_value) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE setting_value = VALUES(setting_value)
+            """, (name, str(value)))
+        recount_low_stock(cursor)
+        db.commit()
+    reference_cache.invalidate("settings")
+    low_stock_alerts.refresh()
+
+
+class LowStockAlerts:
+    """Active low-stock alerts, at most one per garment
+
+    Dismissed alerts stay hidden until the garment is restocked above its
+    threshold, so the same shortage is never reported twice.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}        # garment_id -> alert
+        self._dismissed = set()  # garment ids hidden until they recover
+        self._thresholds = ({}, {})
+        self.version = 0         # Bumped on every change, for screens polling for updates
+
+    def overrides(self):
+        """(per-category, per-garment) thresholds currently in effect"""
+        return self._thresholds
+
+    def threshold(self, garment_id, category):
+        by_category, by_garment = self._thresholds
+        return by_garment.get(garment_id, by_category.get(category, inventory_threshold))
+
+    def refresh(self):
+        """Reload thresholds and rebuild the alerts from the database"""
+        thresholds = get_stock_thresholds()
+        highest = max([inventory_threshold, *thresholds[0].values(), *thresholds[1].values()])
+        # One range scan on idx_garments_quantity, narrowed per garment below
+        rows = fetch_all(LOW_STOCK_QUERY, (highest,))
+        with self._lock:
+            self._thresholds = thresholds
+            previous, self._active = self._active, {}
+            for garment_id, name, category, quantity in rows:
+                if quantity < self.threshold(garment_id, category):
+                    alert = self._raise(garment_id, name, category, quantity, previous.get(garment_id))
+                    self._active[garment_id] = alert
+            self._dismissed &= set(self._active)
+            self.version += 1
+
+    def stock_changed(self, changes):
+        """Apply committed stock levels, given as [(garment_id, name, category, quantity)]"""
+        with self._lock:
+            changed = False
+            for garment_id, name, category, quantity in changes:
+                alert = self._active.get(garment_id)
+                if quantity < self.threshold(garment_id, category):
+                    if alert is None or alert["quantity"] != quantity:
+                        self._active[garment_id] = self._raise(garment_id, name, category, quantity, alert)
+                        changed = True
+                elif alert is not None:
+                    del self._active[garment_id]
+                    self._dismissed.discard(garment_id)
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def _raise(self, garment_id, name, category, quantity, existing=None):
+        if existing is not None:
+            # Still the same shortage - update it rather than alerting again
+            return dict(existing, quantity=quantity)
+        notifications.append({
+            "message": f"Low inventory alert: {name} (only {quantity} left)",
+            "type": "warning",
+            "timestamp": datetime.now()
+        })
+        return {"garment_id": garment_id, "name": name, "category": category, "quantity": quantity,
+                "threshold": self.threshold(garment_id, category), "since": datetime.now()}
+
+    def dismiss(self, garment_ids):
+        with self._lock:
+            self._dismissed.update(garment_id for garment_id in garment_ids if garment_id in self._active)
+            self.version += 1
+
+    def active(self):
+        """Alerts not dismissed, lowest stock first"""
+        with self._lock:
+            alerts = [alert for garment_id, alert in self._active.items() if garment_id not in self._dismissed]
+        return sorted(alerts, key=lambda alert: (alert["quantity"], alert["name"]))
+
+
+low_stock_alerts = LowStockAlerts()
+
+
+# Load settings from the database
+def load_settings(interactive=True):
+    """Read the saved settings into the module globals; interactive=False raises errors instead of showing them"""
+    global inventory_threshold, inventory_page_size, activity_retention_months, slow_query_ms
+    try:
+        settings = get_settings()
+    except mysql.connector.Error as err:
+        if not interactive:
+            raise
+        messagebox.showerror("Database Connection Error", f"Failed to connect to database: {err}")
+        return
+
+    for name, value in settings.items():
+        if name == "inventory_threshold":
+            inventory_threshold = int(value)
+        elif name == "inventory_page_size":
+            inventory_page_size = int(value)
+        elif name == "activity_retention_months":
+            activity_retention_months = int(value)
+        elif name == "slow_query_ms":
+            slow_query_ms = int(value)
+
+# Authentication and User Management
+def register_user():
+    def submit_registration():
+        username = reg_username.get()
+        pwd = reg_password.get()
+        role = reg_role.get()
+        email = reg_email.get()
+        
+        if not username or not pwd or not role or not email:
+            show_notification(register_window, "All fields are required", "warning")
+            return
+        
+        if not terms_var.get():
+            show_notification(register_window, "You must accept Terms & Conditions", "warning")
+            return
+            
+        db = connect_db()
+        if not db:
+            return
+            
+        cursor = db.cursor()
+        try:
+            cursor.execute("INSERT INTO users (username, password, role, email) VALUES (%s, %s, %s, %s)", 
+                          (username, pwd, role, email))
+            db.commit()
+            
+            # Log activity
+            log_activity(cursor.lastrowid, f"User {username} registered as {role}")
+            
+            show_notification(register_window, "User registered successfully!", "success")
+            
+            # Create success animation
+            success_animation(register_window)
+            
+            register_window.after(2000, register_window.destroy)
+        except mysql.connector.IntegrityError:
+            show_notification(register_window, "Username already exists", "danger")
+        finally:
+            db.close()
+
+    # Registration Window Setup
+    register_window = tk.Toplevel()
+    register_window.title("Register New User")
+    register_window.geometry("600x600")
+    register_window.configure(bg=COLORS["light"])
+        
+    # Title
+    title_frame = tk.Frame(register_window, bg=COLORS["primary"], padx=10, pady=10)
+    title_frame.pack(fill=tk.X)
+    
+    title_label = tk.Label(title_frame, text="Register New User", font=("Arial", 16, "bold"), 
+                         bg=COLORS["primary"], fg=COLORS["light"])
+    title_label.pack()
+    
+    # Form
+    form_frame = tk.Frame(register_window, bg=COLORS["light"], padx=20, pady=20)
+    form_frame.pack(fill=tk.BOTH, expand=True)
+    
+    # Username
+    tk.Label(form_frame, text="Username:", bg=COLORS["light"], font=("Arial", 12)).grid(row=0, column=0, sticky="w", pady=10)
     reg_username = tk.Entry(form_frame, font=("Arial", 12), width=30)
     reg_username.grid(row=0, column=1, pady=10)
     
@@ -332,23 +1996,24 @@ def show_login():
             show_notification(login_window, "Username and password are required", "warning")
             return
             
-        db = connect_db()
-        if not db:
-            return
-            
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM users WHERE username = %s AND password = %s", (username, pwd))
-        user = cursor.fetchone()
-        
+        with db_connection() as db:
+            if not db:
+                return
+
+            cursor = db.cursor(dictionary=True)
+            cursor.execute("SELECT * FROM users WHERE username = %s AND password = %s", (username, pwd))
+            user = cursor.fetchone()
+
+            if user:
+                # Update last login
+                cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (user['id'],))
+
+                db.commit()
+
+                # Log activity
+                log_activity(user['id'], "User logged in")
+
         if user:
-            # Update last login
-            cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (user['id'],))
-            
-            # Log activity
-            cursor.execute("INSERT INTO activity_log (user_id, activity) VALUES (%s, %s)",
-                          (user['id'], "User logged in"))
-            db.commit()
-            
             global current_user, current_role
             current_user = user
             current_role = user['role']
@@ -363,8 +2028,6 @@ def show_login():
             show_notification(login_window, "Invalid username or password", "danger")
             # Shake animation for failed login
             shake_animation(login_frame)
-            
-        db.close()
     
     # Setup login window
     login_window = tk.Tk()
@@ -494,9 +2157,9 @@ def view_suppliers(parent):
     style.configure("Treeview", font=("Montserrat", 12), rowheight=30)
     style.configure("Treeview.Heading", font=("Montserrat", 12, "bold"))
 
-    suppliers_table = ttk.Treeview(table_frame, columns=columns, show="headings",
-                                  yscrollcommand=table_scroll_y.set,
-                                  xscrollcommand=table_scroll_x.set)
+    suppliers_table = VirtualTreeview(table_frame, columns=columns, show="headings", sortable=True,
+                                      yscrollcommand=table_scroll_y.set,
+                                      xscrollcommand=table_scroll_x.set)
 
     table_scroll_y.config(command=suppliers_table.yview)
     table_scroll_x.config(command=suppliers_table.xview)
@@ -526,16 +2189,23 @@ def view_suppliers(parent):
     suppliers_table.pack(fill=tk.BOTH, expand=True)
 
     # Load suppliers data
-    db = connect_db()
-    if db:
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM suppliers")
-        records = cursor.fetchall()
-        db.close()
+    def load_suppliers():
+        term = search_entry.get().strip()
+        if term == "Search suppliers...":
+            term = ""
+        run_query(table_frame, lambda: supplier_repo.search(term), suppliers_table.set_rows)
 
-        # Populate table with data
-        for record in records:
-            suppliers_table.insert("", tk.END, values=record)
+    # Live search - wait for a pause in typing before querying
+    pending_search = {"id": None}
+
+    def on_search_key(event):
+        if pending_search["id"]:
+            search_entry.after_cancel(pending_search["id"])
+        pending_search["id"] = search_entry.after(SEARCH_DEBOUNCE_MS, load_suppliers)
+
+    search_entry.bind("<KeyRelease>", on_search_key)
+
+    load_suppliers()
 
 def show_dashboard(parent):
     clear_frame(parent)
@@ -615,6 +2285,15 @@ def view_sales_reports(parent):
     clear_frame(parent)
     create_title_bar(parent, "Sales Reports")
 
+    # Toolbar
+    toolbar = tk.Frame(parent, bg=COLORS["light"])
+    toolbar.pack(fill=tk.X, padx=20)
+
+    export_btn = tk.Button(toolbar, text="Export", font=("Montserrat", 12),
+                         bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5,
+                         command=lambda: export_dialog(parent, "sales"))
+    export_btn.pack(side=tk.RIGHT)
+
     # Create sales table
     table_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=20)
     table_frame.pack(fill=tk.BOTH, expand=True)
@@ -633,9 +2312,15 @@ def view_sales_reports(parent):
     style.configure("Treeview", font=("Montserrat", 12), rowheight=30)
     style.configure("Treeview.Heading", font=("Montserrat", 12, "bold"))
 
-    sales_table = ttk.Treeview(table_frame, columns=columns, show="headings",
-                              yscrollcommand=table_scroll_y.set,
-                              xscrollcommand=table_scroll_x.set)
+    def format_sale_row(sale):
+        return (sale.id, sale.garment_name, sale.quantity, f"Rs{sale.sale_price:.2f}",
+                f"Rs{sale.profit or 0:.2f}", f"{sale.sale_date:%Y-%m-%d %H:%M}" if sale.sale_date else "",
+                sale.username)
+
+    sales_table = VirtualTreeview(table_frame, columns=columns, show="headings",
+                                  formatter=format_sale_row, sortable=True,
+                                  yscrollcommand=table_scroll_y.set,
+                                  xscrollcommand=table_scroll_x.set)
 
     table_scroll_y.config(command=sales_table.yview)
     table_scroll_x.config(command=sales_table.xview)
@@ -665,21 +2350,7 @@ def view_sales_reports(parent):
     sales_table.pack(fill=tk.BOTH, expand=True)
 
     # Load sales data
-    db = connect_db()
-    if db:
-        cursor = db.cursor()
-        cursor.execute("""
-            SELECT s.id, g.garment_name, s.quantity, s.sale_price, s.profit, s.sale_date, u.username
-            FROM sales s
-            JOIN garments g ON s.garment_id = g.id
-            JOIN users u ON s.user_id = u.id
-        """)
-        records = cursor.fetchall()
-        db.close()
-
-        # Populate table with data
-        for record in records:
-            sales_table.insert("", tk.END, values=record)
+    run_query(table_frame, sale_repo.report, sales_table.set_rows)
 
 def manage_users(parent):
     clear_frame(parent)
@@ -729,51 +2400,360 @@ def manage_users(parent):
     users_table.pack(fill=tk.BOTH, expand=True)
 
     # Load users data
-    db = connect_db()
-    if db:
-        cursor = db.cursor()
-        cursor.execute("SELECT id, username, role, email, last_login FROM users")
-        records = cursor.fetchall()
-        db.close()
-
-        # Populate table with data
+    def show_users(records):
         for record in records:
             users_table.insert("", tk.END, values=record)
 
-def manage_settings(parent):
+    run_query(table_frame, lambda: fetch_all("SELECT id, username, role, email, last_login FROM users"),
+              show_users)
+
+# Activity log viewer
+ACTIVITY_PAGE_SIZE = 100
+ACTIVITY_PERIODS = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last 12 months": 365}
+def view_activity_log(parent):
     clear_frame(parent)
-    create_title_bar(parent, "Settings")
+    create_title_bar(parent, "Activity Log")
 
-    # Create settings form
-    form_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=20)
-    form_frame.pack(fill=tk.BOTH, expand=True)
+    # Toolbar
+    toolbar = tk.Frame(parent, bg=COLORS["light"])
+    toolbar.pack(fill=tk.X, padx=20)
 
-    # Inventory Threshold
-    tk.Label(form_frame, text="Inventory Threshold:", font=("Montserrat", 12),
-            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=0, column=0, sticky="w", pady=10)
-    threshold_entry = tk.Entry(form_frame, font=("Montserrat", 12), width=10)
-    threshold_entry.grid(row=0, column=1, sticky="w", pady=10)
-    threshold_entry.insert(0, str(inventory_threshold))
+    tk.Label(toolbar, text="Period:", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).pack(side=tk.LEFT, padx=(0, 5))
+    period = ttk.Combobox(toolbar, values=list(ACTIVITY_PERIODS), font=("Montserrat", 12),
+                         width=15, state="readonly")
+    period.current(0)
+    period.pack(side=tk.LEFT)
 
-    # Save button
-    def save_settings():
-        new_threshold = int(threshold_entry.get())
-        global inventory_threshold
-        inventory_threshold = new_threshold
+    older_btn = tk.Button(toolbar, text="Older ›", font=("Montserrat", 12),
+                         bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5)
+    older_btn.pack(side=tk.RIGHT)
+    page_label = tk.Label(toolbar, text="Page 1", font=("Montserrat", 12),
+                         bg=COLORS["light"], fg=COLORS["dark"])
+    page_label.pack(side=tk.RIGHT, padx=10)
+    newer_btn = tk.Button(toolbar, text="‹ Newer", font=("Montserrat", 12),
+                         bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5)
+    newer_btn.pack(side=tk.RIGHT)
 
-        db = connect_db()
-        if db:
-            cursor = db.cursor()
-            cursor.execute("UPDATE settings SET setting_value = %s WHERE setting_name = 'inventory_threshold'",
-                           (new_threshold,))
-            db.commit()
-            db.close()
-            show_notification(parent, "Settings saved successfully!", "success")
+    # Activity table
+    table_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=20)
+    table_frame.pack(fill=tk.BOTH, expand=True)
+
+    table_scroll_y = tk.Scrollbar(table_frame)
+    table_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+
+    columns = ("Time", "User", "Activity")
+    activity_table = VirtualTreeview(table_frame, columns=columns, show="headings",
+                                     yscrollcommand=table_scroll_y.set,
+                                     formatter=lambda row: row[1:])
+    table_scroll_y.config(command=activity_table.yview)
+
+    activity_table.heading("Time", text="Time")
+    activity_table.column("Time", width=180, anchor="w")
+
+    activity_table.heading("User", text="User")
+    activity_table.column("User", width=150, anchor="w")
+
+    activity_table.heading("Activity", text="Activity")
+    activity_table.column("Activity", width=600, anchor="w")
+
+    activity_table.pack(fill=tk.BOTH, expand=True)
+
+    # anchors[n] is the (timestamp, id) page n continues after; page 0 starts at the newest
+    anchors = [None]
+
+    def load_page():
+        since = datetime.now() - timedelta(days=ACTIVITY_PERIODS[period.get()])
+        before = anchors[-1]
+
+        def show(rows):
+            activity_table.set_rows(rows)
+            page_label.config(text=f"Page {len(anchors)}")
+            newer_btn.config(state=tk.NORMAL if len(anchors) > 1 else tk.DISABLED)
+            older_btn.config(state=tk.NORMAL if len(rows) == ACTIVITY_PAGE_SIZE else tk.DISABLED)
+
+        run_query(table_frame, lambda: activity_repo.page(since, before), show)
+
+    def older():
+        if activity_table.rows:
+            last = activity_table.rows[-1]
+            anchors.append((last.timestamp, last.id))
+            load_page()
+
+    def newer():
+        if len(anchors) > 1:
+            anchors.pop()
+            load_page()
+
+    def change_period(event=None):
+        del anchors[1:]
+        load_page()
+
+    older_btn.config(command=older)
+    newer_btn.config(command=newer)
+    period.bind("<<ComboboxSelected>>", change_period)
+    load_page()
+
+# Diagnostics
+DIAGNOSTICS_TOP_N = 25
+
+def view_diagnostics(parent):
+    clear_frame(parent)
+    create_title_bar(parent, "Diagnostics")
+
+    # Toolbar
+    toolbar = tk.Frame(parent, bg=COLORS["light"])
+    toolbar.pack(fill=tk.X, padx=20)
+
+    runtime_label = tk.Label(toolbar, text="", font=("Montserrat", 11), justify=tk.LEFT,
+                            bg=COLORS["light"], fg=COLORS["dark"])
+    runtime_label.pack(side=tk.LEFT)
+
+    tk.Button(toolbar, text="Reset", font=("Montserrat", 12),
+             bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5,
+             command=lambda: (query_stats.reset(), refresh())).pack(side=tk.RIGHT)
+    tk.Button(toolbar, text="Refresh", font=("Montserrat", 12),
+             bg=COLORS["primary"], fg="white", padx=15, pady=5,
+             command=lambda: refresh()).pack(side=tk.RIGHT, padx=5)
+
+    # Top statements by total time
+    tk.Label(parent, text=f"Top {DIAGNOSTICS_TOP_N} statements by total time", font=("Montserrat", 14, "bold"),
+            bg=COLORS["light"], fg=COLORS["primary"]).pack(anchor="w", padx=20, pady=(10, 0))
+    top_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=5)
+    top_frame.pack(fill=tk.BOTH, expand=True)
+
+    histogram_heading = " ".join(f"≤{bound}" for bound in QUERY_HISTOGRAM_BUCKETS) + " more"
+    top_columns = ("Statement", "Screens", "Calls", "Total ms", "Avg ms", "Max ms", "Rows", histogram_heading)
+    top_table = VirtualTreeview(
+        top_frame, columns=top_columns, show="headings", height=8,
+        formatter=lambda entry: (entry["sql"][:120], ", ".join(entry["views"]), entry["count"],
+                                 f"{entry['total_ms']:.1f}", f"{entry['total_ms'] / entry['count']:.1f}",
+                                 f"{entry['max_ms']:.1f}", entry["rows"],
+                                 " ".join(map(str, entry["histogram"]))))
+    for column, width in zip(top_columns, (420, 160, 60, 90, 80, 80, 80, 220)):
+        top_table.heading(column, text=column)
+        top_table.column(column, width=width, anchor="w")
+    top_table.pack(fill=tk.BOTH, expand=True)
+
+    # Slow statements with their plans
+    tk.Label(parent, text="Slow statements", font=("Montserrat", 14, "bold"),
+            bg=COLORS["light"], fg=COLORS["primary"]).pack(anchor="w", padx=20, pady=(10, 0))
+    slow_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=5)
+    slow_frame.pack(fill=tk.BOTH, expand=True)
+
+    slow_columns = ("Time", "Screen", "ms", "Rows", "Statement")
+    slow_table = VirtualTreeview(
+        slow_frame, columns=slow_columns, show="headings", height=6,
+        formatter=lambda slow: (f"{slow['time']:%H:%M:%S}", slow["view"], f"{slow['ms']:.1f}",
+                                slow["rows"], slow["sql"][:160]))
+    for column, width in zip(slow_columns, (90, 160, 80, 70, 700)):
+        slow_table.heading(column, text=column)
+        slow_table.column(column, width=width, anchor="w")
+    slow_table.pack(fill=tk.BOTH, expand=True)
+
+    plan_text = tk.Text(parent, font=("Courier", 10), height=6, wrap=tk.NONE)
+    plan_text.pack(fill=tk.X, padx=20, pady=(0, 10))
+
+    # Screen render times
+    tk.Label(parent, text=f"Screen render times (last {RENDER_HISTORY} visits, ms)", font=("Montserrat", 14, "bold"),
+            bg=COLORS["light"], fg=COLORS["primary"]).pack(anchor="w", padx=20, pady=(10, 0))
+    render_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=5)
+    render_frame.pack(fill=tk.BOTH, expand=True)
+
+    render_columns = ("Screen", "Visits", "Median", "P95", "Query", "Shaping", "Build", "Chart")
+    render_table = VirtualTreeview(
+        render_frame, columns=render_columns, show="headings", height=6,
+        formatter=lambda row: (row["view"], row["visits"], f"{row['median_ms']:.0f}", f"{row['p95_ms']:.0f}",
+                               *(f"{row['phases'][name]:.0f}" for name in ("query", "shaping", "build", "chart"))))
+    for column, width in zip(render_columns, (200, 70, 90, 90, 90, 90, 90, 90)):
+        render_table.heading(column, text=column)
+        render_table.column(column, width=width, anchor="w")
+    render_table.pack(fill=tk.BOTH, expand=True)
+
+    def show_plan(event=None):
+        plan_text.delete("1.0", tk.END)
+        for slow in slow_table.selected_rows()[:1]:
+            plan_text.insert(tk.END, slow["sql"] + "\n\n")
+            if slow["plan"] is None:
+                plan_text.insert(tk.END, "No plan (not a SELECT, or EXPLAIN still running)")
+            for row in slow["plan"] or []:
+                plan_text.insert(tk.END, ", ".join(f"{key}={value}" for key, value in row.items()) + "\n")
+
+    slow_table.bind("<<TreeviewSelect>>", show_plan, add="+")
+
+    def refresh():
+        pool = db_pool.stats()
+        writer = activity_writer.stats()
+        cache = reference_cache.stats()
+        stock = stock_cache.stats()
+        runtime_label.config(text=(
+            f"Pool: {pool['in_use']}/{pool['size']} in use, hit rate {pool['hit_rate']:.0%}, "
+            f"{pool['waits']} waits   "
+            f"Activity log: {writer['queue_depth']} queued, avg flush {writer['avg_flush_ms']:.1f} ms   "
+            f"Cache: {cache['hits']} hits / {cache['misses']} misses   "
+            f"Stock cache: {stock['size']} SKUs, hit rate {stock['hit_rate']:.0%}   "
+            f"Slow threshold: {slow_query_ms} ms"
+            + (f"\nLast profile: {render_timings.last_profile}" if render_timings.last_profile else "")))
+        top_table.set_rows(query_stats.top(DIAGNOSTICS_TOP_N))
+        slow_table.set_rows(query_stats.slow_queries())
+        render_table.set_rows(render_timings.report())
+        plan_text.delete("1.0", tk.END)
+
+    refresh()
+
+def manage_settings(parent):
+    clear_frame(parent)
+    create_title_bar(parent, "Settings")
+
+    # Create settings form
+    form_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=20)
+    form_frame.pack(fill=tk.BOTH, expand=True)
+
+    # Inventory Threshold
+    tk.Label(form_frame, text="Inventory Threshold:", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=0, column=0, sticky="w", pady=10)
+    threshold_entry = tk.Entry(form_frame, font=("Montserrat", 12), width=10)
+    threshold_entry.grid(row=0, column=1, sticky="w", pady=10)
+    threshold_entry.insert(0, str(inventory_threshold))
+
+    # Activity log retention
+    tk.Label(form_frame, text="Keep Activity Log (months):", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=1, column=0, sticky="w", pady=10)
+    retention_entry = tk.Entry(form_frame, font=("Montserrat", 12), width=10)
+    retention_entry.grid(row=1, column=1, sticky="w", pady=10)
+    retention_entry.insert(0, str(activity_retention_months))
+
+    # Slow query threshold for the Diagnostics page
+    tk.Label(form_frame, text="Slow Query Threshold (ms):", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=2, column=0, sticky="w", pady=10)
+    slow_query_entry = tk.Entry(form_frame, font=("Montserrat", 12), width=10)
+    slow_query_entry.grid(row=2, column=1, sticky="w", pady=10)
+    slow_query_entry.insert(0, str(slow_query_ms))
+
+    # Save button
+    def save_settings():
+        try:
+            new_threshold = int(threshold_entry.get())
+            new_retention = int(retention_entry.get())
+            new_slow_query = int(slow_query_entry.get())
+        except ValueError:
+            show_notification(parent, "Settings must be whole numbers", "danger")
+            return
+        if new_threshold < 0 or new_retention < 1 or new_slow_query < 1:
+            show_notification(parent, "Threshold cannot be negative; retention and slow query "
+                                      "threshold must be at least 1", "warning")
+            return
+
+        global inventory_threshold, activity_retention_months, slow_query_ms
+        previous = (inventory_threshold, activity_retention_months, slow_query_ms)
+        threshold_changed = new_threshold != inventory_threshold
+        inventory_threshold = new_threshold
+        activity_retention_months = new_retention
+        slow_query_ms = new_slow_query
+
+        def write():
+            with db_pool.connection() as db:
+                cursor = db.cursor()
+                try:
+                    cursor.execute("UPDATE settings SET setting_value = %s WHERE setting_name = 'inventory_threshold'",
+                                   (new_threshold,))
+                    cursor.execute("UPDATE settings SET setting_value = %s WHERE setting_name = 'activity_retention_months'",
+                                   (new_retention,))
+                    cursor.execute("UPDATE settings SET setting_value = %s WHERE setting_name = 'slow_query_ms'",
+                                   (new_slow_query,))
+                    # Only the global threshold changes low-stock counts; the recount scans every garment
+                    if threshold_changed:
+                        recount_low_stock(cursor)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+            reference_cache.invalidate("settings")
+            if threshold_changed:
+                low_stock_alerts.refresh()
+
+        def failed(err):
+            # Nothing was saved, so keep using the previous values
+            global inventory_threshold, activity_retention_months, slow_query_ms
+            inventory_threshold, activity_retention_months, slow_query_ms = previous
+            show_notification(parent, f"Error saving settings: {err}", "danger")
+
+        query_executor.submit(write, lambda _: show_notification(parent, "Settings saved successfully!", "success"),
+                              failed)
 
     save_btn = tk.Button(form_frame, text="Save", font=("Montserrat", 12, "bold"),
                         bg=COLORS["primary"], fg="white", padx=20, pady=5,
                         command=save_settings)
-    save_btn.grid(row=1, column=0, columnspan=2, pady=20)
+    save_btn.grid(row=3, column=0, columnspan=2, pady=20)
+
+    # Retention job - archive months past the retention period and drop their partitions
+    def archive_now():
+        def done(archived):
+            if archived:
+                rows = sum(count for _, count, _ in archived)
+                show_notification(parent, f"Archived {rows} entries from {len(archived)} months "
+                                          f"to {ACTIVITY_ARCHIVE_DIR}", "success")
+            else:
+                show_notification(parent, "Nothing older than the retention period", "info")
+
+        def failed(err):
+            show_notification(parent, f"Archiving failed: {err}", "danger")
+
+        query_executor.submit(archive_activity_log, done, failed)
+
+    if current_role == "admin":
+        archive_btn = tk.Button(form_frame, text="Archive Old Activity", font=("Montserrat", 12),
+                               bg=COLORS["light"], fg=COLORS["primary"], padx=20, pady=5,
+                               command=archive_now)
+        archive_btn.grid(row=4, column=0, columnspan=2)
+
+    # Per-category low-stock thresholds
+    tk.Label(form_frame, text="Category Threshold:", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=5, column=0, sticky="w", pady=(30, 10))
+    category_combo = ttk.Combobox(form_frame, font=("Montserrat", 12), width=15, state="readonly")
+    category_combo.grid(row=5, column=1, sticky="w", pady=(30, 10))
+    category_threshold = tk.Entry(form_frame, font=("Montserrat", 12), width=10)
+    category_threshold.grid(row=5, column=2, sticky="w", padx=10, pady=(30, 10))
+
+    def show_category_threshold(event=None):
+        by_category, _ = low_stock_alerts.overrides()
+        category_threshold.delete(0, tk.END)
+        if category_combo.get() in by_category:
+            category_threshold.insert(0, str(by_category[category_combo.get()]))
+
+    def save_category_threshold():
+        category = category_combo.get()
+        if not category:
+            return
+        value = category_threshold.get().strip()
+        try:
+            threshold = int(value) if value else None
+        except ValueError:
+            show_notification(parent, "Threshold must be a whole number", "danger")
+            return
+        query_executor.submit(
+            lambda: set_stock_threshold("category", category, threshold),
+            lambda _: show_notification(parent, "Category threshold saved", "success"),
+            lambda err: show_notification(parent, f"Error: {err}", "danger"))
+
+    category_combo.bind("<<ComboboxSelected>>", show_category_threshold)
+    tk.Button(form_frame, text="Set", font=("Montserrat", 12),
+             bg=COLORS["primary"], fg="white", padx=15, pady=2,
+             command=save_category_threshold).grid(row=5, column=3, sticky="w", pady=(30, 10))
+    query_executor.submit(get_categories, lambda categories: category_combo.config(values=categories))
+
+    # Profiling mode - applies to this session only
+    profile_var = tk.BooleanVar(value=profile_screens)
+
+    def toggle_profiling():
+        global profile_screens
+        profile_screens = profile_var.get()
+        if profile_screens:
+            show_notification(parent, f"Screen renders will be profiled to {PROFILE_DIR}/", "info")
+
+    tk.Checkbutton(form_frame, text="Profile screen renders (cProfile)", variable=profile_var,
+                  command=toggle_profiling, font=("Montserrat", 12),
+                  bg=COLORS["light"], fg=COLORS["dark"]).grid(row=6, column=0, columnspan=2, sticky="w", pady=10)
 
                                             
 
@@ -790,11 +2770,10 @@ def shake_animation(widget, offset=10, repeats=5):
     widget._original_y = widget.winfo_y()
     shake(repeats, 1)
 
-def loading_animation(parent):
-    # Create a semi-transparent overlay
-    overlay = tk.Frame(parent, bg="#000000", bd=0, highlightthickness=0)
+def loading_animation(parent, message="Loading..."):
+    """Cover parent with a progress indicator; the caller destroys the returned overlay"""
+    overlay = tk.Frame(parent, bg=COLORS["light"], bd=0, highlightthickness=0)
     overlay.place(relx=0, rely=0, relwidth=1, relheight=1)
-    overlay.attributes("-alpha", 0.7)
     
     # Create a loading frame
     loading_frame = tk.Frame(overlay, bg=COLORS["light"], padx=40, pady=40,
@@ -802,28 +2781,20 @@ def loading_animation(parent):
     loading_frame.place(relx=0.5, rely=0.5, anchor="center")
     
     # Loading text
-    loading_label = tk.Label(loading_frame, text="Logging in...", font=("Montserrat", 18, "bold"),
+    loading_label = tk.Label(loading_frame, text=message, font=("Montserrat", 18, "bold"),
                             bg=COLORS["light"], fg=COLORS["primary"])
     loading_label.pack(pady=20)
     
-    # Progress bar
+    # Progress bar - indeterminate, runs until the overlay is destroyed
     style = ttk.Style()
-    style.theme_use('clam')
     style.configure("color.Horizontal.TProgressbar", background=COLORS["accent"])
     
     progress = ttk.Progressbar(loading_frame, style="color.Horizontal.TProgressbar", 
-                              length=300, mode='determinate')
+                              length=300, mode='indeterminate')
     progress.pack(pady=10)
+    progress.start(15)
     
-    # Simulate progress
-    def update_progress(val=0):
-        if val <= 100:
-            progress['value'] = val
-            parent.after(20, lambda: update_progress(val + 2))
-        else:
-            overlay.destroy()
-    
-    update_progress()
+    return overlay
 
 def success_animation(parent):
     # Create a success icon in the center of the screen
@@ -865,7 +2836,6 @@ def show_notification(parent, message, type="info"):
     }
     
     # Store notification for alerts page
-    global notifications
     notifications.append({
         "message": message,
         "type": type,
@@ -900,6 +2870,9 @@ def home_page(username, role):
     # Load settings
     load_settings()
     
+    # Deliver background query results through this window's event loop
+    query_executor.attach(home)
+    
     # Check for low inventory items and add notifications
     check_low_inventory()
     
@@ -941,13 +2914,17 @@ def home_page(username, role):
     
     # Create navigation buttons with icons
     nav_buttons = [
-        {"text": "Dashboard", "icon": "📊", "command": lambda: show_dashboard(content_frame)},
-        {"text": "Inventory", "icon": "📦", "command": lambda: display_inventory(content_frame)},
-        {"text": "Orders", "icon": "🛒", "command": lambda: view_orders(content_frame)},
-        {"text": "Suppliers", "icon": "🏭", "command": lambda: view_suppliers(content_frame)},
-        {"text": "Sales Reports", "icon": "📈", "command": lambda: view_sales_reports(content_frame)},
-        {"text": "User Management", "icon": "👥", "command": lambda: manage_users(content_frame)},
-        {"text": "Settings", "icon": "⚙️", "command": lambda: manage_settings(content_frame)},
+        {"text": "Dashboard", "icon": "📊", "command": lambda: navigate(show_dashboard, content_frame)},
+        {"text": "Inventory", "icon": "📦", "command": lambda: navigate(display_inventory, content_frame)},
+        {"text": "Orders", "icon": "🛒", "command": lambda: navigate(view_orders, content_frame)},
+        {"text": "Alerts", "icon": "🔔", "command": lambda: navigate(view_alerts, content_frame)},
+        {"text": "Suppliers", "icon": "🏭", "command": lambda: navigate(view_suppliers, content_frame)},
+        {"text": "Replenishment", "icon": "🔄", "command": lambda: navigate(view_replenishment, content_frame)},
+        {"text": "Sales Reports", "icon": "📈", "command": lambda: navigate(view_sales_reports, content_frame)},
+        {"text": "User Management", "icon": "👥", "command": lambda: navigate(manage_users, content_frame)},
+        {"text": "Activity Log", "icon": "📜", "command": lambda: navigate(view_activity_log, content_frame)},
+        {"text": "Diagnostics", "icon": "🩺", "command": lambda: navigate(view_diagnostics, content_frame)},
+        {"text": "Settings", "icon": "⚙️", "command": lambda: navigate(manage_settings, content_frame)},
         {"text": "Logout", "icon": "🚪", "command": home.destroy}
     ]
     
@@ -955,6 +2932,7 @@ def home_page(username, role):
     nav_frame = tk.Frame(sidebar, bg=COLORS["primary"])
     nav_frame.pack(fill=tk.BOTH, expand=True, pady=20)
     
+    nav_widgets = {}
     for button in nav_buttons:
         btn_frame = tk.Frame(nav_frame, bg=COLORS["primary"])
         btn_frame.pack(fill=tk.X, pady=5)
@@ -968,13 +2946,24 @@ def home_page(username, role):
                        activebackground=COLORS["secondary"], activeforeground="white",
                        bd=0, relief=tk.FLAT, anchor="w", padx=10, cursor="hand2")
         btn.pack(fill=tk.X, padx=5, ipady=8)
+        nav_widgets[button["text"]] = btn
+    
+    # Keep the alert count in the sidebar current
+    shown_version = [None]
+    def poll_alerts():
+        if low_stock_alerts.version != shown_version[0]:
+            shown_version[0] = low_stock_alerts.version
+            count = len(low_stock_alerts.active())
+            nav_widgets["Alerts"].config(text=f"Alerts ({count})" if count else "Alerts")
+        home.after(ALERT_POLL_INTERVAL, poll_alerts)
+    poll_alerts()
     
     # Main content area
     content_frame = tk.Frame(main_container, bg=COLORS["light"])
     content_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
     
-    # Show dashboard by default
-    show_dashboard(content_frame)
+    # Show dashboard by default, timed and tagged like any other visit
+    navigate(show_dashboard, content_frame)
     
     home.mainloop()
 
@@ -1003,72 +2992,342 @@ def create_title_bar(parent, title):
     divider = tk.Frame(parent, height=2, bg=COLORS["secondary"])
     divider.pack(fill=tk.X, padx=20, pady=(0, 20))
 
+# Virtualized table
+def sort_key(value):
+    """Key that orders mixed values the way a table column should: NULLs last, text case-insensitively"""
+    return (value is None, value.casefold() if isinstance(value, str) else value)
+
+
+class VirtualTreeview(ttk.Treeview):
+    """Treeview that only creates items for the rows currently on screen
+
+    Rows are kept in a plain list and a small, fixed set of Treeview items is
+    refilled as the user scrolls, so Tk work depends on the window height
+    rather than on the number of rows.
+
+    With sortable=True (or after set_sortable(True)), clicking a heading
+    sorts by that column and clicking it again reverses the order. Column i
+    sorts on field i of the rows; a ColumnarRows is sorted through its cached
+    per-column permutations.
+    """
+
+    OVERSCAN = 3  # Extra items kept below the visible window
+
+    def __init__(self, master, rowheight=30, formatter=None, row_tags=None, sortable=False, **kw):
+        self._yscrollcommand = kw.pop("yscrollcommand", None)
+        super().__init__(master, **kw)
+        self.rowheight = rowheight
+        self.formatter = formatter  # row -> tuple of display values
+        self.row_tags = row_tags    # (row, index) -> tuple of tag names
+        self.rows = []
+        self.source = []            # Rows as given to set_rows, before sorting
+        self.sort = None            # (column index, descending) or None
+        self.offset = 0
+        self._slots = []
+        self._selected = set()      # Selected indices into self.rows
+        self._heading_text = {}
+
+        self.bind("<Configure>", lambda e: self._render())
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.bind("<Prior>", lambda e: self._scroll_by(-self._visible_count()))
+        self.bind("<Next>", lambda e: self._scroll_by(self._visible_count()))
+        self.bind("<<TreeviewSelect>>", self._on_select, add="+")
+
+        if sortable:
+            self.set_sortable(True)
+
+    def set_sortable(self, sortable):
+        """Turn sorting by heading clicks on or off; turning it off drops the current sort"""
+        for index, column in enumerate(self["columns"]):
+            self.heading(column, command=(lambda i=index: self.sort_by(i)) if sortable else "")
+        if not sortable and self.sort:
+            self.sort = None
+            self.rows = self.source
+            self._selected.clear()
+            self._show_sort()
+            self._render()
+
+    def set_rows(self, rows):
+        """Replace the backing row buffer, keeping the current sort, and scroll back to the top"""
+        self.source = rows
+        self.rows = self._sorted(rows)
+        self.offset = 0
+        self._selected.clear()
+        self._render()
+
+    def sort_by(self, index):
+        """Sort on column index, reversing the order if it is already sorted on it"""
+        descending = bool(self.sort and self.sort[0] == index and not self.sort[1])
+        self.sort = (index, descending)
+        self.rows = self._sorted(self.source)
+        self._selected.clear()
+        self._show_sort()
+        self._render()
+
+    def _sorted(self, rows):
+        if not self.sort or not rows:
+            return rows
+        index, descending = self.sort
+        if isinstance(rows, ColumnarRows):
+            return rows.sorted_by(rows.row_type._fields[index], descending)
+        return sorted(rows, key=lambda row: sort_key(row[index]), reverse=descending)
+
+    def _show_sort(self):
+        # Arrow on the sorted heading; the other headings get their own text back
+        for index, column in enumerate(self["columns"]):
+            text = self._heading_text.setdefault(column, self.heading(column, "text"))
+            if self.sort and self.sort[0] == index:
+                text += " \u25bc" if self.sort[1] else " \u25b2"
+            self.heading(column, text=text)
+
+    def row_for_item(self, item):
+        """Return the backing row currently shown by a Treeview item"""
+        return self.rows[self.offset + self._slots.index(item)]
+
+    def selected_rows(self):
+        return [self.rows[i] for i in sorted(self._selected) if i < len(self.rows)]
+
+    def select_all(self):
+        self._selected = set(range(len(self.rows)))
+        self._render()
+
+    def _visible_count(self):
+        # One row's worth of height is taken by the headings
+        return max(1, self.winfo_height() // self.rowheight - 1)
+
+    def _render(self):
+        visible = self._visible_count()
+        total = len(self.rows)
+        self.offset = max(0, min(self.offset, total - visible))
+        count = min(visible + self.OVERSCAN, total - self.offset)
+
+        while len(self._slots) < count:
+            self._slots.append(super().insert("", tk.END))
+        while len(self._slots) > count:
+            super().delete(self._slots.pop())
+
+        selected_items = []
+        for i, item in enumerate(self._slots):
+            index = self.offset + i
+            row = self.rows[index]
+            values = self.formatter(row) if self.formatter else row
+            tags = self.row_tags(row, index) if self.row_tags else ()
+            self.item(item, values=values, tags=tags)
+            if index in self._selected:
+                selected_items.append(item)
+
+        if set(self.selection()) != set(selected_items):
+            self.selection_set(selected_items)
+
+        if self._yscrollcommand:
+            self._yscrollcommand(*self.yview())
+
+    def _scroll_by(self, rows):
+        self.offset += rows
+        self._render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        if event.delta:
+            steps = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+            self._scroll_by(steps * 3)
+        return "break"
+
+    def _on_select(self, event):
+        window = range(self.offset, self.offset + len(self._slots))
+        selected = {i for i in self._selected if i not in window}
+        for item in self.selection():
+            if item in self._slots:
+                selected.add(self.offset + self._slots.index(item))
+        self._selected = selected
+
+    def yview(self, *args):
+        total = len(self.rows)
+        if not args:
+            if not total:
+                return (0.0, 1.0)
+            return (self.offset / total, min(1.0, (self.offset + self._visible_count()) / total))
+
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self._visible_count() if args[2].startswith("page") else 1
+            self.offset += int(args[1]) * step
+        self._render()
+
+    def yview_moveto(self, fraction):
+        self.yview("moveto", fraction)
+
+    def yview_scroll(self, number, what):
+        self.yview("scroll", number, what)
+
 # Check low inventory
 def check_low_inventory():
-    """Check for inventory items below threshold and add to notifications"""
-    db = connect_db()
-    if not db:
+    """Load the low-stock alerts in the background; writers keep them current afterwards"""
+    query_executor.submit(low_stock_alerts.refresh)
+
+# Low-stock alerts panel
+def view_alerts(parent):
+    clear_frame(parent)
+    create_title_bar(parent, "Alerts")
+
+    # Toolbar
+    toolbar = tk.Frame(parent, bg=COLORS["light"])
+    toolbar.pack(fill=tk.X, padx=20)
+
+    tk.Label(toolbar, text="Low Stock", font=("Montserrat", 14, "bold"),
+            bg=COLORS["light"], fg=COLORS["primary"]).pack(side=tk.LEFT)
+
+    dismiss_btn = tk.Button(toolbar, text="Dismiss Selected", font=("Montserrat", 12),
+                           bg=COLORS["primary"], fg="white", padx=15, pady=5,
+                           command=lambda: dismiss_selected())
+    dismiss_btn.pack(side=tk.RIGHT)
+
+    # Active alerts table
+    table_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=10)
+    table_frame.pack(fill=tk.BOTH, expand=True)
+
+    table_scroll_y = tk.Scrollbar(table_frame)
+    table_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+
+    columns = ("ID", "Garment", "Category", "Quantity", "Threshold", "Since")
+    alerts_table = VirtualTreeview(table_frame, columns=columns, show="headings",
+                                   yscrollcommand=table_scroll_y.set,
+                                   formatter=lambda alert: (alert["garment_id"], alert["name"], alert["category"],
+                                                            alert["quantity"], alert["threshold"],
+                                                            f"{alert['since']:%Y-%m-%d %H:%M}"))
+    table_scroll_y.config(command=alerts_table.yview)
+
+    for column, width in zip(columns, (60, 250, 150, 100, 100, 160)):
+        alerts_table.heading(column, text=column)
+        alerts_table.column(column, width=width, anchor="w")
+
+    alerts_table.pack(fill=tk.BOTH, expand=True)
+
+    # Recent notifications, newest first
+    history_frame = tk.Frame(parent, bg="white", padx=15, pady=15,
+                            highlightbackground=COLORS["secondary"], highlightthickness=1)
+    history_frame.pack(fill=tk.X, padx=20, pady=10)
+
+    tk.Label(history_frame, text="Recent Notifications", font=("Montserrat", 14, "bold"),
+            bg="white", fg=COLORS["primary"]).pack(anchor="w", pady=(0, 10))
+
+    recent = list(notifications)[-8:]
+    for note in reversed(recent):
+        tk.Label(history_frame, text=f"{note['timestamp']:%H:%M}  {note['message']}",
+                font=("Montserrat", 11), bg="white", fg=COLORS["dark"]).pack(anchor="w")
+    if not recent:
+        tk.Label(history_frame, text="No notifications yet", font=("Montserrat", 11),
+                bg="white", fg=COLORS["dark"]).pack(anchor="w")
+
+    def dismiss_selected():
+        low_stock_alerts.dismiss([alert["garment_id"] for alert in alerts_table.selected_rows()])
+        alerts_table.set_rows(low_stock_alerts.active())
+
+    alerts_table.set_rows(low_stock_alerts.active())
+
+def garment_threshold_dialog(parent, garment_id):
+    """Override the low-stock threshold of one garment; blank restores the default"""
+    value = simpledialog.askstring("Alert Threshold",
+                                   "Alert when stock falls below (leave blank for the default):",
+                                   parent=parent)
+    if value is None:
         return
-        
-    cursor = db.cursor()
-    cursor.execute(f"SELECT id, garment_name, quantity FROM garments WHERE quantity < {inventory_threshold}")
-    low_items = cursor.fetchall()
-    db.close()
-    
-    global notifications
-    for item in low_items:
-        item_id, name, qty = item
-        notifications.append({
-            "message": f"Low inventory alert: {name} (only {qty} left)",
-            "type": "warning",
-            "timestamp": datetime.now()
-        })
+    try:
+        threshold = int(value) if value.strip() else None
+    except ValueError:
+        show_notification(parent, "Threshold must be a whole number", "danger")
+        return
+
+    query_executor.submit(
+        lambda: set_stock_threshold("garment", int(garment_id), threshold),
+        lambda _: show_notification(parent, "Alert threshold saved", "success"),
+        lambda err: show_notification(parent, f"Error: {err}", "danger"))
 
 # View orders
+ORDER_STATUSES = ["pending", "shipped", "delivered", "cancelled"]
+
 def view_orders(parent):
     clear_frame(parent)
     create_title_bar(parent, "View Orders")
 
-    # Get stats from database
-    db = connect_db()
-    if not db:
-        return
-    
-    cursor = db.cursor()
+    # Toolbar
+    toolbar = tk.Frame(parent, bg=COLORS["light"])
+    toolbar.pack(fill=tk.X, padx=20)
+
+    # Status filter
+    tk.Label(toolbar, text="Status:", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).pack(side=tk.LEFT, padx=(0, 5))
+    status_filter = ttk.Combobox(toolbar, values=["All"] + ORDER_STATUSES,
+                                font=("Montserrat", 12), width=12, state="readonly")
+    status_filter.current(0)
+    status_filter.pack(side=tk.LEFT)
+
+    export_btn = tk.Button(toolbar, text="Export", font=("Montserrat", 12),
+                         bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5,
+                         command=lambda: export_dialog(parent, "orders"))
+    export_btn.pack(side=tk.RIGHT)
 
-    # Get total order count
-    cursor.execute("SELECT COUNT(*) FROM orders")
-    total_orders = cursor.fetchone()[0]
+    # Bulk status actions on the selected orders
+    for label, new_status in (("Cancel", "cancelled"), ("Mark Delivered", "delivered"),
+                              ("Mark Shipped", "shipped")):
+        tk.Button(toolbar, text=label, font=("Montserrat", 12),
+                 bg=COLORS["primary"], fg="white", padx=15, pady=5,
+                 command=lambda s=new_status: change_status(s)).pack(side=tk.RIGHT, padx=5)
 
-    # Get total orders
-    cursor.execute("SELECT SUM(quantity) FROM orders")
-    total_number = cursor.fetchone()[0]
+    tk.Button(toolbar, text="Select All", font=("Montserrat", 12),
+             bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5,
+             command=lambda: orders_table.select_all()).pack(side=tk.RIGHT, padx=5)
 
     # Display orders in a table
     orders_frame = tk.Frame(parent, bg=COLORS["light"])
     orders_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
+    orders_scroll_y = tk.Scrollbar(orders_frame)
+    orders_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+
     # Treeview for orders
     columns = ("Order ID", "Garment", "Quantity", "Status", "Customer", "Order Date")
-    orders_table = ttk.Treeview(orders_frame, columns=columns, show="headings")
+    orders_table = VirtualTreeview(orders_frame, columns=columns, show="headings", sortable=True,
+                                   yscrollcommand=orders_scroll_y.set)
+    orders_scroll_y.config(command=orders_table.yview)
     
     for col in columns:
         orders_table.heading(col, text=col)
     
-    # Fetch orders from database
-    cursor.execute("""
-        SELECT o.id, g.garment_name, o.quantity, o.status, o.customer_name, o.order_date 
-        FROM orders o
-        JOIN garments g ON o.garment_id = g.id
-    """)
-    orders = cursor.fetchall()
-    
-    for order in orders:
-        orders_table.insert("", tk.END, values=order)
-    
     orders_table.pack(fill=tk.BOTH, expand=True)
     
-    db.close()
+    # Fetch orders from database
+    def load_orders():
+        status = status_filter.get()
+        run_query(orders_frame, lambda: order_repo.list(status if status != "All" else None),
+                  orders_table.set_rows)
+
+    def change_status(new_status):
+        order_ids = [row.id for row in orders_table.selected_rows()]
+        if not order_ids:
+            show_notification(parent, "Select the orders to update first", "warning")
+            return
+
+        def done(changed):
+            skipped = len(order_ids) - changed
+            message = f"{changed} orders marked {new_status}"
+            if skipped:
+                message += f" ({skipped} skipped - not {' or '.join(ORDER_TRANSITIONS[new_status])})"
+            show_notification(parent, message, "success" if changed else "warning")
+            load_orders()
+
+        def failed(err):
+            show_notification(parent, f"Error: {err}", "danger")
+
+        query_executor.submit(
+            lambda: order_repo.set_status(order_ids, new_status, current_user["id"] if current_user else None),
+            done, failed)
+
+    status_filter.bind("<<ComboboxSelected>>", lambda e: load_orders())
+    load_orders()
 
 def create_card(parent, title, value, icon, color, command=None):
     card = tk.Frame(parent, bg="white", padx=20, pady=15,
@@ -1096,42 +3355,49 @@ def create_card(parent, title, value, icon, color, command=None):
 
 
 # Show dashboard
+def load_dashboard_data():
+    """Run the dashboard queries; called on a query worker thread"""
+    # Per-category rollups - one row per category
+    summary = garment_repo.summary()
+    total_orders = order_repo.total()
+    activities = activity_repo.recent(RECENT_ACTIVITY_DAYS)
+
+    # Monthly sales for the trend chart
+    today = date.today()
+    monthly_sales = sale_repo.series("month", month_start(today, 1 - DASHBOARD_SALES_MONTHS), today)
+
+    total_value = sum(row.total_value for row in summary)
+    return {
+        "total_items": sum(row.item_count for row in summary),
+        "total_value": f"Rs{total_value:.2f}" if total_value else "Rs0.00",
+        "low_stock": sum(row.low_stock_count for row in summary),
+        "total_orders": total_orders,
+        "categories": [(row.category, row.total_quantity) for row in summary if row.total_quantity > 0],
+        "activities": [(row.username, row.activity, row.timestamp) for row in activities],
+        "monthly_sales": monthly_sales
+    }
+
 def show_dashboard(parent):
     clear_frame(parent)
     create_title_bar(parent, "Dashboard")
     
-    # Get stats from database
-    db = connect_db()
-    if not db:
-        return
-        
-    cursor = db.cursor()
-    
-    # Get total inventory count
-    cursor.execute("SELECT COUNT(*) FROM garments")
-    total_items = cursor.fetchone()[0]
-    
-    # Get total inventory value
-    cursor.execute("SELECT SUM(quantity * price) FROM garments")
-    result = cursor.fetchone()[0]
-    total_value = f"Rs{result:.2f}" if result else "Rs0.00"
-    
-    # Get low stock items
-    cursor.execute(f"SELECT COUNT(*) FROM garments WHERE quantity < {inventory_threshold}")
-    low_stock = cursor.fetchone()[0]
-    
-    # Get orders count
-    cursor.execute("SELECT COUNT(*) FROM orders")
-    total_orders = cursor.fetchone()[0]
-    
-    db.close()
+    run_query(parent, load_dashboard_data, lambda data: render_dashboard(parent, data))
+
+def render_dashboard(parent, data):
+    total_items = data["total_items"]
+    total_value = data["total_value"]
+    low_stock = data["low_stock"]
+    total_orders = data["total_orders"]
+    categories = data["categories"]
+    activities = data["activities"]
+    monthly_sales = data["monthly_sales"]
     
     # Create cards in a grid layout
     cards_frame = tk.Frame(parent, bg=COLORS["light"])
     cards_frame.pack(fill=tk.X, padx=20, pady=10)
     
     card1 = create_card(cards_frame, "Total Products", total_items, "📦", COLORS["primary"],
-                       lambda: display_inventory(parent))
+                       lambda: navigate(display_inventory, parent))
     card1.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
     
     card2 = create_card(cards_frame, "Inventory Value", total_value, "💰", COLORS["success"])
@@ -1141,7 +3407,7 @@ def show_dashboard(parent):
     card3.grid(row=0, column=2, padx=10, pady=10, sticky="nsew")
     
     card4 = create_card(cards_frame, "Total Orders", total_orders, "🛒", COLORS["accent"],
-                       lambda: view_orders(parent))
+                       lambda: navigate(view_orders, parent))
     card4.grid(row=0, column=3, padx=10, pady=10, sticky="nsew")
     
     # Configure grid
@@ -1160,14 +3426,7 @@ def show_dashboard(parent):
     tk.Label(left_chart_frame, text="Inventory by Category", font=("Montserrat", 14, "bold"),
             bg="white", fg=COLORS["dark"]).pack(anchor="w", pady=(0, 10))
     
-    # Get categories data
-    db = connect_db()
-    if db:
-        cursor = db.cursor()
-        cursor.execute("SELECT category, SUM(quantity) FROM garments GROUP BY category")
-        categories = cursor.fetchall()
-        db.close()
-        
+    with render_phase("chart"):
         # Create figure
         fig, ax = plt.subplots(figsize=(6, 4))
         
@@ -1189,6 +3448,7 @@ def show_dashboard(parent):
         chart_widget = FigureCanvasTkAgg(fig, left_chart_frame)
         chart_widget.draw()
         chart_widget.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        plt.close(fig)  # The canvas keeps the figure; pyplot no longer needs to
     
     # Right chart - Monthly sales
     right_chart_frame = tk.Frame(charts_frame, bg="white", padx=15, pady=15,
@@ -1198,22 +3458,24 @@ def show_dashboard(parent):
     tk.Label(right_chart_frame, text="Monthly Sales Trend", font=("Montserrat", 14, "bold"),
             bg="white", fg=COLORS["dark"]).pack(anchor="w", pady=(0, 10))
     
-    # Sample sales data (or get from database if available)
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-    sales = [random.randint(5000, 15000) for _ in range(6)]
-    
-    # Create figure
-    fig2, ax2 = plt.subplots(figsize=(6, 4))
+    # Revenue per month from the daily sales buckets
+    months = [start.strftime("%b") for start, revenue, units, profit in monthly_sales]
+    sales = [revenue for start, revenue, units, profit in monthly_sales]
     
-    # Create line chart
-    ax2.plot(months, sales, marker='o', linestyle='-', color=COLORS["primary"], linewidth=2)
-    ax2.set_ylabel('Sales (Rs)')
-    ax2.grid(True, linestyle='--', alpha=0.7)
-    
-    # Embed the chart
-    chart_widget2 = FigureCanvasTkAgg(fig2, right_chart_frame)
-    chart_widget2.draw()
-    chart_widget2.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    with render_phase("chart"):
+        # Create figure
+        fig2, ax2 = plt.subplots(figsize=(6, 4))
+        
+        # Create line chart
+        ax2.plot(months, sales, marker='o', linestyle='-', color=COLORS["primary"], linewidth=2)
+        ax2.set_ylabel('Sales (Rs)')
+        ax2.grid(True, linestyle='--', alpha=0.7)
+        
+        # Embed the chart
+        chart_widget2 = FigureCanvasTkAgg(fig2, right_chart_frame)
+        chart_widget2.draw()
+        chart_widget2.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        plt.close(fig2)
     
     # Configure grid
     charts_frame.columnconfigure(0, weight=1)
@@ -1228,48 +3490,723 @@ def show_dashboard(parent):
     tk.Label(activities_frame, text="Recent Activities", font=("Montserrat", 14, "bold"),
             bg="white", fg=COLORS["dark"]).pack(anchor="w", pady=(0, 10))
     
-    # Get recent activities from log
-    db = connect_db()
-    if db:
+    if activities:
+        for activity in activities:
+            username, action, timestamp = activity
+            time_str = timestamp.strftime("%d %b, %I:%M %p")
+            
+            activity_item = tk.Frame(activities_frame, bg="white", pady=5)
+            activity_item.pack(fill=tk.X)
+            
+            tk.Label(activity_item, text=f"👤 {username}", font=("Montserrat", 12, "bold"),
+                    bg="white", fg=COLORS["primary"], width=15, anchor="w").pack(side=tk.LEFT)
+            
+            tk.Label(activity_item, text=action, font=("Montserrat", 12),
+                    bg="white", fg=COLORS["dark"]).pack(side=tk.LEFT, padx=10)
+            
+            tk.Label(activity_item, text=time_str, font=("Montserrat", 10),
+                    bg="white", fg=COLORS["secondary"]).pack(side=tk.RIGHT)
+            
+            # Add separator except for last item
+            if activity != activities[-1]:
+                tk.Frame(activities_frame, height=1, bg=COLORS["light"]).pack(fill=tk.X, pady=5)
+    else:
+        tk.Label(activities_frame, text="No recent activities", font=("Montserrat", 12),
+                bg="white", fg=COLORS["dark"]).pack(pady=10)
+
+# Live search
+SEARCH_DEBOUNCE_MS = 250   # Wait this long after the last keystroke before querying
+FULLTEXT_MIN_TOKEN = 3     # InnoDB innodb_ft_min_token_size default
+FULLTEXT_WORD = re.compile(r"\w+")  # How the FULLTEXT parser splits text into words
+
+def split_search_term(term):
+    """(words, prefix) for a search term
+
+    words are the words long enough for the FULLTEXT index, each of which
+    must start a word of the searched columns. A term made only of short
+    words has no such words; prefix is then the whole term, which must start
+    the prefix column instead. Both are empty for a blank term.
+    """
+    # Splitting on non-word characters also drops every boolean-mode operator
+    long_words = [w for w in FULLTEXT_WORD.findall(term) if len(w) >= FULLTEXT_MIN_TOKEN]
+    if long_words:
+        return long_words, ""
+    return [], term.strip()
+
+def build_search_filter(term, text_columns, prefix_column):
+    """WHERE fragment and params matching term as prefixes of the given columns
+
+    Words long enough for the FULLTEXT index become a boolean-mode prefix
+    match against text_columns; a term made only of short words falls back
+    to a LIKE prefix on prefix_column, which the prefix index serves.
+    """
+    words, prefix = split_search_term(term)
+    if words:
+        expression = " ".join(f"+{w}*" for w in words)
+        return f"MATCH({', '.join(text_columns)}) AGAINST (%s IN BOOLEAN MODE)", [expression]
+    if not prefix:
+        return None, []
+    
+    prefix = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{prefix_column} LIKE %s", [prefix + "%"]
+
+def build_inventory_filter(filters):
+    """WHERE clause and params for an inventory filter tuple (search, category, size)"""
+    search, category, size = filters
+    clauses = []
+    params = []
+    
+    if search:
+        clause, clause_params = build_search_filter(search, ["g.garment_name", "g.color"], "g.garment_name")
+        if clause:
+            clauses.append(clause)
+            params.extend(clause_params)
+    if category:
+        clauses.append("g.category = %s")
+        params.append(category)
+    if size:
+        clauses.append("g.size = %s")
+        params.append(size)
+    
+    return " AND ".join(clauses), params
+
+def inventory_snapshot_filters(filters):
+    """ColumnarRows.matching() filters for (search, category, size), following build_inventory_filter's rules"""
+    search, category, size = filters
+    words, prefix = split_search_term(search or "")
+    conditions = [(("name", "color"), WordPrefix(word)) for word in words]
+    if prefix:
+        conditions.append(("name", Prefix(prefix)))
+    conditions += [(name, value) for name, value in (("category", category), ("size", size)) if value]
+    return conditions
+
+# Inventory pagination
+INVENTORY_PAGE_SIZES = [25, 50, 100, 250, 500]
+INVENTORY_COUNT_TTL = 60  # Seconds before the cached item count is re-queried
+NO_FILTERS = (None, None, None)
+
+# Cached row count and keyset anchors (page number -> last id of the previous page)
+# for the filter combination currently shown
+_inventory_pages = {"filters": NO_FILTERS, "count": None, "loaded_at": 0.0, "anchors": {1: 0}}
+_inventory_pages_lock = threading.Lock()
+
+# Columns of a GarmentRow, shared by every query that builds one
+GARMENT_SELECT = """
+    SELECT g.id, g.garment_name, g.category, g.size, g.color, g.quantity, 
+           g.price, g.quantity * g.price as value, s.supplier_name
+    FROM garments g
+    LEFT JOIN suppliers s ON g.supplier_id = s.id"""
+INVENTORY_PAGE_QUERY = GARMENT_SELECT + """
+    WHERE g.id > %s {filters}
+    ORDER BY g.id
+    LIMIT %s
+"""
+
+def _use_inventory_filters(filters):
+    # Anchors and counts are only valid for one filter combination
+    with _inventory_pages_lock:
+        if _inventory_pages["filters"] != filters:
+            _inventory_pages.update(filters=filters, count=None, anchors={1: 0})
+
+def get_inventory_count(filters=NO_FILTERS):
+    """Number of garments matching filters, cached so paging does not re-run COUNT(*)"""
+    _use_inventory_filters(filters)
+    now = time.monotonic()
+    if _inventory_pages["count"] is None or now - _inventory_pages["loaded_at"] > INVENTORY_COUNT_TTL:
+        where, params = build_inventory_filter(filters)
+        with db_pool.connection() as db:
+            cursor = db.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM garments g {'WHERE ' + where if where else ''}", params)
+            count = cursor.fetchone()[0]
+        with _inventory_pages_lock:
+            if _inventory_pages["filters"] == filters:
+                _inventory_pages.update(count=count, loaded_at=now)
+        return count
+    return _inventory_pages["count"]
+
+def reset_inventory_pages():
+    """Forget the cached count and page anchors after garments are added or removed"""
+    with _inventory_pages_lock:
+        _inventory_pages.update(count=None, anchors={1: 0})
+
+def fetch_inventory_page(page, filters=NO_FILTERS):
+    """Fetch one page of inventory by seeking past the last id of the previous page"""
+    _use_inventory_filters(filters)
+    anchors = _inventory_pages["anchors"]
+    where, params = build_inventory_filter(filters)
+    
+    with db_pool.connection() as db:
         cursor = db.cursor()
-        cursor.execute("""
-            SELECT u.username, a.activity, a.timestamp 
-            FROM activity_log a 
-            JOIN users u ON a.user_id = u.id 
-            ORDER BY a.timestamp DESC LIMIT 5
-        """)
-        activities = cursor.fetchall()
-        db.close()
         
-        if activities:
-            for activity in activities:
-                username, action, timestamp = activity
-                time_str = timestamp.strftime("%d %b, %I:%M %p")
-                
-                activity_item = tk.Frame(activities_frame, bg="white", pady=5)
-                activity_item.pack(fill=tk.X)
-                
-                tk.Label(activity_item, text=f"👤 {username}", font=("Montserrat", 12, "bold"),
-                        bg="white", fg=COLORS["primary"], width=15, anchor="w").pack(side=tk.LEFT)
-                
-                tk.Label(activity_item, text=action, font=("Montserrat", 12),
-                        bg="white", fg=COLORS["dark"]).pack(side=tk.LEFT, padx=10)
-                
-                tk.Label(activity_item, text=time_str, font=("Montserrat", 10),
-                        bg="white", fg=COLORS["secondary"]).pack(side=tk.RIGHT)
-                
-                # Add separator except for last item
-                if activity != activities[-1]:
-                    tk.Frame(activities_frame, height=1, bg=COLORS["light"]).pack(fill=tk.X, pady=5)
+        after_id = anchors.get(page)
+        if after_id is None:
+            # Page reached without visiting its predecessor - locate the anchor on the index
+            cursor.execute(f"SELECT g.id FROM garments g {'WHERE ' + where if where else ''} "
+                           "ORDER BY g.id LIMIT 1 OFFSET %s",
+                           params + [(page - 1) * inventory_page_size - 1])
+            row = cursor.fetchone()
+            if not row:
+                return []
+            after_id = row[0]
+            anchors[page] = after_id
+        
+        cursor.execute(INVENTORY_PAGE_QUERY.format(filters="AND " + where if where else ""),
+                       [after_id] + params + [inventory_page_size])
+        records = cursor.fetchall()
+    
+    if records:
+        anchors[page + 1] = records[-1][0]
+    return records
+
+SUPPLIERS_QUERY = "SELECT * FROM suppliers {filters} ORDER BY id"
+
+# Data access
+# One repository per table owns that table's SQL. Screens, the benchmark and
+# headless callers use the repositories rather than writing queries. Rows come
+# back as namedtuples: they cost no more memory than plain tuples, and existing
+# code can still index them by position.
+GarmentRow = namedtuple("GarmentRow", "id name category size color quantity price value supplier_name")
+CategorySummaryRow = namedtuple("CategorySummaryRow",
+                                "category item_count total_quantity total_value low_stock_count")
+SupplierRow = namedtuple("SupplierRow", "id name contact_person phone email address rating date_added")
+OrderRow = namedtuple("OrderRow", "id garment_name quantity status customer_name order_date")
+SaleRow = namedtuple("SaleRow", "id garment_name quantity sale_price profit sale_date username")
+ActivityRow = namedtuple("ActivityRow", "id timestamp username activity")
+
+# Large result sets
+COLUMN_CHUNK_SIZE = 10000  # Rows fetched per round trip when filling a ColumnarRows
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NAT = np.iinfo(np.int64).min  # Stored in time columns for NULL
+
+
+class Prefix(str):
+    """ColumnarRows filter value matching text that starts with it, like LIKE 'value%'"""
+
+
+class WordPrefix(str):
+    """ColumnarRows filter value matching text with a word that starts with it, like a FULLTEXT 'value*'"""
+
+
+# Bytes that continue a word in folded UTF-8 text: ASCII letters, digits and
+# underscore, and every byte of a multi-byte character
+_WORD_BYTES = np.zeros(256, dtype=bool)
+_WORD_BYTES[list(b"abcdefghijklmnopqrstuvwxyz0123456789_")] = True
+_WORD_BYTES[0x80:] = True
+
+
+class _Column:
+    """One column of a ColumnarRows, filled chunk by chunk
+
+    int/float/time values go into typed arrays (time as microseconds since
+    the epoch), label values become codes into a list of interned strings,
+    and text is kept as one UTF-8 buffer with offsets. Text reads NULL back
+    as an empty string; int columns must not contain NULL.
+    """
+
+    __slots__ = ("kind", "data", "labels", "_codes", "offsets", "_sort_order", "_folded")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.labels = None
+        self._codes = None
+        self.offsets = None
+        self._sort_order = None
+        self._folded = None
+        if kind == "int":
+            self.data = array("q")
+        elif kind == "float":
+            self.data = array("d")
+        elif kind == "time":
+            self.data = array("q")
+        elif kind == "label":
+            self.data = array("l")
+            self.labels = []
+            self._codes = {}
+        elif kind == "text":
+            self.data = bytearray()
+            self.offsets = array("q", [0])
         else:
-            tk.Label(activities_frame, text="No recent activities", font=("Montserrat", 12),
-                    bg="white", fg=COLORS["dark"]).pack(pady=10)
+            raise ValueError(f"Unknown column kind: {kind}")
 
-# Display inventory
-def display_inventory(parent):
-    clear_frame(parent)
-    create_title_bar(parent, "Inventory Management")
-    
+    def extend(self, values):
+        # New rows make the cached sort order and folded text stale
+        self._sort_order = None
+        self._folded = None
+        if self.kind == "int":
+            self.data.extend(values)
+        elif self.kind == "float":
+            if None in values:
+                values = [np.nan if value is None else value for value in values]
+            self.data.extend(values)
+        elif self.kind == "time":
+            self.data.extend(_NAT if value is None else (value - _EPOCH) // _MICROSECOND for value in values)
+        elif self.kind == "label":
+            codes = self._codes
+            for value in set(values).difference(codes):
+                codes[value] = len(self.labels)
+                self.labels.append(sys.intern(value) if isinstance(value, str) else value)
+            self.data.extend(map(codes.__getitem__, values))
+        else:
+            encoded = [value.encode() if value else b"" for value in values]
+            self.data += b"".join(encoded)
+            ends = itertools.accumulate(map(len, encoded), initial=self.offsets[-1])
+            self.offsets.extend(itertools.islice(ends, 1, None))
+
+    def finish(self):
+        """Freeze the buffers into NumPy arrays; called once after the last chunk"""
+        dtypes = {"int": np.int64, "float": np.float64, "time": np.int64}
+        if self.kind in dtypes:
+            self.data = np.frombuffer(self.data, dtype=dtypes[self.kind])
+        elif self.kind == "label":
+            # Codes shrink to the narrowest type that holds every label
+            width = np.uint8 if len(self.labels) <= 1 << 8 else np.uint16 if len(self.labels) <= 1 << 16 else np.int32
+            self.data = np.frombuffer(self.data, dtype=np.dtype(self.data.typecode)).astype(width)
+            self._codes = None
+        else:
+            self.data = bytes(self.data)
+            self.offsets = np.frombuffer(self.offsets, dtype=np.int64)
+
+    def value(self, position):
+        kind = self.kind
+        if kind == "int":
+            return int(self.data[position])
+        if kind == "float":
+            value = float(self.data[position])
+            return None if value != value else value
+        if kind == "label":
+            return self.labels[self.data[position]]
+        if kind == "time":
+            value = int(self.data[position])
+            return None if value == _NAT else _EPOCH + timedelta(microseconds=value)
+        return self.data[self.offsets[position]:self.offsets[position + 1]].decode()
+
+    def values(self, positions=None):
+        """The column as a NumPy array, optionally in the order of positions"""
+        if self.kind == "text":
+            decoded = [self.value(p) for p in (range(len(self.offsets) - 1) if positions is None else positions)]
+            return np.array(decoded, dtype=object)
+        if self.kind == "label":
+            labels = np.empty(len(self.labels), dtype=object)
+            labels[:] = self.labels
+            return labels[self.data if positions is None else self.data[positions]]
+        return self.data if positions is None else self.data[positions]
+
+    def sort_order(self):
+        """Stable ascending permutation of every row, computed once per column"""
+        if self._sort_order is None:
+            if self.kind == "label":
+                # Sort the few labels, then the codes by their label's rank
+                order = sorted(range(len(self.labels)), key=lambda code: sort_key(self.labels[code]))
+                ranks = np.empty(len(order), dtype=np.int64)
+                ranks[order] = np.arange(len(order))
+                keys = ranks[self.data]
+            elif self.kind == "text":
+                keys = np.array([value.casefold() for value in self.values()], dtype=object)
+            else:
+                keys = self.data
+            self._sort_order = np.argsort(keys, kind="stable")
+        return self._sort_order
+
+    def mask(self, value):
+        """Boolean array over every row: value is a str for label/text columns
+        (case-insensitive equality / substring, or a Prefix / WordPrefix) or a
+        (low, high) pair for the rest, with None for an open end"""
+        if self.kind == "label":
+            wanted = str(value).casefold()
+            if isinstance(value, WordPrefix):
+                pattern = re.compile(r"(?<!\w)" + re.escape(wanted))
+                matches = lambda label: pattern.search(label) is not None
+            elif isinstance(value, Prefix):
+                matches = lambda label: label.startswith(wanted)
+            else:
+                matches = lambda label: label == wanted
+            codes = [code for code, label in enumerate(self.labels)
+                     if label is not None and matches(str(label).casefold())]
+            return np.isin(self.data, codes)
+        if self.kind == "text":
+            anchor = "word" if isinstance(value, WordPrefix) else "start" if isinstance(value, Prefix) else None
+            return self._contains(str(value), anchor)
+
+        low, high = value
+        if self.kind == "time":
+            low, high = [None if bound is None else (bound - _EPOCH) // _MICROSECOND for bound in (low, high)]
+        mask = np.ones(len(self.data), dtype=bool)
+        if low is not None:
+            mask &= self.data >= low
+        if high is not None:
+            mask &= self.data <= high
+        return mask
+
+    def _contains(self, text, anchor=None):
+        # Scan the folded UTF-8 buffer once and map each hit back to its row.
+        # anchor "start" keeps hits at the start of a row, "word" hits at the
+        # start of a row or after a byte that is not part of a word.
+        if self._folded is None:
+            self._folded = self._fold()
+        folded, offsets = self._folded
+        needle = text.casefold().encode()
+        mask = np.zeros(len(offsets) - 1, dtype=bool)
+        # Lookahead so hits that overlap a match straddling two rows are still found
+        pattern = re.compile(b"(?=" + re.escape(needle) + b")")
+        starts = np.fromiter((hit.start() for hit in pattern.finditer(folded)), dtype=np.int64)
+        rows = np.searchsorted(offsets, starts, side="right") - 1
+        inside = starts + len(needle) <= offsets[rows + 1]
+        if anchor is not None:
+            at_start = starts == offsets[rows]
+            if anchor == "word":
+                previous = np.frombuffer(folded, dtype=np.uint8)[np.maximum(starts - 1, 0)]
+                at_start |= ~_WORD_BYTES[previous]
+            inside &= at_start
+        mask[rows[inside]] = True
+        return mask
+
+    def _fold(self):
+        # (folded buffer, its row offsets). ASCII text folds byte for byte and
+        # keeps the column's offsets; anything else is folded row by row with
+        # str.casefold, which can change a row's length in bytes ("É" -> "é"
+        # keeps it, "ß" -> "ss" does not), so it gets offsets of its own.
+        data = bytes(self.data)
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        if data.isascii():
+            return data.lower(), offsets
+        rows = [data[start:end].decode().casefold().encode() for start, end in zip(offsets[:-1], offsets[1:])]
+        folded_offsets = np.fromiter(itertools.accumulate(map(len, rows), initial=0), dtype=np.int64,
+                                     count=len(rows) + 1)
+        return b"".join(rows), folded_offsets
+
+    @property
+    def nbytes(self):
+        size = len(self.data) if self.kind == "text" else self.data.nbytes
+        if self.offsets is not None:
+            size += self.offsets.nbytes
+        if self.labels is not None:
+            size += sum(sys.getsizeof(label) for label in self.labels)
+        return size
+
+
+class ColumnarRows:
+    """Read-only result set stored column by column instead of row by row
+
+    Behaves like a list of row_type namedtuples - len(), indexing and
+    iteration - but a row is only assembled when it is indexed, so a virtual
+    table pays for the rows on screen and formatting happens at draw time.
+    A 1M-row inventory takes tens of MB this way against several hundred as
+    tuples. take() returns a reordered or filtered view over the same
+    columns, so sorting and filtering never go back to the database.
+    """
+
+    __slots__ = ("row_type", "kinds", "_columns", "_count", "_order")
+
+    def __init__(self, row_type, kinds, columns, count, order=None):
+        self.row_type = row_type
+        self.kinds = kinds
+        self._columns = columns
+        self._count = count
+        self._order = order  # Positions shown, in view order; None for every row as loaded
+
+    @classmethod
+    def build(cls, row_type, kinds, chunks):
+        """Fill columns of the given kinds from an iterable of row lists"""
+        columns = [_Column(kind) for kind in kinds]
+        count = 0
+        for rows in chunks:
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+            count += len(rows)
+        for column in columns:
+            column.finish()
+        return cls(row_type, kinds, columns, count)
+
+    @classmethod
+    def from_cursor(cls, row_type, kinds, cursor, chunk_size=COLUMN_CHUNK_SIZE):
+        return cls.build(row_type, kinds, iter(lambda: cursor.fetchmany(chunk_size), []))
+
+    def __len__(self):
+        return self._count if self._order is None else len(self._order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        position = index if self._order is None else self._order[index]
+        return self.row_type._make(column.value(position) for column in self._columns)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def take(self, indices):
+        """View of the rows at indices (positions in this view), in that order"""
+        indices = np.asarray(indices, dtype=np.int64)
+        order = indices if self._order is None else self._order[indices]
+        return ColumnarRows(self.row_type, self.kinds, self._columns, self._count, order)
+
+    def column(self, name):
+        """Values of one field in view order, as a NumPy array"""
+        return self._columns[self.row_type._fields.index(name)].values(self._order)
+
+    def sorted_by(self, name, descending=False):
+        """The rows of this view ordered by one field
+
+        Uses the column's cached permutation of every row, so only the first
+        sort on a column pays for argsort; later sorts - of this or any
+        filtered view - are a single pass over the permutation.
+        """
+        order = self._columns[self.row_type._fields.index(name)].sort_order()
+        if self._order is not None:
+            keep = np.zeros(self._count, dtype=bool)
+            keep[self._order] = True
+            order = order[keep[order]]
+        if descending:
+            order = order[::-1]
+        return ColumnarRows(self.row_type, self.kinds, self._columns, self._count, order)
+
+    def matching(self, filters):
+        """The rows of this view matching every {field: value} in filters, in view order
+
+        filters may also be a list of (field, value) pairs, to filter one
+        field more than once. Values are matched as described in _Column.mask.
+        A tuple of field names as the key matches when any of those fields does.
+        """
+        keep = None
+        for names, value in (filters.items() if isinstance(filters, dict) else filters):
+            mask = None
+            for name in (names if isinstance(names, tuple) else (names,)):
+                column_mask = self._columns[self.row_type._fields.index(name)].mask(value)
+                mask = column_mask if mask is None else mask | column_mask
+            keep = mask if keep is None else keep & mask
+        if keep is None:
+            return self
+        positions = np.arange(self._count) if self._order is None else self._order
+        return ColumnarRows(self.row_type, self.kinds, self._columns, self._count, positions[keep[positions]])
+
+    @property
+    def nbytes(self):
+        size = sum(column.nbytes for column in self._columns)
+        return size + (self._order.nbytes if self._order is not None else 0)
+
+
+ORDERS_QUERY = """
+    SELECT o.id, g.garment_name, o.quantity, o.status, o.customer_name, o.order_date 
+    FROM orders o
+    JOIN garments g ON o.garment_id = g.id
+    {filters}
+"""
+SALES_REPORT_QUERY = """
+    SELECT s.id, g.garment_name, s.quantity, s.sale_price, s.profit, s.sale_date, u.username
+    FROM sales s
+    JOIN garments g ON s.garment_id = g.id
+    JOIN users u ON s.user_id = u.id
+"""
+# Newest first. Older pages continue from the last (timestamp, id) shown, and the
+# period bound keeps MySQL to the partitions inside it
+ACTIVITY_PAGE_QUERY = """
+    SELECT a.id, a.timestamp, COALESCE(u.username, '-'), a.activity
+    FROM activity_log a
+    LEFT JOIN users u ON a.user_id = u.id
+    WHERE a.timestamp >= %s {before}
+    ORDER BY a.timestamp DESC, a.id DESC
+    LIMIT %s
+"""
+INVENTORY_SNAPSHOT_QUERY = GARMENT_SELECT + """
+    {filters}
+    ORDER BY g.id
+"""
+GARMENT_BY_ID_QUERY = GARMENT_SELECT + """
+    WHERE g.id = %s
+"""
+GARMENT_COLUMNS = ("int", "text", "label", "label", "label", "int", "float", "float", "label")
+SALE_COLUMNS = ("int", "label", "int", "float", "float", "time", "label")
+SUPPLIER_INSERT_QUERY = """
+    INSERT INTO suppliers 
+    (supplier_name, contact_person, phone, email, address) 
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+def fetch_rows(row_type, query, params=()):
+    return [row_type._make(row) for row in fetch_all(query, params)]
+
+
+class GarmentRepo:
+    def page(self, page, filters=NO_FILTERS):
+        """One keyset page of garments matching (search, category, size)"""
+        return [GarmentRow._make(row) for row in fetch_inventory_page(page, filters)]
+
+    def count(self, filters=NO_FILTERS):
+        return get_inventory_count(filters)
+
+    def after(self, after_id=0, limit=50, filters=NO_FILTERS):
+        """Up to limit garments with id > after_id, for callers that page by cursor
+
+        Unlike page(), this keeps no anchor state, so concurrent callers with
+        different filters do not disturb each other or the inventory screen.
+        """
+        where, params = build_inventory_filter(filters)
+        return fetch_rows(GarmentRow, INVENTORY_PAGE_QUERY.format(filters="AND " + where if where else ""),
+                          [after_id] + params + [limit])
+
+    def snapshot(self, filters=NO_FILTERS):
+        """Every garment matching filters as a ColumnarRows, streamed in chunks"""
+        where, params = build_inventory_filter(filters)
+        with db_pool.connection() as db:
+            cursor = db.cursor(buffered=False)
+            cursor.execute(INVENTORY_SNAPSHOT_QUERY.format(filters="WHERE " + where if where else ""), params)
+            return ColumnarRows.from_cursor(GarmentRow, GARMENT_COLUMNS, cursor)
+
+    def get(self, garment_id):
+        rows = fetch_rows(GarmentRow, GARMENT_BY_ID_QUERY, (int(garment_id),))
+        return rows[0] if rows else None
+
+    def low_stock(self, threshold):
+        return fetch_all(LOW_STOCK_QUERY, (threshold,))
+
+    def categories(self):
+        return get_categories()
+
+    def summary(self):
+        return fetch_rows(CategorySummaryRow, SUMMARY_QUERY)
+
+    def add(self, name, category, size, color, quantity, price, cost_price, supplier_id, user_id=None):
+        """Insert a garment and update the rollups; returns the new id"""
+        with db_pool.connection() as db:
+            cursor = db.cursor()
+            cursor.execute(GARMENT_INSERT_QUERY, (name, category, size, color, quantity, price,
+                                                  cost_price, supplier_id))
+            garment_id = cursor.lastrowid
+            update_inventory_summary(cursor, garment_id, category, price, None, quantity)
+            db.commit()
+
+        stock_cache.invalidate([garment_id])
+        reset_inventory_pages()
+        reference_cache.invalidate("categories")
+        low_stock_alerts.stock_changed([(garment_id, name, category, quantity)])
+        if user_id is not None:
+            log_activity(user_id, f"Added new product: {name}")
+        return garment_id
+
+
+class SupplierRepo:
+    def all(self):
+        return get_supplier_rows()
+
+    def names(self):
+        """(id, name) pairs for pickers"""
+        return get_suppliers()
+
+    def search(self, term=""):
+        """Suppliers whose name matches term, or every supplier for an empty term"""
+        where, params = build_search_filter(term, ["supplier_name"], "supplier_name")
+        if not where:
+            return self.all()
+        return fetch_rows(SupplierRow, SUPPLIERS_QUERY.format(filters="WHERE " + where), params)
+
+    def add(self, name, contact_person, phone, email, address, user_id=None):
+        with db_pool.connection() as db:
+            cursor = db.cursor()
+            cursor.execute(SUPPLIER_INSERT_QUERY, (name, contact_person, phone, email, address))
+            supplier_id = cursor.lastrowid
+            db.commit()
+
+        reference_cache.invalidate("suppliers", "supplier_rows")
+        if user_id is not None:
+            log_activity(user_id, f"Added new supplier: {name}")
+        return supplier_id
+
+
+class OrderRepo:
+    def list(self, status=None, after_id=0, limit=None):
+        """Orders in id order, optionally with one status; after_id and limit page through them"""
+        clauses, params = ["o.id > %s"], [after_id]
+        if status:
+            clauses.append("o.status = %s")
+            params.append(status)
+        query = ORDERS_QUERY.format(filters="WHERE " + " AND ".join(clauses)) + " ORDER BY o.id"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        return fetch_rows(OrderRow, query, params)
+
+    def total(self):
+        rows = fetch_all("SELECT counter_value FROM dashboard_counters WHERE counter_name = 'total_orders'")
+        return rows[0][0] if rows else 0
+
+    def create(self, garment_id, quantity, customer_name, customer_contact, user_id=None):
+        return create_order(garment_id, quantity, customer_name, customer_contact, user_id)
+
+    def set_status(self, order_ids, new_status, user_id=None):
+        return update_order_status(order_ids, new_status, user_id)
+
+
+class SaleRepo:
+    def list(self, start=None, end=None, after_id=0, limit=None):
+        """Sales in [start, end), in id order; after_id and limit page through them"""
+        clauses, params = ["s.id > %s"], [after_id]
+        if start is not None:
+            clauses.append("s.sale_date >= %s")
+            params.append(start)
+        if end is not None:
+            clauses.append("s.sale_date < %s")
+            params.append(end)
+        query = SALES_REPORT_QUERY + " WHERE " + " AND ".join(clauses) + " ORDER BY s.id"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        return fetch_rows(SaleRow, query, params)
+
+    def report(self, start=None, end=None):
+        """Sales in [start, end) as a ColumnarRows, for the sales report screen"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("s.sale_date >= %s")
+            params.append(start)
+        if end is not None:
+            clauses.append("s.sale_date < %s")
+            params.append(end)
+        query = SALES_REPORT_QUERY + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY s.id"
+        with db_pool.connection() as db:
+            cursor = db.cursor(buffered=False)
+            cursor.execute(query, params)
+            return ColumnarRows.from_cursor(SaleRow, SALE_COLUMNS, cursor)
+
+    def record(self, user_id, lines, sale_time=None):
+        return record_sale(user_id, lines, sale_time)
+
+    def series(self, bucket="month", start=None, end=None):
+        return sales_series(bucket, start, end)
+
+
+class ActivityRepo:
+    def page(self, since, before=None, limit=ACTIVITY_PAGE_SIZE):
+        """Activity newer than since, newest first, continuing after the (timestamp, id) in before"""
+        if before is None:
+            return fetch_rows(ActivityRow, ACTIVITY_PAGE_QUERY.format(before=""), (since, limit))
+        timestamp, activity_id = before
+        query = ACTIVITY_PAGE_QUERY.format(before="AND (a.timestamp < %s OR (a.timestamp = %s AND a.id < %s))")
+        return fetch_rows(ActivityRow, query, (since, timestamp, timestamp, activity_id, limit))
+
+    def recent(self, days=RECENT_ACTIVITY_DAYS, limit=5):
+        return self.page(datetime.now() - timedelta(days=days), limit=limit)
+
+    def log(self, user_id, activity):
+        log_activity(user_id, activity)
+
+
+garment_repo = GarmentRepo()
+supplier_repo = SupplierRepo()
+order_repo = OrderRepo()
+sale_repo = SaleRepo()
+activity_repo = ActivityRepo()
+
+# Display inventory
+def display_inventory(parent):
+    clear_frame(parent)
+    create_title_bar(parent, "Inventory Management")
+    
     # Create search and filter bar
     search_frame = tk.Frame(parent, bg=COLORS["light"], pady=10)
     search_frame.pack(fill=tk.X, padx=20)
@@ -1306,11 +4243,17 @@ def display_inventory(parent):
     tk.Label(search_frame, text="Category:", font=("Montserrat", 12),
             bg=COLORS["light"], fg=COLORS["dark"]).pack(side=tk.LEFT, padx=(20, 5))
     
-    category_filter = ttk.Combobox(search_frame, values=["All", "T-Shirts", "Pants", "Dresses", "Jackets"],
+    category_filter = ttk.Combobox(search_frame, values=["All"] + DEFAULT_CATEGORIES,
                                   font=("Montserrat", 12), width=15, state="readonly")
     category_filter.current(0)
     category_filter.pack(side=tk.LEFT)
     
+    def show_categories(categories):
+        if category_filter.winfo_exists():
+            category_filter.config(values=["All"] + categories)
+    
+    query_executor.submit(get_categories, show_categories)
+    
     # Size filter
     tk.Label(search_frame, text="Size:", font=("Montserrat", 12),
             bg=COLORS["light"], fg=COLORS["dark"]).pack(side=tk.LEFT, padx=(20, 5))
@@ -1326,6 +4269,16 @@ def display_inventory(parent):
                           bg=COLORS["primary"], fg="white", padx=15, pady=5,
                           command=lambda: add_garment_form(parent))
         add_btn.pack(side=tk.RIGHT)
+        
+        import_btn = tk.Button(search_frame, text="Import", font=("Montserrat", 12),
+                             bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5,
+                             command=lambda: import_garments_dialog(parent))
+        import_btn.pack(side=tk.RIGHT, padx=10)
+    
+    export_btn = tk.Button(search_frame, text="Export", font=("Montserrat", 12),
+                         bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5,
+                         command=lambda: export_dialog(parent, "inventory"))
+    export_btn.pack(side=tk.RIGHT, padx=10)
     
     # Create inventory table
     table_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=20)
@@ -1345,9 +4298,21 @@ def display_inventory(parent):
     style.configure("Treeview", font=("Montserrat", 12), rowheight=30)
     style.configure("Treeview.Heading", font=("Montserrat", 12, "bold"))
     
-    inventory_table = ttk.Treeview(table_frame, columns=columns, show="headings",
-                                  yscrollcommand=table_scroll_y.set,
-                                  xscrollcommand=table_scroll_x.set)
+    def format_inventory_row(record):
+        # Format price and value - only for the rows being drawn
+        return (*record[:6], f"Rs{record[6]:.2f}", f"Rs{record[7]:.2f}", record[8])
+    
+    def inventory_row_tags(record, index):
+        # Highlight low inventory items in red, alternating row colors
+        stock = "low_stock" if record[5] < low_stock_alerts.threshold(record[0], record[2]) else "normal"
+        return (f"{stock}_{'even' if index % 2 == 0 else 'odd'}",)
+    
+    # Sortable only with "All" rows loaded - sorting one keyset page would suggest
+    # an order the other pages do not follow
+    inventory_table = VirtualTreeview(table_frame, columns=columns, show="headings",
+                                      formatter=format_inventory_row, row_tags=inventory_row_tags,
+                                      yscrollcommand=table_scroll_y.set,
+                                      xscrollcommand=table_scroll_x.set)
     
     table_scroll_y.config(command=inventory_table.yview)
     table_scroll_x.config(command=inventory_table.xview)
@@ -1380,42 +4345,12 @@ def display_inventory(parent):
     inventory_table.heading("Supplier", text="Supplier")
     inventory_table.column("Supplier", width=150, anchor="w")
     
-    inventory_table.pack(fill=tk.BOTH, expand=True)
+    inventory_table.tag_configure("normal_even", background="white")
+    inventory_table.tag_configure("normal_odd", background="#f5f5f5")
+    inventory_table.tag_configure("low_stock_even", background="#ffe6e6", foreground="#d32f2f")
+    inventory_table.tag_configure("low_stock_odd", background="#ffcccc", foreground="#d32f2f")
     
-    # Load inventory data
-    db = connect_db()
-    if db:
-        cursor = db.cursor()
-        cursor.execute("""
-            SELECT g.id, g.garment_name, g.category, g.size, g.color, g.quantity, 
-                   g.price, g.quantity * g.price as value, s.supplier_name
-            FROM garments g
-            LEFT JOIN suppliers s ON g.supplier_id = s.id
-            ORDER BY g.id
-        """)
-        records = cursor.fetchall()
-        db.close()
-        
-        # Populate table with data
-        for i, record in enumerate(records):
-            # Format price and value
-            record_list = list(record)
-            record_list[6] = f"Rs{record[6]:.2f}"
-            record_list[7] = f"Rs{record[7]:.2f}"
-            
-            # Highlight low inventory items in red
-            if record[5] < inventory_threshold:
-                inventory_table.insert("", tk.END, values=record_list, tags=("low_stock",))
-            else:
-                inventory_table.insert("", tk.END, values=record_list, tags=("normal",))
-            
-            # Alternate row colors
-            if i % 2 == 0:
-                inventory_table.tag_configure("normal", background="white")
-                inventory_table.tag_configure("low_stock", background="#ffe6e6", foreground="#d32f2f")
-            else:
-                inventory_table.tag_configure("normal", background="#f5f5f5")
-                inventory_table.tag_configure("low_stock", background="#ffcccc", foreground="#d32f2f")
+    inventory_table.pack(fill=tk.BOTH, expand=True)
     
     # Add context menu
     def show_context_menu(event):
@@ -1437,9 +4372,15 @@ def display_inventory(parent):
                                        command=lambda: delete_item(parent, selected_id))
                 
                 context.add_separator()
+                context.add_command(label="Record Sale", 
+                                   command=lambda: record_sale_dialog(parent, selected_id))
                 context.add_command(label="Add to Order", 
                                    command=lambda: add_to_order(parent, selected_id))
                 
+                if current_role == 'admin':
+                    context.add_command(label="Set Alert Threshold", 
+                                       command=lambda: garment_threshold_dialog(parent, selected_id))
+                
                 context.post(event.x_root, event.y_root)
         except:
             pass
@@ -1454,28 +4395,122 @@ def display_inventory(parent):
     pagination_frame = tk.Frame(parent, bg=COLORS["light"], pady=10)
     pagination_frame.pack(fill=tk.X, padx=20)
     
-    tk.Label(pagination_frame, text=f"Total items: {len(records) if 'records' in locals() else 0}",
-            font=("Montserrat", 12), bg=COLORS["light"], fg=COLORS["dark"]).pack(side=tk.LEFT)
+    total_label = tk.Label(pagination_frame, text="Total items: 0",
+                          font=("Montserrat", 12), bg=COLORS["light"], fg=COLORS["dark"])
+    total_label.pack(side=tk.LEFT)
+    
+    # Page size selector
+    page_size_box = ttk.Combobox(pagination_frame, values=INVENTORY_PAGE_SIZES + ["All"],
+                                font=("Montserrat", 10), width=5, state="readonly")
+    page_size_box.set(inventory_page_size)
+    page_size_box.pack(side=tk.LEFT, padx=(20, 5))
+    tk.Label(pagination_frame, text="per page", font=("Montserrat", 10),
+            bg=COLORS["light"], fg=COLORS["dark"]).pack(side=tk.LEFT)
     
     # Page navigation
     pages_frame = tk.Frame(pagination_frame, bg=COLORS["light"])
     pages_frame.pack(side=tk.RIGHT)
     
-    prev_btn = tk.Button(pages_frame, text="Previous", font=("Montserrat", 10),
-                        bg=COLORS["light"], fg=COLORS["primary"])
-    prev_btn.pack(side=tk.LEFT, padx=5)
+    state = {"page": 1, "all": False, "snapshot": None}
+    
+    def current_filters():
+        search = search_entry.get().strip()
+        if search == "Search products...":
+            search = ""
+        category = category_filter.get()
+        size = size_filter.get()
+        return (search or None,
+                category if category != "All" else None,
+                size if size != "All" else None)
     
-    # Page buttons (1, 2, 3, etc.)
-    for i in range(1, min(4, (len(records) // 10) + 2) if 'records' in locals() else 2):
-        page_btn = tk.Button(pages_frame, text=str(i), font=("Montserrat", 10),
-                           bg=COLORS["primary"] if i == 1 else COLORS["light"],
-                           fg="white" if i == 1 else COLORS["primary"],
-                           width=3)
-        page_btn.pack(side=tk.LEFT, padx=2)
+    def filter_snapshot(filters):
+        # "All" mode filters the loaded snapshot in memory instead of querying again
+        return state["snapshot"].matching(inventory_snapshot_filters(filters))
+    
+    def load_page(page):
+        filters = current_filters()
+        
+        if state["all"] and state["snapshot"] is None:
+            # Every garment in one columnar snapshot, scrolled by the virtual table
+            def loaded(snapshot):
+                state["snapshot"] = snapshot
+                load_page(1)
+            
+            run_query(table_frame, garment_repo.snapshot, loaded)
+            return
+        
+        def fetch():
+            total = garment_repo.count(filters)
+            total_pages = max(1, -(-total // inventory_page_size))
+            current = max(1, min(page, total_pages))
+            return current, total, total_pages, garment_repo.page(current, filters)
+        
+        def show_page(result):
+            current, total, total_pages, records = result
+            state["page"] = current
+            
+            # Populate table with data
+            inventory_table.set_rows(records)
+            
+            total_label.config(text=f"Total items: {total}")
+            draw_page_buttons(current, total_pages)
+        
+        if state["all"]:
+            records = filter_snapshot(filters)
+            show_page((1, len(records), 1, records))
+            return
+        
+        run_query(table_frame, fetch, show_page)
     
-    next_btn = tk.Button(pages_frame, text="Next", font=("Montserrat", 10),
-                        bg=COLORS["light"], fg=COLORS["primary"])
-    next_btn.pack(side=tk.LEFT, padx=5)
+    def draw_page_buttons(page, total_pages):
+        clear_frame(pages_frame)
+        
+        prev_btn = tk.Button(pages_frame, text="Previous", font=("Montserrat", 10),
+                            bg=COLORS["light"], fg=COLORS["primary"],
+                            state=tk.NORMAL if page > 1 else tk.DISABLED,
+                            command=lambda: load_page(page - 1))
+        prev_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Page buttons - a window of pages around the current one
+        first = max(1, min(page - 2, total_pages - 4))
+        for i in range(first, min(first + 5, total_pages + 1)):
+            page_btn = tk.Button(pages_frame, text=str(i), font=("Montserrat", 10),
+                               bg=COLORS["primary"] if i == page else COLORS["light"],
+                               fg="white" if i == page else COLORS["primary"],
+                               width=3, command=lambda p=i: load_page(p))
+            page_btn.pack(side=tk.LEFT, padx=2)
+        
+        next_btn = tk.Button(pages_frame, text="Next", font=("Montserrat", 10),
+                            bg=COLORS["light"], fg=COLORS["primary"],
+                            state=tk.NORMAL if page < total_pages else tk.DISABLED,
+                            command=lambda: load_page(page + 1))
+        next_btn.pack(side=tk.LEFT, padx=5)
+    
+    def on_page_size_change(event):
+        global inventory_page_size
+        state["all"] = page_size_box.get() == "All"
+        state["snapshot"] = None
+        inventory_table.set_sortable(state["all"])
+        if not state["all"]:
+            inventory_page_size = int(page_size_box.get())
+        reset_inventory_pages()
+        load_page(1)
+    
+    page_size_box.bind("<<ComboboxSelected>>", on_page_size_change)
+    
+    # Live search - wait for a pause in typing, then reload from the first page
+    pending_search = {"id": None}
+    
+    def on_search_key(event):
+        if pending_search["id"]:
+            search_entry.after_cancel(pending_search["id"])
+        pending_search["id"] = search_entry.after(SEARCH_DEBOUNCE_MS, lambda: load_page(1))
+    
+    search_entry.bind("<KeyRelease>", on_search_key)
+    category_filter.bind("<<ComboboxSelected>>", lambda e: load_page(1))
+    size_filter.bind("<<ComboboxSelected>>", lambda e: load_page(1))
+    
+    load_page(1)
 
 # Add garment form
 def add_garment_form(parent):
@@ -1502,7 +4537,7 @@ def add_garment_form(parent):
     # Category
     tk.Label(form, text="Category", font=("Montserrat", 12),
             bg=COLORS["light"], fg=COLORS["dark"]).grid(row=1, column=0, sticky="w", pady=10)
-    category = ttk.Combobox(form, values=["T-Shirts", "Pants", "Dresses", "Jackets", "Accessories"],
+    category = ttk.Combobox(form, values=DEFAULT_CATEGORIES,
                            font=("Montserrat", 12), width=20, state="readonly")
     category.grid(row=1, column=1, sticky="w", pady=10)
     category.current(0)
@@ -1543,18 +4578,16 @@ def add_garment_form(parent):
     tk.Label(form, text="Supplier", font=("Montserrat", 12),
             bg=COLORS["light"], fg=COLORS["dark"]).grid(row=7, column=0, sticky="w", pady=10)
     
-    # Get suppliers from database
-    db = connect_db()
+    # Get suppliers (cached reference data)
     suppliers = []
     supplier_ids = {}
     
-    if db:
-        cursor = db.cursor()
-        cursor.execute("SELECT id, supplier_name FROM suppliers")
-        for sid, name in cursor.fetchall():
+    try:
+        for sid, name in get_suppliers():
             suppliers.append(name)
             supplier_ids[name] = sid
-        db.close()
+    except mysql.connector.Error as err:
+        messagebox.showerror("Database Connection Error", f"Failed to connect to database: {err}")
     
     supplier = ttk.Combobox(form, values=suppliers,
                            font=("Montserrat", 12), width=25, state="readonly")
@@ -1610,39 +4643,16 @@ def add_garment_form(parent):
         supplier_id = supplier_ids.get(supplier.get()) if supplier.get() in supplier_ids else None
         
         # Save to database
-        db = connect_db()
-        if db:
-            cursor = db.cursor()
-            try:
-                cursor.execute("""
-                    INSERT INTO garments 
-                    (garment_name, category, size, color, quantity, price, cost_price, supplier_id) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    product_name.get(),
-                    category.get(),
-                    size.get(),
-                    color.get(),
-                    qty_val,
-                    price_val,
-                    cost_val,
-                    supplier_id
-                ))
-                
-                # Log activity
-                cursor.execute("INSERT INTO activity_log (user_id, activity) VALUES (%s, %s)",
-                              (current_user["id"], f"Added new product: {product_name.get()}"))
-                
-                db.commit()
-                show_notification(popup, "Product added successfully!", "success")
-                popup.after(1500, popup.destroy)
-                
-                # Refresh inventory display
-                display_inventory(parent)
-            except Exception as e:
-                show_notification(popup, f"Error: {str(e)}", "danger")
-            finally:
-                db.close()
+        try:
+            garment_repo.add(product_name.get(), category.get(), size.get(), color.get(),
+                             qty_val, price_val, cost_val, supplier_id, current_user["id"])
+            show_notification(popup, "Product added successfully!", "success")
+            popup.after(1500, popup.destroy)
+            
+            # Refresh inventory display
+            display_inventory(parent)
+        except Exception as e:
+            show_notification(popup, f"Error: {str(e)}", "danger")
     
     # Save button
     save_btn = tk.Button(btn_frame, text="Save Product", command=save_product,
@@ -1656,6 +4666,1092 @@ def add_garment_form(parent):
                           bg=COLORS["light"], fg=COLORS["primary"], padx=20, pady=10)
     cancel_btn.pack(side=tk.RIGHT)
 
+# Point of sale
+DEADLOCK_RETRIES = 3
+MYSQL_DEADLOCK = 1213
+MYSQL_LOCK_WAIT_TIMEOUT = 1205
+
+
+class InsufficientStockError(Exception):
+    """Raised when a sale asks for more units than a garment has in stock"""
+
+
+def retry_on_deadlock(func, *args):
+    """Call func(*args), retrying it when MySQL rolls it back as a deadlock victim or a lock wait times out
+
+    func must run one whole transaction of its own, so every attempt starts clean.
+    Stock-changing transactions all lock garments before orders, and garments in
+    id order, which keeps deadlocks rare; this covers the ones that still happen.
+    """
+    for attempt in range(DEADLOCK_RETRIES):
+        try:
+            return func(*args)
+        except mysql.connector.Error as err:
+            if err.errno not in (MYSQL_DEADLOCK, MYSQL_LOCK_WAIT_TIMEOUT) or attempt == DEADLOCK_RETRIES - 1:
+                raise
+
+
+def record_sale(user_id, lines, sale_time=None):
+    """Record a multi-line sale atomically and decrement stock
+
+    lines is an iterable of (garment_id, quantity) or (garment_id, quantity,
+    unit_price); the garment's list price is used when no price is given.
+    The garment rows are locked in id order, so concurrent checkouts of the
+    same SKUs queue behind each other instead of overselling. Raises
+    InsufficientStockError (nothing is written) if any line cannot be filled.
+    """
+    sale_time = sale_time or datetime.now()
+
+    # Merge repeated garments so each row is locked and updated once
+    requested = {}
+    prices = {}
+    for line in lines:
+        garment_id, quantity = int(line[0]), int(line[1])
+        if quantity <= 0:
+            raise ValueError("Sale quantities must be positive")
+        requested[garment_id] = requested.get(garment_id, 0) + quantity
+        if len(line) > 2 and line[2] is not None:
+            prices[garment_id] = float(line[2])
+    if not requested:
+        raise ValueError("A sale needs at least one line")
+
+    return retry_on_deadlock(_record_sale_once, user_id, requested, prices, sale_time)
+
+def _record_sale_once(user_id, requested, prices, sale_time):
+    ids = sorted(requested)
+    placeholders = ", ".join(["%s"] * len(ids))
+
+    with db_pool.connection() as db:
+        cursor = db.cursor()
+        db.start_transaction()
+        try:
+            cursor.execute(f"""
+                SELECT id, garment_name, category, quantity, price, cost_price, reserved_quantity
+                FROM garments WHERE id IN ({placeholders})
+                ORDER BY id
+                FOR UPDATE
+            """, ids)
+            garments = {row[0]: row for row in cursor.fetchall()}
+
+            missing = [gid for gid in ids if gid not in garments]
+            if missing:
+                raise ValueError(f"Unknown garment id(s): {', '.join(map(str, missing))}")
+            # Units reserved by pending orders are not for sale
+            short = [garments[gid] for gid in ids if garments[gid][3] - garments[gid][6] < requested[gid]]
+            if short:
+                raise InsufficientStockError("Not enough stock for " + ", ".join(
+                    f"{g[1]} ({g[3] - g[6]} available, {requested[g[0]]} requested)" for g in short))
+
+            # One statement decrements every line
+            cases = " ".join(["WHEN %s THEN quantity - %s"] * len(ids))
+            case_params = [value for gid in ids for value in (gid, requested[gid])]
+            cursor.execute(f"UPDATE garments SET quantity = CASE id {cases} END WHERE id IN ({placeholders})",
+                           case_params + ids)
+
+            sale_rows = []
+            summary = {}
+            result_lines = []
+            for gid in ids:
+                _, name, category, on_hand, list_price, cost_price, reserved = garments[gid]
+                quantity = requested[gid]
+                unit_price = prices.get(gid, list_price)
+                profit = (unit_price - cost_price) * quantity
+                sale_rows.append((gid, quantity, unit_price, sale_time, profit, user_id))
+                result_lines.append({"garment_id": gid, "name": name, "quantity": quantity,
+                                     "unit_price": unit_price, "profit": profit,
+                                     "remaining": on_hand - quantity})
+
+                new_quantity = on_hand - quantity
+                threshold = low_stock_alerts.threshold(gid, category)
+                low = int(new_quantity < threshold) - int(on_hand < threshold)
+                items, qty, value, low_total = summary.get(category, (0, 0, 0.0, 0))
+                summary[category] = (items, qty - quantity, value - quantity * list_price, low_total + low)
+
+            cursor.executemany("""
+                INSERT INTO sales (garment_id, quantity, sale_price, sale_date, profit, user_id)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, sale_rows)
+
+            units = sum(requested.values())
+            revenue = sum(line["unit_price"] * line["quantity"] for line in result_lines)
+            total_profit = sum(line["profit"] for line in result_lines)
+
+            # Shared rollup rows last, so their locks are held as briefly as possible
+            for category, delta in summary.items():
+                apply_summary_delta(cursor, category, *delta)
+            record_daily_sales(cursor, sale_time.date(), len(sale_rows), units, revenue, total_profit)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    stock_cache.invalidate(ids)
+    low_stock_alerts.stock_changed([(gid, garments[gid][1], garments[gid][2], garments[gid][3] - requested[gid])
+                                    for gid in ids])
+    log_activity(user_id, f"Recorded sale of {units} items (Rs{revenue:.2f})")
+    return {"lines": result_lines, "units": units, "revenue": revenue, "profit": total_profit}
+
+def record_sale_dialog(parent, garment_id):
+    """Ask for a quantity and sell one garment from the inventory screen"""
+    # Availability comes from the stock cache, which may trail a sale made by another
+    # process by up to STOCK_SYNC_INTERVAL; record_sale re-checks it under a row lock
+    query_executor.submit(lambda: stock_cache.get(garment_id),
+                          lambda level: ask_sale_quantity(parent, garment_id, level),
+                          lambda err: show_notification(parent, f"Could not read stock: {err}", "danger"))
+
+def ask_sale_quantity(parent, garment_id, level):
+    if level is None:
+        show_notification(parent, "This garment no longer exists", "danger")
+        return
+    if level.available <= 0:
+        show_notification(parent, "Out of stock - every unit is sold or reserved", "warning")
+        return
+    quantity = simpledialog.askinteger("Record Sale", f"Quantity sold ({level.available} available):",
+                                       parent=parent, minvalue=1, maxvalue=level.available)
+    if not quantity:
+        return
+
+    def done(result):
+        line = result["lines"][0]
+        show_notification(parent, f"Sold {line['quantity']} x {line['name']} "
+                                  f"(Rs{result['revenue']:.2f}, {line['remaining']} left)", "success")
+        navigate(display_inventory, parent)
+
+    def failed(err):
+        show_notification(parent, f"Sale not recorded: {err}", "danger")
+
+    query_executor.submit(lambda: record_sale(current_user["id"], [(garment_id, quantity)]),
+                          done, failed)
+
+# Order processing
+# Creating an order reserves its units (garments.reserved_quantity), shipping
+# turns the reservation into a stock decrement and cancelling releases it.
+# Status changes are applied to any number of orders with set-based statements.
+ORDER_TRANSITIONS = {
+    # new status -> statuses it may be reached from
+    "shipped": ("pending",),
+    "delivered": ("shipped",),
+    "cancelled": ("pending",)
+}
+
+def create_order(garment_id, quantity, customer_name, customer_contact, user_id=None):
+    """Create a pending order, reserving its stock; returns the new order id"""
+    if quantity <= 0:
+        raise ValueError("Order quantity must be positive")
+
+    order_id = retry_on_deadlock(_create_order_once, garment_id, quantity, customer_name, customer_contact)
+    stock_cache.invalidate([garment_id])
+
+    if user_id is not None:
+        log_activity(user_id, f"Created order #{order_id} for {customer_name}")
+    return order_id
+
+def _create_order_once(garment_id, quantity, customer_name, customer_contact):
+    with db_pool.connection() as db:
+        cursor = db.cursor()
+        db.start_transaction()
+        try:
+            # Reserve only if enough unreserved stock remains - a single atomic check-and-set.
+            # This locks the garment row before the order is written (garments before orders).
+            cursor.execute("""
+                UPDATE garments SET reserved_quantity = reserved_quantity + %s
+                WHERE id = %s AND quantity - reserved_quantity >= %s
+            """, (quantity, garment_id, quantity))
+            if cursor.rowcount == 0:
+                raise InsufficientStockError(f"Not enough unreserved stock for garment {garment_id}")
+
+            cursor.execute("""
+                INSERT INTO orders (garment_id, quantity, customer_name, customer_contact)
+                VALUES (%s, %s, %s, %s)
+            """, (garment_id, quantity, customer_name, customer_contact))
+            order_id = cursor.lastrowid
+            increment_counter(cursor, "total_orders")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return order_id
+
+def update_order_status(order_ids, new_status, user_id=None):
+    """Move many orders to new_status in one transaction; returns how many changed
+
+    Orders not in a status that may move to new_status are left untouched.
+    """
+    if new_status not in ORDER_TRANSITIONS:
+        raise ValueError(f"Orders cannot be moved to '{new_status}'")
+    order_ids = sorted({int(order_id) for order_id in order_ids})
+    if not order_ids:
+        return 0
+
+    from_statuses = ORDER_TRANSITIONS[new_status]
+    id_list = ", ".join(["%s"] * len(order_ids))
+    status_list = ", ".join(["%s"] * len(from_statuses))
+    eligible = f"id IN ({id_list}) AND status IN ({status_list})"
+    params = order_ids + list(from_statuses)
+
+    changed, per_garment, garments = retry_on_deadlock(
+        _update_order_status_once, order_ids, new_status, eligible, params)
+
+    if changed and new_status in ("shipped", "cancelled"):
+        stock_cache.invalidate(per_garment)
+    if changed and new_status == "shipped":
+        low_stock_alerts.stock_changed([(garment_id, name, category, quantity - int(per_garment[garment_id]))
+                                        for garment_id, name, category, quantity, price in garments])
+    if changed and user_id is not None:
+        log_activity(user_id, f"Marked {changed} orders {new_status}")
+    return changed
+
+def _update_order_status_once(order_ids, new_status, eligible, params):
+    garments = []
+    with db_pool.connection() as db:
+        cursor = db.cursor()
+        db.start_transaction()
+        try:
+            if new_status in ("shipped", "cancelled"):
+                # Lock the garments before the orders, in id order, like record_sale and
+                # create_order do. Which garments the orders point at is read without a
+                # lock first; an order's garment never changes, so the set stays valid.
+                order_list = ", ".join(["%s"] * len(order_ids))
+                cursor.execute(f"SELECT DISTINCT garment_id FROM orders WHERE id IN ({order_list})", order_ids)
+                garment_ids = sorted(row[0] for row in cursor.fetchall())
+                if garment_ids:
+                    garment_list = ", ".join(["%s"] * len(garment_ids))
+                    cursor.execute(f"""
+                        SELECT id, garment_name, category, quantity, price FROM garments
+                        WHERE id IN ({garment_list})
+                        ORDER BY id
+                        FOR UPDATE
+                    """, garment_ids)
+                    garments = cursor.fetchall()
+
+            # Lock the eligible orders and total their units per garment
+            cursor.execute(f"""
+                SELECT garment_id, SUM(quantity) FROM orders
+                WHERE {eligible}
+                GROUP BY garment_id
+                FOR UPDATE
+            """, params)
+            per_garment = dict(cursor.fetchall())
+            garments = [garment for garment in garments if garment[0] in per_garment]
+
+            if per_garment and new_status in ("shipped", "cancelled"):
+                # Release the reservations; shipping also takes the units out of stock
+                stock_change = "g.quantity = g.quantity - o.units, " if new_status == "shipped" else ""
+                cursor.execute(f"""
+                    UPDATE garments g
+                    JOIN (SELECT garment_id, SUM(quantity) AS units FROM orders
+                          WHERE {eligible} GROUP BY garment_id) o ON o.garment_id = g.id
+                    SET {stock_change}g.reserved_quantity = g.reserved_quantity - o.units
+                """, params)
+
+                if new_status == "shipped":
+                    summary = {}
+                    for garment_id, name, category, quantity, price in garments:
+                        units = int(per_garment[garment_id])
+                        threshold = low_stock_alerts.threshold(garment_id, category)
+                        low = int(quantity - units < threshold) - int(quantity < threshold)
+                        items, qty, value, low_total = summary.get(category, (0, 0, 0.0, 0))
+                        summary[category] = (items, qty - units, value - units * price, low_total + low)
+                    for category, delta in summary.items():
+                        apply_summary_delta(cursor, category, *delta)
+
+            cursor.execute(f"UPDATE orders SET status = %s WHERE {eligible}", [new_status] + params)
+            changed = cursor.rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return changed, per_garment, garments
+
+def add_to_order(parent, garment_id):
+    """Form to place an order for a garment from the inventory screen"""
+    order_popup = tk.Toplevel(parent)
+    order_popup.title("Add to Order")
+    order_popup.geometry("450x320")
+    order_popup.configure(bg=COLORS["light"])
+    
+    tk.Label(order_popup, text="New Order", font=("Montserrat", 16, "bold"),
+            bg=COLORS["light"], fg=COLORS["primary"]).pack(pady=20)
+    
+    form = tk.Frame(order_popup, bg=COLORS["light"], padx=20)
+    form.pack(fill=tk.BOTH, expand=True)
+    
+    # Quantity
+    tk.Label(form, text="Quantity", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=0, column=0, sticky="w", pady=10)
+    quantity = tk.Spinbox(form, from_=1, to=10000, font=("Montserrat", 12), width=10)
+    quantity.grid(row=0, column=1, sticky="w", pady=10)
+    
+    # Customer name
+    tk.Label(form, text="Customer Name", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=1, column=0, sticky="w", pady=10)
+    customer_name = tk.Entry(form, font=("Montserrat", 12), width=25)
+    customer_name.grid(row=1, column=1, sticky="w", pady=10)
+    
+    # Customer contact
+    tk.Label(form, text="Customer Contact", font=("Montserrat", 12),
+            bg=COLORS["light"], fg=COLORS["dark"]).grid(row=2, column=0, sticky="w", pady=10)
+    customer_contact = tk.Entry(form, font=("Montserrat", 12), width=25)
+    customer_contact.grid(row=2, column=1, sticky="w", pady=10)
+    
+    def save_order():
+        try:
+            qty_val = int(quantity.get())
+        except ValueError:
+            show_notification(order_popup, "Invalid quantity", "danger")
+            return
+        # Read the form here - the worker thread must not touch Tk widgets
+        name, contact = customer_name.get(), customer_contact.get()
+        if not name:
+            show_notification(order_popup, "Please enter the customer name", "warning")
+            return
+        
+        def done(order_id):
+            show_notification(parent, f"Order #{order_id} created", "success")
+            if order_popup.winfo_exists():
+                order_popup.destroy()
+        
+        def failed(err):
+            if order_popup.winfo_exists():
+                show_notification(order_popup, f"Error: {err}", "danger")
+        
+        query_executor.submit(
+            lambda: create_order(garment_id, qty_val, name, contact,
+                                 current_user["id"] if current_user else None),
+            done, failed)
+    
+    btn_frame = tk.Frame(order_popup, bg=COLORS["light"], pady=20)
+    btn_frame.pack(fill=tk.X)
+    
+    save_btn = tk.Button(btn_frame, text="Create Order", command=save_order,
+                        font=("Montserrat", 14, "bold"),
+                        bg=COLORS["primary"], fg="white", padx=30, pady=10)
+    save_btn.pack(side=tk.RIGHT, padx=20)
+    
+    cancel_btn = tk.Button(btn_frame, text="Cancel", command=order_popup.destroy,
+                          font=("Montserrat", 14),
+                          bg=COLORS["light"], fg=COLORS["primary"], padx=20, pady=10)
+    cancel_btn.pack(side=tk.RIGHT)
+
+# Replenishment
+# Reorder points come from each garment's own sales velocity rather than the
+# static inventory_threshold. Sales are summed per garment and day in SQL, then
+# the rolling windows are computed with NumPy: velocities with one grouped sum
+# per window over the sales themselves, and the demand spread from a dense
+# day-by-day block built for at most REPLENISH_CHUNK_SIZE sold garments at a time.
+REPLENISH_HISTORY_DAYS = 90   # Days of sales used for velocity and variability
+REPLENISH_SHORT_WINDOW = 7    # Recent window, reacts quickly to rising demand
+REPLENISH_LONG_WINDOW = 28    # Longer window, smooths out single busy days
+REPLENISH_LEAD_TIME_DAYS = 7  # Days between ordering and receiving stock
+REPLENISH_REVIEW_DAYS = 14    # Extra days of demand each reorder should cover
+REPLENISH_SERVICE_Z = 1.65    # Safety-stock factor, roughly a 95% service level
+REPLENISH_CHUNK_SIZE = 10000  # Sold garments per demand block, bounding memory at any catalogue size
+OPEN_PURCHASE_ORDER_STATUSES = ("draft", "sent")  # Stock already on order; not drafted again
+
+REPLENISH_GARMENTS_QUERY = """
+    SELECT g.id, g.garment_name, g.supplier_id, s.supplier_name,
+           g.quantity - g.reserved_quantity, g.cost_price
+    FROM garments g
+    LEFT JOIN suppliers s ON g.supplier_id = s.id
+    ORDER BY g.id
+"""
+# Age in days (0 = today) and units sold, per garment and day
+DAILY_GARMENT_SALES_QUERY = """
+    SELECT garment_id, DATEDIFF(%s, DATE(sale_date)), SUM(quantity)
+    FROM sales
+    WHERE sale_date >= %s AND sale_date < %s
+    GROUP BY garment_id, DATE(sale_date)
+"""
+
+def demand_spread(rows, ages, units, count, history_days, lead_time):
+    """Standard deviation of demand over every lead-time-long window, per garment
+
+    rows/ages/units are the daily sales (garment index, age in days, units).
+    Garments without sales get 0. Only sold garments get a demand row, and
+    only REPLENISH_CHUNK_SIZE of them at a time.
+    """
+    spread = np.zeros(count)
+    window = max(1, min(lead_time, history_days))
+    order = np.argsort(rows, kind="stable")
+    rows, ages, units = rows[order], ages[order], units[order]
+    sold = np.unique(rows)
+    for first in range(0, len(sold), REPLENISH_CHUNK_SIZE):
+        chunk = sold[first:first + REPLENISH_CHUNK_SIZE]
+        start, end = np.searchsorted(rows, [chunk[0], chunk[-1] + 1])
+        # Daily demand, one row per garment in the chunk and one column per day, oldest first
+        demand = np.zeros((len(chunk), history_days))
+        np.add.at(demand, (np.searchsorted(chunk, rows[start:end]), history_days - 1 - ages[start:end]),
+                  units[start:end])
+        # Running totals turn every rolling window into a single subtraction
+        totals = np.concatenate([np.zeros((len(chunk), 1)), demand.cumsum(axis=1)], axis=1)
+        spread[chunk] = (totals[:, window:] - totals[:, :-window]).std(axis=1)
+    return spread
+
+def compute_replenishment(today=None, history_days=REPLENISH_HISTORY_DAYS,
+                          lead_time=REPLENISH_LEAD_TIME_DAYS, review_days=REPLENISH_REVIEW_DAYS):
+    """Reorder suggestions for garments whose available stock is at or below their reorder point"""
+    today = today or date.today()
+    garments = fetch_all(REPLENISH_GARMENTS_QUERY)
+    if not garments:
+        return []
+    sales = fetch_all(DAILY_GARMENT_SALES_QUERY, (today, today - timedelta(days=history_days - 1),
+                                                   today + timedelta(days=1)))
+
+    ids = np.array([row[0] for row in garments], dtype=np.int64)
+    available = np.array([row[4] for row in garments], dtype=float)
+    velocity = np.zeros(len(ids))
+    safety_stock = np.zeros(len(ids))
+
+    if sales:
+        sale_ids = np.array([row[0] for row in sales], dtype=np.int64)
+        ages = np.array([row[1] for row in sales], dtype=np.int64)
+        units = np.array([row[2] for row in sales], dtype=float)
+        rows = np.searchsorted(ids, sale_ids)
+        known = rows < len(ids)
+        known[known] = ids[rows[known]] == sale_ids[known]  # Sales of deleted garments are ignored
+        rows, ages, units = rows[known], ages[known], units[known]
+
+        def recent_rate(days):
+            days = min(days, history_days)
+            recent = ages < days
+            return np.bincount(rows[recent], weights=units[recent], minlength=len(ids)) / days
+
+        # The faster of the two rates, so a demand spike isn't averaged away
+        velocity = np.maximum(recent_rate(REPLENISH_SHORT_WINDOW), recent_rate(REPLENISH_LONG_WINDOW))
+        safety_stock = demand_spread(rows, ages, units, len(ids), history_days, lead_time) * REPLENISH_SERVICE_Z
+
+    reorder_point = velocity * lead_time + safety_stock
+    suggested = np.ceil(reorder_point + velocity * review_days - available)
+    needed = np.flatnonzero((velocity > 0) & (available <= reorder_point) & (suggested > 0))
+
+    suggestions = []
+    for i in needed:
+        garment_id, name, supplier_id, supplier_name, _, cost_price = garments[i]
+        suggestions.append({
+            "garment_id": garment_id, "name": name,
+            "supplier_id": supplier_id, "supplier_name": supplier_name or "No supplier",
+            "available": int(available[i]), "velocity": float(velocity[i]),
+            "reorder_point": float(reorder_point[i]), "quantity": int(suggested[i]),
+            "unit_cost": cost_price
+        })
+    suggestions.sort(key=lambda item: (item["supplier_name"], item["name"]))
+    return suggestions
+
+def create_draft_purchase_orders(suggestions, user_id=None):
+    """One draft purchase order per supplier
+
+    Garments already on an open (draft or sent) purchase order are skipped,
+    so creating drafts twice does not order the same stock twice. Returns
+    ([(purchase_order_id, supplier_name, lines)], number of garments skipped).
+    """
+    created = []
+    skipped = 0
+    with db_pool.connection() as db:
+        cursor = db.cursor()
+        db.start_transaction()
+        try:
+            # Locking the open lines' index range also keeps a concurrent run from drafting them
+            garment_ids = sorted({item["garment_id"] for item in suggestions})
+            on_order = set()
+            if garment_ids:
+                cursor.execute(f"""
+                    SELECT DISTINCT l.garment_id
+                    FROM purchase_order_lines l
+                    JOIN purchase_orders p ON p.id = l.purchase_order_id
+                    WHERE l.garment_id IN ({", ".join(["%s"] * len(garment_ids))})
+                      AND p.status IN ({", ".join(["%s"] * len(OPEN_PURCHASE_ORDER_STATUSES))})
+                    FOR UPDATE
+                """, garment_ids + list(OPEN_PURCHASE_ORDER_STATUSES))
+                on_order = {row[0] for row in cursor.fetchall()}
+
+            by_supplier = {}
+            for item in suggestions:
+                if item["garment_id"] in on_order:
+                    skipped += 1
+                    continue
+                by_supplier.setdefault((item["supplier_id"], item["supplier_name"]), []).append(item)
+
+            for (supplier_id, supplier_name), items in by_supplier.items():
+                cursor.execute("INSERT INTO purchase_orders (supplier_id, created_by) VALUES (%s, %s)",
+                               (supplier_id, user_id))
+                purchase_order_id = cursor.lastrowid
+                cursor.executemany("""
+                    INSERT INTO purchase_order_lines (purchase_order_id, garment_id, quantity, unit_cost)
+                    VALUES (%s, %s, %s, %s)
+                """, [(purchase_order_id, item["garment_id"], item["quantity"], item["unit_cost"])
+                      for item in items])
+                created.append((purchase_order_id, supplier_name, len(items)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    if created and user_id is not None:
+        log_activity(user_id, f"Created {len(created)} draft purchase orders")
+    return created, skipped
+
+def view_replenishment(parent):
+    clear_frame(parent)
+    create_title_bar(parent, "Replenishment")
+
+    # Toolbar
+    toolbar = tk.Frame(parent, bg=COLORS["light"])
+    toolbar.pack(fill=tk.X, padx=20)
+
+    summary_label = tk.Label(toolbar, text="", font=("Montserrat", 12),
+                            bg=COLORS["light"], fg=COLORS["dark"])
+    summary_label.pack(side=tk.LEFT)
+
+    if current_role == 'admin':
+        draft_btn = tk.Button(toolbar, text="Create Draft POs", font=("Montserrat", 12),
+                             bg=COLORS["primary"], fg="white", padx=15, pady=5,
+                             command=lambda: create_drafts())
+        draft_btn.pack(side=tk.RIGHT)
+
+    tk.Button(toolbar, text="Recalculate", font=("Montserrat", 12),
+             bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5,
+             command=lambda: load_suggestions()).pack(side=tk.RIGHT, padx=5)
+
+    # Suggestions table
+    table_frame = tk.Frame(parent, bg=COLORS["light"], padx=20, pady=20)
+    table_frame.pack(fill=tk.BOTH, expand=True)
+
+    table_scroll_y = tk.Scrollbar(table_frame)
+    table_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+
+    columns = ("Supplier", "Garment", "Available", "Sold / Day", "Reorder Point", "Order Qty", "Est. Cost")
+    suggestions_table = VirtualTreeview(
+        table_frame, columns=columns, show="headings", yscrollcommand=table_scroll_y.set,
+        formatter=lambda item: (item["supplier_name"], item["name"], item["available"],
+                                f"{item['velocity']:.1f}", f"{item['reorder_point']:.0f}", item["quantity"],
+                                f"Rs{item['quantity'] * item['unit_cost']:.2f}"))
+    table_scroll_y.config(command=suggestions_table.yview)
+
+    for column, width, anchor in zip(columns, (180, 250, 100, 100, 120, 100, 120),
+                                     ("w", "w", "center", "center", "center", "center", "e")):
+        suggestions_table.heading(column, text=column)
+        suggestions_table.column(column, width=width, anchor=anchor)
+
+    suggestions_table.pack(fill=tk.BOTH, expand=True)
+
+    def show(suggestions):
+        suggestions_table.set_rows(suggestions)
+        suppliers = len({item["supplier_id"] for item in suggestions})
+        summary_label.config(text=f"{len(suggestions)} garments to reorder from {suppliers} suppliers")
+
+    def load_suggestions():
+        run_query(table_frame, compute_replenishment, show, "Calculating...")
+
+    def create_drafts():
+        # Selected rows only, or every suggestion when nothing is selected
+        items = suggestions_table.selected_rows() or suggestions_table.rows
+        if not items:
+            show_notification(parent, "Nothing to reorder", "info")
+            return
+
+        def done(result):
+            created, skipped = result
+            lines = sum(count for _, _, count in created)
+            message = f"Created {len(created)} draft purchase orders ({lines} lines)"
+            if skipped:
+                message += f"; {skipped} garments already on order were skipped"
+            show_notification(parent, message, "success" if created else "info")
+
+        query_executor.submit(
+            lambda: create_draft_purchase_orders(items, current_user["id"] if current_user else None),
+            done, lambda err: show_notification(parent, f"Error: {err}", "danger"))
+
+    load_suggestions()
+
+# Bulk garment import
+IMPORT_BATCH_SIZE = 1000  # Rows per INSERT batch and transaction
+IMPORT_MAX_ERRORS = 1000  # Stop collecting per-row errors beyond this many
+IMPORT_COLUMN_ALIASES = {
+    "name": "garment_name",
+    "product_name": "garment_name",
+    "supplier_name": "supplier",
+    "cost": "cost_price"
+}
+GARMENT_INSERT_QUERY = """
+    INSERT INTO garments 
+    (garment_name, category, size, color, quantity, price, cost_price, supplier_id) 
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+def normalize_import_header(header):
+    key = (header or "").strip().lower().replace(" ", "_")
+    return IMPORT_COLUMN_ALIASES.get(key, key)
+
+def read_import_rows(path):
+    """Yield (line_number, row dict) from a CSV or Excel file without loading it whole"""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            import openpyxl
+        except ImportError:
+            raise ValueError("Excel import requires the openpyxl package; save the sheet as CSV instead")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [normalize_import_header(str(h) if h is not None else "") for h in next(rows, [])]
+            for line, values in enumerate(rows, start=2):
+                yield line, {h: ("" if v is None else str(v)) for h, v in zip(headers, values)}
+        finally:
+            workbook.close()
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        headers = [normalize_import_header(h) for h in next(reader, [])]
+        for line, values in enumerate(reader, start=2):
+            if values:
+                yield line, dict(zip(headers, values))
+
+def validate_garment_row(row, supplier_ids):
+    """Return (insert values, None) for a valid row or (None, error message)"""
+    name = row.get("garment_name", "").strip()
+    category = row.get("category", "").strip()
+    size = row.get("size", "").strip()
+    color = row.get("color", "").strip()
+
+    for field, value, limit in (("garment_name", name, 255), ("category", category, 100),
+                                ("size", size, 10), ("color", color, 50)):
+        if not value:
+            return None, f"{field} is required"
+        if len(value) > limit:
+            return None, f"{field} is longer than {limit} characters"
+
+    try:
+        quantity = int(row.get("quantity", "").strip())
+        price = float(row.get("price", "").strip())
+        cost_price = float(row.get("cost_price", "").strip())
+    except ValueError:
+        return None, "quantity, price and cost_price must be numbers"
+    if quantity < 0 or price < 0 or cost_price < 0:
+        return None, "quantity, price and cost_price cannot be negative"
+
+    supplier = row.get("supplier", "").strip()
+    supplier_id = None
+    if supplier:
+        supplier_id = supplier_ids.get(supplier.lower())
+        if supplier_id is None:
+            return None, f"unknown supplier '{supplier}'"
+
+    return (name, category, size, color, quantity, price, cost_price, supplier_id), None
+
+def import_garments(path, batch_size=IMPORT_BATCH_SIZE, progress=None, user_id=None):
+    """Stream garments from a CSV/Excel file into the database in batched transactions
+
+    progress, if given, is called after each batch with the running result
+    dict. Returns {"imported", "rejected", "errors", "seconds", "rows_per_sec"}
+    where errors is a list of (line_number, message).
+    """
+    started = time.monotonic()
+    result = {"imported": 0, "rejected": 0, "errors": [], "seconds": 0.0, "rows_per_sec": 0.0}
+
+    # Resolve supplier names once instead of per row
+    supplier_ids = {name.lower(): sid for sid, name in get_suppliers()}
+
+    def record_error(line, message):
+        result["rejected"] += 1
+        if len(result["errors"]) < IMPORT_MAX_ERRORS:
+            result["errors"].append((line, message))
+
+    with db_pool.connection() as db:
+        cursor = db.cursor()
+
+        def insert(rows):
+            # Category rollups for the whole batch, applied once per category.
+            # New garments have no override of their own yet, only their category's.
+            deltas = {}
+            for line, values in rows:
+                category, quantity, price = values[1], values[4], values[5]
+                items, total_qty, value, low = deltas.get(category, (0, 0, 0.0, 0))
+                deltas[category] = (items + 1, total_qty + quantity, value + quantity * price,
+                                    low + (quantity < low_stock_alerts.threshold(None, category)))
+            try:
+                cursor.executemany(GARMENT_INSERT_QUERY, [values for line, values in rows])
+                for category, delta in deltas.items():
+                    apply_summary_delta(cursor, category, *delta)
+                db.commit()
+                result["imported"] += len(rows)
+            except (mysql.connector.IntegrityError, mysql.connector.DataError) as err:
+                db.rollback()
+                if len(rows) == 1:
+                    record_error(rows[0][0], f"rejected by database: {err}")
+                    return
+                # Bisect so only the rows the database actually refuses are reported
+                middle = len(rows) // 2
+                insert(rows[:middle])
+                insert(rows[middle:])
+            except mysql.connector.Error as err:
+                # Not caused by the data (e.g. the connection dropped) - retrying row by row won't help
+                db.rollback()
+                for line, values in rows:
+                    record_error(line, f"batch rejected by database: {err}")
+
+        def write_batch(batch):
+            insert(batch)
+
+            elapsed = time.monotonic() - started
+            result["seconds"] = elapsed
+            result["rows_per_sec"] = result["imported"] / elapsed if elapsed else 0.0
+            if progress:
+                progress(result)
+
+        batch = []
+        for line, row in read_import_rows(path):
+            values, error = validate_garment_row(row, supplier_ids)
+            if error:
+                record_error(line, error)
+                continue
+            batch.append((line, values))
+            if len(batch) >= batch_size:
+                write_batch(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+
+    if result["imported"] and user_id is not None:
+        log_activity(user_id, f"Imported {result['imported']} products from {os.path.basename(path)}")
+
+    reset_inventory_pages()
+    reference_cache.invalidate("categories")
+    low_stock_alerts.refresh()
+    result["seconds"] = time.monotonic() - started
+    result["rows_per_sec"] = result["imported"] / result["seconds"] if result["seconds"] else 0.0
+    return result
+
+class OperationCancelled(Exception):
+    """Raised from a run_with_progress task's progress callback once the user cancels"""
+
+
+def run_with_progress(parent, title, task, describe, on_finished, cancellable=False):
+    """Run task(progress) on a query worker while a small window shows its progress
+
+    task receives a callback it should call with a progress dict;
+    describe turns the latest dict into the status line. With cancellable,
+    the window gets a Cancel button and the callback raises
+    OperationCancelled at the task's next progress report.
+    """
+    progress_window = tk.Toplevel(parent)
+    progress_window.title(title)
+    progress_window.geometry("450x200")
+    progress_window.configure(bg=COLORS["light"])
+
+    tk.Label(progress_window, text=title, font=("Montserrat", 14, "bold"),
+            bg=COLORS["light"], fg=COLORS["primary"]).pack(pady=20)
+    status_label = tk.Label(progress_window, text="Starting...", font=("Montserrat", 12),
+                           bg=COLORS["light"], fg=COLORS["dark"])
+    status_label.pack(pady=10)
+
+    # The worker thread only writes here; the Tk side polls it
+    latest = {}
+    cancel = threading.Event()
+
+    def report(stats):
+        latest.update(stats)
+        if cancel.is_set():
+            raise OperationCancelled(f"{title} cancelled")
+
+    def request_cancel():
+        cancel.set()
+        status_label.config(text="Cancelling...")
+
+    if cancellable:
+        tk.Button(progress_window, text="Cancel", command=request_cancel, font=("Montserrat", 12),
+                 bg=COLORS["light"], fg=COLORS["primary"], padx=15, pady=5).pack(pady=10)
+        progress_window.protocol("WM_DELETE_WINDOW", request_cancel)
+
+    def refresh_status():
+        if not progress_window.winfo_exists():
+            return
+        if latest and not cancel.is_set():
+            status_label.config(text=describe(latest))
+        progress_window.after(200, refresh_status)
+
+    def finished(result):
+        if progress_window.winfo_exists():
+            progress_window.destroy()
+        on_finished(result)
+
+    def failed(err):
+        if progress_window.winfo_exists():
+            progress_window.destroy()
+        if isinstance(err, OperationCancelled):
+            messagebox.showinfo(title, str(err))
+        else:
+            messagebox.showerror(f"{title} Failed", str(err))
+
+    query_executor.submit(lambda: task(report), finished, failed)
+    refresh_status()
+
+def import_garments_dialog(parent):
+    """Pick a CSV/Excel file and import it in the background with a progress window"""
+    path = filedialog.askopenfilename(
+        title="Import Products",
+        filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("All files", "*.*")])
+    if not path:
+        return
+
+    def finished(result):
+        message = (f"Imported {result['imported']} products in {result['seconds']:.1f}s "
+                   f"({result['rows_per_sec']:.0f} rows/sec).")
+        if result["errors"]:
+            shown = "\n".join(f"Line {line}: {error}" for line, error in result["errors"][:15])
+            more = result["rejected"] - 15
+            message += f"\n\n{result['rejected']} rows rejected:\n{shown}"
+            if more > 0:
+                message += f"\n...and {more} more"
+            messagebox.showwarning("Import Finished", message)
+        else:
+            messagebox.showinfo("Import Finished", message)
+        if parent.winfo_exists():
+            navigate(display_inventory, parent)
+
+    run_with_progress(
+        parent, f"Importing {os.path.basename(path)}",
+        lambda progress: import_garments(path, progress=progress,
+                                         user_id=current_user["id"] if current_user else None),
+        lambda r: f"{r['imported']} imported, {r['rejected']} rejected ({r['rows_per_sec']:.0f} rows/sec)",
+        finished)
+
+# Streaming export
+EXPORT_CHUNK_SIZE = 5000  # Rows fetched from the server and written per chunk
+EXPORT_DATASETS = {
+    "inventory": (
+        [("id", "int"), ("garment_name", "string"), ("category", "string"), ("size", "string"),
+         ("color", "string"), ("quantity", "int"), ("price", "float"), ("cost_price", "float"),
+         ("supplier", "string"), ("date_added", "timestamp"), ("last_updated", "timestamp")],
+        """
+        SELECT g.id, g.garment_name, g.category, g.size, g.color, g.quantity, g.price, g.cost_price,
+               s.supplier_name, g.date_added, g.last_updated
+        FROM garments g
+        LEFT JOIN suppliers s ON g.supplier_id = s.id
+        {filters}
+        ORDER BY g.id
+        """,
+        None
+    ),
+    "sales": (
+        [("id", "int"), ("garment", "string"), ("quantity", "int"), ("sale_price", "float"),
+         ("profit", "float"), ("sale_date", "timestamp"), ("user", "string")],
+        """
+        SELECT s.id, g.garment_name, s.quantity, s.sale_price, s.profit, s.sale_date, u.username
+        FROM sales s
+        LEFT JOIN garments g ON s.garment_id = g.id
+        LEFT JOIN users u ON s.user_id = u.id
+        {filters}
+        ORDER BY s.sale_date
+        """,
+        "s.sale_date"
+    ),
+    "orders": (
+        [("id", "int"), ("garment", "string"), ("quantity", "int"), ("status", "string"),
+         ("customer_name", "string"), ("customer_contact", "string"), ("order_date", "timestamp")],
+        """
+        SELECT o.id, g.garment_name, o.quantity, o.status, o.customer_name, o.customer_contact, o.order_date
+        FROM orders o
+        LEFT JOIN garments g ON o.garment_id = g.id
+        {filters}
+        ORDER BY o.id
+        """,
+        "o.order_date"
+    )
+}
+
+
+class CsvChunkWriter:
+    def __init__(self, path, headers):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetChunkWriter:
+    """Writes each chunk as a Parquet row group with the dataset's declared schema
+
+    The schema is fixed up front rather than inferred, so a column that is
+    all NULL in the first chunk (a LEFT JOINed supplier, say) keeps its type
+    and an empty export still has the right column types.
+    """
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("Parquet export requires the pyarrow package; export as CSV instead")
+        self._pa = pyarrow
+        types = {"int": pyarrow.int64(), "float": pyarrow.float64(), "string": pyarrow.string(),
+                 "timestamp": pyarrow.timestamp("us")}
+        self._schema = pyarrow.schema([(name, types[kind]) for name, kind in columns])
+        self._floats = [i for i, (name, kind) in enumerate(columns) if kind == "float"]
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression="snappy")
+
+    def write(self, rows):
+        columns = [list(column) for column in zip(*rows)]
+        for i in self._floats:
+            # DECIMAL columns arrive as Decimal, which Arrow will not coerce to double
+            columns[i] = [None if value is None else float(value) for value in columns[i]]
+        self._writer.write_table(self._pa.table(dict(zip(self._schema.names, columns)), schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+EXPORT_KILL_TIMEOUT = 5  # Seconds to wait for a connection to stop an abandoned export query
+
+
+def kill_streaming_query(db):
+    """Stop the statement db is streaming and close db without reading the rest of its rows
+
+    Releasing a connection to the pool drains unread rows, which for an
+    unbuffered export means the remainder of the table. KILL QUERY, sent
+    from a second connection, makes the server stop sending instead.
+    """
+    try:
+        with db_pool.connection(timeout=EXPORT_KILL_TIMEOUT) as killer:
+            killer.cursor().execute("KILL QUERY %s", (db.connection_id,))
+    except mysql.connector.Error:
+        pass  # The server still stops once it sees the socket below has closed
+    db.abandon()
+
+
+def export_dataset(dataset, path, fmt="csv", start=None, end=None,
+                   chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """Stream a dataset to CSV or Parquet in fixed-size chunks
+
+    Rows are read through an unbuffered cursor, so memory use stays at one
+    chunk regardless of the table size. start/end (inclusive dates) limit
+    sales and orders by date. progress, if given, receives {"rows", "seconds"}
+    after every chunk. Returns the same dict at the end. If the export fails
+    or is cancelled, the query is killed rather than read to the end and the
+    partly written file is removed.
+    """
+    columns, sql, date_column = EXPORT_DATASETS[dataset]
+    filters = ""
+    params = []
+    if date_column and start:
+        filters = f"WHERE {date_column} >= %s"
+        params.append(start)
+    if date_column and end:
+        filters += f" {'AND' if filters else 'WHERE'} {date_column} < %s"
+        params.append(end + timedelta(days=1))
+
+    if fmt == "parquet":
+        writer = ParquetChunkWriter(path, columns)
+    else:
+        writer = CsvChunkWriter(path, [name for name, kind in columns])
+    started = time.monotonic()
+    stats = {"rows": 0, "seconds": 0.0}
+    completed = False
+    try:
+        with db_pool.connection() as db:
+            cursor = db.cursor(buffered=False)
+            cursor.execute(sql.format(filters=filters), params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    writer.write(rows)
+                    stats["rows"] += len(rows)
+                    stats["seconds"] = time.monotonic() - started
+                    if progress:
+                        progress(stats)
+            except Exception:
+                # Cancelled or failed mid-stream: don't let the pool drain the rest of the table
+                kill_streaming_query(db)
+                raise
+        completed = True
+    finally:
+        try:
+            writer.close()
+        finally:
+            if not completed and os.path.exists(path):
+                os.remove(path)
+
+    stats["seconds"] = time.monotonic() - started
+    return stats
+
+EXPORT_DEFAULT_DAYS = 365  # Default date range offered for sales and orders exports
+
+def export_dialog(parent, dataset):
+    """Export a dataset in the background, asking for a date range first where the dataset has one"""
+    if EXPORT_DATASETS[dataset][2] is None:
+        export_to_file(parent, dataset)
+        return
+
+    range_popup = tk.Toplevel(parent)
+    range_popup.title(f"Export {dataset.capitalize()}")
+    range_popup.geometry("420x260")
+    range_popup.configure(bg=COLORS["light"])
+
+    tk.Label(range_popup, text="Date Range", font=("Montserrat", 16, "bold"),
+            bg=COLORS["light"], fg=COLORS["primary"]).pack(pady=15)
+
+    form = tk.Frame(range_popup, bg=COLORS["light"], padx=20)
+    form.pack(fill=tk.X)
+
+    today = date.today()
+    entries = []
+    for row, (label, default) in enumerate([("From", today - timedelta(days=EXPORT_DEFAULT_DAYS)),
+                                            ("To", today)]):
+        tk.Label(form, text=label, font=("Montserrat", 12),
+                bg=COLORS["light"], fg=COLORS["dark"]).grid(row=row, column=0, sticky="w", pady=5)
+        entry = tk.Entry(form, font=("Montserrat", 12), width=15)
+        entry.grid(row=row, column=1, sticky="w", pady=5, padx=10)
+        entry.insert(0, default.isoformat())
+        entries.append(entry)
+    tk.Label(form, text="YYYY-MM-DD, inclusive; leave blank for no limit", font=("Montserrat", 9),
+            bg=COLORS["light"], fg=COLORS["secondary"]).grid(row=2, column=0, columnspan=2, sticky="w")
+
+    def confirm():
+        try:
+            start, end = [datetime.strptime(entry.get().strip(), "%Y-%m-%d").date() if entry.get().strip()
+                          else None for entry in entries]
+        except ValueError:
+            show_notification(range_popup, "Dates must be in YYYY-MM-DD format", "warning")
+            return
+        if start and end and start > end:
+            show_notification(range_popup, "The start date is after the end date", "warning")
+            return
+        range_popup.destroy()
+        export_to_file(parent, dataset, start, end)
+
+    tk.Button(range_popup, text="Export", command=confirm, font=("Montserrat", 12, "bold"),
+             bg=COLORS["primary"], fg="white", padx=20, pady=5).pack(pady=15)
+
+def export_to_file(parent, dataset, start=None, end=None):
+    """Ask for a destination file and export a dataset in the background"""
+    period = "".join(f"_{day:%Y%m%d}" for day in (start, end) if day) or f"_{date.today():%Y%m%d}"
+    path = filedialog.asksaveasfilename(
+        title=f"Export {dataset.capitalize()}",
+        defaultextension=".csv",
+        initialfile=f"{dataset}{period}.csv",
+        filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")])
+    if not path:
+        return
+    fmt = "parquet" if path.lower().endswith(".parquet") else "csv"
+
+    def finished(stats):
+        messagebox.showinfo("Export Finished",
+                            f"Exported {stats['rows']} rows to {os.path.basename(path)} "
+                            f"in {stats['seconds']:.1f}s.")
+
+    run_with_progress(
+        parent, f"Exporting {dataset}",
+        lambda progress: export_dataset(dataset, path, fmt, start, end, progress=progress),
+        lambda stats: f"{stats['rows']} rows written",
+        finished, cancellable=True)
+
 # Add new supplier
 def add_new_supplier(parent, supplier_combo):
     """Form to add a new supplier"""
@@ -1710,59 +5806,36 @@ def add_new_supplier(parent, supplier_combo):
             show_notification(supplier_popup, "Please enter supplier name", "warning")
             return
         
-        db = connect_db()
-        if db:
-            cursor = db.cursor()
-            try:
-                cursor.execute("""
-                    INSERT INTO suppliers 
-                    (supplier_name, contact_person, phone, email, address) 
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    supplier_name.get(),
-                    contact_person.get(),
-                    phone.get(),
-                    email.get(),
-                    address.get("1.0", tk.END)
-                ))
-                
-                # Get the new supplier ID
-                supplier_id = cursor.lastrowid
-                
-                # Log activity
-                cursor.execute("INSERT INTO activity_log (user_id, activity) VALUES (%s, %s)",
-                              (current_user["id"], f"Added new supplier: {supplier_name.get()}"))
-                
-                db.commit()
-                show_notification(supplier_popup, "Supplier added successfully!", "success")
-                
-                # Update the supplier dropdown in parent form
-                new_supplier_name = supplier_name.get()
-                
-                # Refresh supplier dropdown
-                suppliers = list(supplier_combo['values'])
-                suppliers.append(new_supplier_name)
-                supplier_combo['values'] = suppliers
-                supplier_combo.set(new_supplier_name)
-                
-                # Add to supplier_ids dictionary in parent scope
-                # We need to get the parent's supplier_ids dictionary
-                for widget in parent.winfo_children():
-                    if isinstance(widget, tk.Frame):
-                        for child in widget.winfo_children():
-                            if isinstance(child, tk.Frame):
-                                if hasattr(child, 'winfo_children'):
-                                    for grandchild in child.winfo_children():
-                                        if isinstance(grandchild, ttk.Combobox) and grandchild == supplier_combo:
-                                            # Found the combo box, now update supplier_ids in this scope
-                                            parent.supplier_ids[new_supplier_name] = supplier_id
-                
-                supplier_popup.after(1500, supplier_popup.destroy)
-                
-            except Exception as e:
-                show_notification(supplier_popup, f"Error: {str(e)}", "danger")
-            finally:
-                db.close()
+        try:
+            supplier_id = supplier_repo.add(supplier_name.get(), contact_person.get(), phone.get(),
+                                            email.get(), address.get("1.0", tk.END), current_user["id"])
+            show_notification(supplier_popup, "Supplier added successfully!", "success")
+            
+            # Update the supplier dropdown in parent form
+            new_supplier_name = supplier_name.get()
+            
+            # Refresh supplier dropdown
+            suppliers = list(supplier_combo['values'])
+            suppliers.append(new_supplier_name)
+            supplier_combo['values'] = suppliers
+            supplier_combo.set(new_supplier_name)
+            
+            # Add to supplier_ids dictionary in parent scope
+            # We need to get the parent's supplier_ids dictionary
+            for widget in parent.winfo_children():
+                if isinstance(widget, tk.Frame):
+                    for child in widget.winfo_children():
+                        if isinstance(child, tk.Frame):
+                            if hasattr(child, 'winfo_children'):
+                                for grandchild in child.winfo_children():
+                                    if isinstance(grandchild, ttk.Combobox) and grandchild == supplier_combo:
+                                        # Found the combo box, now update supplier_ids in this scope
+                                        parent.supplier_ids[new_supplier_name] = supplier_id
+            
+            supplier_popup.after(1500, supplier_popup.destroy)
+            
+        except Exception as e:
+            show_notification(supplier_popup, f"Error: {str(e)}", "danger")
     
     # Save button
     save_btn = tk.Button(btn_frame, text="Save Supplier", command=save_supplier,
@@ -1778,5 +5851,20 @@ def add_new_supplier(parent, supplier_combo):
 
 # Main entry point
 if __name__ == "__main__":
-    create_tables()
+    if "--check-indexes" in sys.argv or "--archive-activity" in sys.argv:
+        # Command-line modes have no display: set-up errors exit non-zero instead of opening a dialog
+        try:
+            create_tables(interactive=False)
+        except (mysql.connector.Error, MigrationLockError) as err:
+            print(f"Database set-up failed: {err}", file=sys.stderr)
+            sys.exit(2)
+    if "--check-indexes" in sys.argv:
+        # Verify that every hot query is served by an index, for CI or after schema changes
+        sys.exit(1 if print_query_plan_report() else 0)
+    if "--archive-activity" in sys.argv:
+        # Retention job for cron: archive and drop activity_log months past the retention period
+        for month, rows, path in archive_activity_log():
+            print(f"{month:%Y-%m}: {rows} entries -> {path}")
+        sys.exit(0)
+    # The GUI sets the schema up once, in show_login, where errors can be shown
     show_login()
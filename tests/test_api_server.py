@@ -0,0 +1,89 @@
+"""Request framing and conditional responses of the API server, without a database"""
+import asyncio
+
+import pytest
+
+from api_server import ApiServer, Rendered, etag_matches
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def exchange(raw, rendered=None):
+    """Feed raw request bytes to ApiServer.handle; returns (response bytes, connection closed)"""
+    server = ApiServer(workers=1)
+    rendered = rendered or Rendered(200, {"ok": True})
+
+    async def render(target):
+        return rendered
+
+    server.render = render
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        writer = FakeWriter()
+        await server.handle(reader, writer)
+        return writer
+
+    try:
+        writer = asyncio.run(run())
+    finally:
+        server.executor.shutdown(wait=False)
+    return writer.data, writer.closed
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('  *  ', True),
+    ('"ab"', False),
+    ('"abcd"', False),
+    ('W/"xyz"', False),
+    ('abc', False),
+    ('', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, 'W/"abc"') is expected
+
+
+def test_if_none_match_gives_304():
+    rendered = Rendered(200, {"ok": True})
+    response, _ = exchange(b"GET /health HTTP/1.1\r\nConnection: close\r\n"
+                           b"If-None-Match: \"other\", " + rendered.etag.encode() + b"\r\n\r\n", rendered)
+    assert response.startswith(b"HTTP/1.1 304 ")
+
+
+def test_etag_substring_is_not_a_match():
+    rendered = Rendered(200, {"ok": True})
+    partial = rendered.etag[:-3] + '"'
+    response, _ = exchange(b"GET /health HTTP/1.1\r\nConnection: close\r\n"
+                           b"If-None-Match: " + partial.encode() + b"\r\n\r\n", rendered)
+    assert response.startswith(b"HTTP/1.1 200 ")
+
+
+def test_truncated_body_is_answered_and_closed():
+    response, closed = exchange(b"GET /health HTTP/1.1\r\nContent-Length: 100\r\n\r\nshort")
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Incomplete request body" in response
+    assert closed
+
+
+def test_complete_body_is_skipped():
+    response, closed = exchange(b"GET /health HTTP/1.1\r\nContent-Length: 5\r\nConnection: close\r\n\r\nhello")
+    assert response.startswith(b"HTTP/1.1 200 ")
+    assert closed
@@ -0,0 +1,118 @@
+"""ColumnarRows and its column storage - pure in-memory logic, no database needed"""
+from datetime import datetime
+
+import numpy as np
+
+import main
+from main import ColumnarRows, GarmentRow, GARMENT_COLUMNS, SALE_COLUMNS, SaleRow, Prefix, WordPrefix, _Column
+
+
+GARMENTS = [
+    GarmentRow(1, "Red Shirt", "Tops", "M", "Navy Blue", 5, 10.0, 50.0, "Acme"),
+    GarmentRow(2, "Écharpe", "Accessories", "S", "Rouge", 2, 12.5, 25.0, None),
+    GarmentRow(3, "T-Shirt", "Tops", "L", "Bluegreen", 1, 5.0, 5.0, "Acme"),
+    GarmentRow(4, "Straße Jacket", "Outerwear", "M", "Grün", 3, 80.0, 240.0, "Beta"),
+    GarmentRow(5, "Tee", "Tops", "M", "Black", 3, 5.0, 15.0, "Beta"),
+]
+
+
+def garments(chunk_size=2):
+    chunks = [GARMENTS[i:i + chunk_size] for i in range(0, len(GARMENTS), chunk_size)]
+    return ColumnarRows.build(GarmentRow, GARMENT_COLUMNS, chunks)
+
+
+def ids(rows):
+    return [row.id for row in rows]
+
+
+def test_rows_round_trip_across_chunks():
+    rows = garments()
+    assert len(rows) == len(GARMENTS)
+    assert list(rows) == GARMENTS
+    assert rows[-1] == GARMENTS[-1]
+    assert ids(rows[1:3]) == [2, 3]
+
+
+def test_nulls_round_trip():
+    sales = [SaleRow(1, "Tee", 2, 5.0, None, datetime(2026, 3, 1, 9, 30, 15, 250), "alice"),
+             SaleRow(2, "Tee", 1, None, 1.5, None, None)]
+    rows = ColumnarRows.build(SaleRow, SALE_COLUMNS, [sales])
+    assert list(rows) == sales
+
+
+def test_text_null_reads_back_empty():
+    rows = ColumnarRows.build(GarmentRow, ("int", "text") + GARMENT_COLUMNS[2:],
+                              [[GARMENTS[0]._replace(name=None)]])
+    assert rows[0].name == ""
+
+
+def test_labels_are_interned_once():
+    column = _Column("label")
+    column.extend(["Tops", "Tops", "Outerwear", "Tops"])
+    column.finish()
+    assert sorted(column.labels) == ["Outerwear", "Tops"]
+    assert column.data.dtype == np.uint8
+    assert [column.value(i) for i in range(4)] == ["Tops", "Tops", "Outerwear", "Tops"]
+
+
+def test_sort_is_stable_and_case_insensitive():
+    rows = garments()
+    # Ties on category keep load order, ascending and reversed as a whole when descending
+    assert ids(rows.sorted_by("category")) == [2, 4, 1, 3, 5]
+    assert ids(rows.sorted_by("category", descending=True)) == [5, 3, 1, 4, 2]
+    assert ids(rows.sorted_by("quantity")) == [3, 2, 4, 5, 1]
+    # Same order as sort_key gives plain rows: case-folded code points, so "é" sorts after ASCII
+    assert ids(rows.sorted_by("name")) == [1, 4, 3, 5, 2]
+    assert ids(rows.sorted_by("name")) == ids(sorted(GARMENTS, key=lambda row: main.sort_key(row.name)))
+
+
+def test_sort_of_filtered_view_reuses_column_order():
+    rows = garments()
+    tops = rows.matching({"category": "tops"})
+    assert ids(tops) == [1, 3, 5]
+    assert ids(tops.sorted_by("price")) == [3, 5, 1]
+    column = rows._columns[GarmentRow._fields.index("price")]
+    assert column._sort_order is not None
+
+
+def test_caches_are_dropped_when_rows_are_appended():
+    column = _Column("text")
+    column.extend(["b", "c"])
+    assert list(column.sort_order()) == [0, 1]
+    assert list(column._contains("a")) == [False, False]
+
+    column.extend(["a"])
+    assert list(column.sort_order()) == [2, 0, 1]
+    assert list(column._contains("a")) == [False, False, True]
+
+
+def test_non_ascii_text_is_case_folded():
+    rows = garments()
+    assert ids(rows.matching({"name": "é"})) == [2]
+    assert ids(rows.matching({"name": "ÉCHAR"})) == [2]
+    # casefold changes the byte length of "ß"; later rows must still map back correctly
+    assert ids(rows.matching({"name": "strasse"})) == [4]
+    assert ids(rows.matching({"name": "shirt"})) == [1, 3]
+    assert ids(rows.matching({"color": "GRÜN"})) == [4]
+    assert ids(rows.matching({"color": Prefix("GRÜ")})) == [4]
+
+
+def test_prefix_and_word_prefix():
+    rows = garments()
+    assert ids(rows.matching({"name": Prefix("t")})) == [3, 5]
+    assert ids(rows.matching({"name": WordPrefix("shirt")})) == [1, 3]
+    assert ids(rows.matching({"name": WordPrefix("irt")})) == []
+    assert ids(rows.matching({"name": WordPrefix("jack")})) == [4]
+    assert ids(rows.matching({("name", "color"): WordPrefix("blue")})) == [1, 3]
+
+
+def test_matching_accepts_repeated_fields():
+    rows = garments()
+    filters = [(("name", "color"), WordPrefix("red")), (("name", "color"), WordPrefix("shirt"))]
+    assert ids(rows.matching(filters)) == [1]
+
+
+def test_numeric_ranges():
+    rows = garments()
+    assert ids(rows.matching({"price": (5.0, 12.5)})) == [1, 2, 3, 5]
+    assert ids(rows.matching({"quantity": (None, 2)})) == [2, 3]
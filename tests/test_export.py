@@ -0,0 +1,100 @@
+"""Streaming exports: a cancelled export must stop its query, not read the table to the end"""
+import pytest
+
+import main
+from main import ConnectionPool, OperationCancelled, PooledConnection, export_dataset
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.with_rows = True
+        self.rowcount = -1
+
+    def execute(self, operation, params=None):
+        self.conn.statements.append(operation % tuple(params) if params else operation)
+
+    def fetchmany(self, size):
+        rows, self.conn.pending = self.conn.pending[:size], self.conn.pending[size:]
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, connection_id, rows=()):
+        self.connection_id = connection_id
+        self.pending = list(rows)
+        self.statements = []
+        self.drained = 0
+        self.closed = False
+        self.in_transaction = False
+
+    def cursor(self, buffered=None):
+        return FakeCursor(self)
+
+    def consume_results(self):
+        self.drained += len(self.pending)
+        self.pending = []
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ConnectionPool(size=2)
+    rows = [(i, f"Garment {i}", "Tops", "M", "Red", 1, 5.0) for i in range(1000)]
+    opened = []
+
+    def open_connection():
+        opened.append(FakeConnection(len(opened) + 1, rows if not opened else ()))
+        return PooledConnection(pool, opened[-1])
+
+    pool._open = open_connection
+    pool.opened = opened
+    monkeypatch.setattr(main, "db_pool", pool)
+    return pool
+
+
+def test_complete_export_returns_the_connection(pool, tmp_path):
+    path = tmp_path / "inventory.csv"
+    stats = export_dataset("inventory", str(path), chunk_size=100)
+    assert stats["rows"] == 1000
+    assert len(path.read_text().splitlines()) == 1001
+    assert pool.stats()["idle"] == 1
+
+
+def test_cancelled_export_kills_the_query(pool, tmp_path):
+    path = tmp_path / "inventory.csv"
+
+    def progress(stats):
+        if stats["rows"] >= 200:
+            raise OperationCancelled("Export cancelled")
+
+    with pytest.raises(OperationCancelled):
+        export_dataset("inventory", str(path), chunk_size=100, progress=progress)
+
+    streaming, killer = pool.opened
+    assert killer.statements == ["KILL QUERY 1"]
+    # The streaming connection is closed with its rows unread, not drained and pooled
+    assert streaming.drained == 0 and streaming.closed
+    assert len(streaming.pending) == 800
+    assert pool.stats()["open"] == 1 and pool.stats()["idle"] == 1
+    assert not path.exists()
+
+
+def test_cancel_without_a_free_connection_still_closes(pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "EXPORT_KILL_TIMEOUT", 0)
+    pool.size = 1
+
+    def progress(stats):
+        raise OperationCancelled("Export cancelled")
+
+    with pytest.raises(OperationCancelled):
+        export_dataset("inventory", str(tmp_path / "inventory.csv"), chunk_size=100, progress=progress)
+
+    [streaming] = pool.opened
+    assert streaming.drained == 0 and streaming.closed
+    assert pool.stats()["open"] == 0
@@ -0,0 +1,90 @@
+"""The paged inventory search (SQL) and the "All" mode search (in memory) must find the same garments
+
+The SQL side is checked against a small model of what MySQL does with the
+clauses build_inventory_filter produces: a boolean-mode FULLTEXT "+word*"
+needs a word of name or color starting with each word, LIKE 'prefix%' needs
+the name to start with the prefix, and equality is case-insensitive.
+"""
+import re
+
+import pytest
+
+from main import (ColumnarRows, GarmentRow, GARMENT_COLUMNS, build_inventory_filter,
+                  inventory_snapshot_filters)
+
+
+GARMENTS = [
+    GarmentRow(1, "Red Shirt", "Tops", "M", "Navy Blue", 5, 10.0, 50.0, "Acme"),
+    GarmentRow(2, "Shirtdress", "Dresses", "S", "Red", 2, 10.0, 20.0, None),
+    GarmentRow(3, "T-Shirt", "Tops", "L", "Bluegreen", 1, 5.0, 5.0, "Acme"),
+    GarmentRow(4, "Overshirt", "Tops", "M", "red", 3, 5.0, 15.0, "Beta"),
+    GarmentRow(5, "Tee", "Tops", "M", "Black", 3, 5.0, 15.0, "Beta"),
+    GarmentRow(6, "Straße Jacket", "Outerwear", "XL", "Grün", 4, 80.0, 320.0, "Beta"),
+    GarmentRow(7, "100% Cotton_Tee", "Tops", "S", "White", 9, 6.0, 54.0, None),
+]
+
+
+def sql_matches(where, params, row):
+    """Evaluate build_inventory_filter's WHERE clause against one row the way MySQL would"""
+    params = list(params)
+    for clause in where.split(" AND ") if where else []:
+        value = params.pop(0)
+        if clause.startswith("MATCH("):
+            words = re.findall(r"\w+", f"{row.name} {row.color}".casefold())
+            for term in re.findall(r"\+(\S+)\*", value):
+                if not any(word.startswith(term.casefold()) for word in words):
+                    return False
+        elif clause == "g.garment_name LIKE %s":
+            assert value.endswith("%") and not value.endswith("\\%")
+            prefix = re.sub(r"\\(.)", r"\1", value[:-1])
+            if not row.name.casefold().startswith(prefix.casefold()):
+                return False
+        elif clause == "g.category = %s":
+            if row.category.casefold() != value.casefold():
+                return False
+        elif clause == "g.size = %s":
+            if row.size.casefold() != value.casefold():
+                return False
+        else:
+            raise AssertionError(f"Unexpected clause: {clause}")
+    assert not params
+    return True
+
+
+SEARCHES = [
+    "shirt", "SHIRT", "red shirt", "shirt red", "blue", "blu", "irt",
+    "t-sh", "te", "ov", "t", "jack", "grü", "straße", "strasse",
+    "100%", "cotton_tee", "+shirt -red", "  ", "navy", "bluegreen",
+]
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+@pytest.mark.parametrize("category, size", [(None, None), ("tops", None), (None, "M"), ("Tops", "s")])
+def test_paged_and_snapshot_search_agree(search, category, size):
+    filters = (search or None, category, size)
+    where, params = build_inventory_filter(filters)
+    expected = [row.id for row in GARMENTS if sql_matches(where, params, row)]
+
+    snapshot = ColumnarRows.build(GarmentRow, GARMENT_COLUMNS, [GARMENTS])
+    found = [row.id for row in snapshot.matching(inventory_snapshot_filters(filters))]
+
+    assert found == expected
+
+
+def test_column_specific_terms():
+    snapshot = ColumnarRows.build(GarmentRow, GARMENT_COLUMNS, [GARMENTS])
+
+    def search(term):
+        return [row.id for row in snapshot.matching(inventory_snapshot_filters((term, None, None)))]
+
+    # A word may come from the name or the color, but every word must match somewhere
+    assert search("red") == [1, 2, 4]
+    assert search("red shirt") == [1, 2]
+    assert search("navy shirt") == [1]
+    assert search("black") == [5]
+    # Words are split like FULLTEXT does, on any non-word character
+    assert search("100%") == [7]
+    assert search("t-shirt") == [1, 2, 3]
+    # Short terms only match the start of the name, never the color
+    assert search("re") == [1]
+    assert search("bl") == []
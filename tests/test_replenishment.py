@@ -0,0 +1,82 @@
+"""Reorder-point math of compute_replenishment, with the two database reads replaced by fixed rows"""
+import math
+from datetime import date
+
+import numpy as np
+import pytest
+
+import main
+
+
+TODAY = date(2026, 3, 31)
+
+
+def run(monkeypatch, garments, sales, **kwargs):
+    results = iter([garments, sales])
+    monkeypatch.setattr(main, "fetch_all", lambda query, params=(): next(results))
+    return {item["garment_id"]: item for item in main.compute_replenishment(TODAY, **kwargs)}
+
+
+def garment(garment_id, available, supplier="Acme"):
+    return (garment_id, f"Garment {garment_id}", 1, supplier, available, 4.0)
+
+
+def dense_reference(sales, history_days, lead_time):
+    """Velocity and safety stock of one garment from its full day-by-day demand"""
+    demand = np.zeros(history_days)
+    for age, units in sales:
+        demand[history_days - 1 - age] += units
+    short = demand[-min(main.REPLENISH_SHORT_WINDOW, history_days):].sum() / min(main.REPLENISH_SHORT_WINDOW, history_days)
+    long = demand[-min(main.REPLENISH_LONG_WINDOW, history_days):].sum() / min(main.REPLENISH_LONG_WINDOW, history_days)
+    windows = [demand[i:i + lead_time].sum() for i in range(history_days - lead_time + 1)]
+    return max(short, long), main.REPLENISH_SERVICE_Z * np.std(windows)
+
+
+def test_steady_demand(monkeypatch):
+    # 2 units every day: velocity 2, no spread, reorder point 2 * lead time
+    sales = [(1, age, 2) for age in range(90)]
+    result = run(monkeypatch, [garment(1, 10)], sales, lead_time=7, review_days=14)
+    item = result[1]
+    assert item["velocity"] == pytest.approx(2.0)
+    assert item["reorder_point"] == pytest.approx(14.0)
+    assert item["quantity"] == math.ceil(14 + 2 * 14 - 10)
+
+
+def test_stock_above_reorder_point_is_not_suggested(monkeypatch):
+    sales = [(1, age, 2) for age in range(90)]
+    assert run(monkeypatch, [garment(1, 15)], sales, lead_time=7) == {}
+
+
+def test_no_sales_and_deleted_garments(monkeypatch):
+    # Garment 2 has no sales; garment 9 no longer exists
+    sales = [(1, 0, 5), (9, 0, 50)]
+    result = run(monkeypatch, [garment(1, 0), garment(2, 0)], sales)
+    assert set(result) == {1}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 10000])
+def test_matches_dense_reference(monkeypatch, chunk_size):
+    monkeypatch.setattr(main, "REPLENISH_CHUNK_SIZE", chunk_size)
+    rng = np.random.default_rng(7)
+    history_days, lead_time = 90, 7
+    per_garment = {}
+    for garment_id in (3, 5, 8, 13, 21):
+        days = rng.choice(history_days, size=rng.integers(1, 40), replace=False)
+        per_garment[garment_id] = [(int(age), int(rng.integers(1, 9))) for age in days]
+    # A demand spike in the last week only
+    per_garment[34] = [(age, 7) for age in range(7)]
+    sales = [(garment_id, age, units) for garment_id, rows in per_garment.items() for age, units in rows]
+
+    # Nothing available, so every garment sold within the long window is suggested
+    garments = [garment(garment_id, 0) for garment_id in sorted(per_garment)]
+    result = run(monkeypatch, garments, sales, history_days=history_days, lead_time=lead_time, review_days=14)
+
+    expected = {garment_id: dense_reference(rows, history_days, lead_time) for garment_id, rows in per_garment.items()}
+    assert set(result) == {garment_id for garment_id, (velocity, _) in expected.items() if velocity > 0}
+    for garment_id in result:
+        velocity, safety_stock = expected[garment_id]
+        assert result[garment_id]["velocity"] == pytest.approx(velocity)
+        assert result[garment_id]["reorder_point"] == pytest.approx(velocity * lead_time + safety_stock)
+        assert result[garment_id]["quantity"] == math.ceil(velocity * lead_time + safety_stock + velocity * 14)
+    # The spike wins over the 28-day average
+    assert result[34]["velocity"] == pytest.approx(7.0)
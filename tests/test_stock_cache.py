@@ -0,0 +1,177 @@
+"""StockCache invalidation and change sweeps against a small in-memory garments table"""
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+from main import STOCK_SYNC_OVERLAP, StockCache
+
+
+START = datetime(2026, 3, 1, 12, 0, 0)
+
+
+class FakeGarments:
+    """Committed garment rows and a server clock, answering the two queries StockCache runs"""
+
+    def __init__(self):
+        self.now = START
+        self.rows = {}  # id -> (quantity, reserved, last_updated)
+        self.queries = []
+
+    def commit(self, garment_id, quantity, reserved=0, stamped=None):
+        # last_updated is stamped when the UPDATE runs, which may be before the commit
+        self.rows[garment_id] = (quantity, reserved, stamped or self.now)
+
+    def select(self, query, params):
+        self.queries.append(query)
+        if "NOW()" in query:
+            return [(self.now,)]
+        if "last_updated >= %s" in query:
+            wanted = [gid for gid, row in self.rows.items() if row[2] >= params[0]]
+        else:
+            assert re.search(r"id IN \(", query)
+            wanted = [gid for gid in params if gid in self.rows]
+        return [(gid, *self.rows[gid]) for gid in sorted(wanted)]
+
+
+class FakeCursor:
+    def __init__(self, table):
+        self.table = table
+        self.result = []
+
+    def execute(self, query, params=()):
+        self.result = self.table.select(query, params)
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeGarments()
+
+    class FakeConnection:
+        def cursor(self):
+            return FakeCursor(table)
+
+    @contextmanager
+    def connection(timeout=None):
+        yield FakeConnection()
+
+    monkeypatch.setattr(main.db_pool, "connection", connection)
+    monkeypatch.setattr(main, "fetch_all", lambda query, params=(): table.select(query, params))
+    return table
+
+
+@pytest.fixture
+def cache():
+    # Sweeps are run by the tests; the background thread never gets to one
+    cache = StockCache(sync_interval=3600)
+    yield cache
+    cache.close()
+
+
+def test_reads_are_cached_and_do_not_sweep(table, cache):
+    table.commit(1, 10, 2)
+    level = cache.get(1)
+    assert (level.quantity, level.reserved, level.available) == (10, 2, 8)
+    assert cache.get(1) is level
+    assert cache.get(99) is None
+    assert not any("NOW()" in query for query in table.queries)
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_drops_entries(table, cache):
+    table.commit(1, 10)
+    cache.get(1)
+    table.commit(1, 7)
+    cache.invalidate([1])
+    assert cache.get(1).quantity == 7
+
+
+def test_sync_drops_entries_with_a_new_version(table, cache):
+    table.commit(1, 10)
+    table.commit(2, 5)
+    cache.sync()
+    cache.get_many([1, 2])
+
+    # Another process sells garment 1; garment 2 is untouched
+    table.now += timedelta(seconds=1)
+    table.commit(1, 9)
+    table.now += timedelta(seconds=1)
+    cache.sync()
+
+    assert cache.stats()["synced"] == 1
+    assert cache.get(1).quantity == 9
+    assert cache.get(2).quantity == 5
+    assert cache.stats()["hits"] == 1
+
+
+def test_sync_keeps_entries_whose_version_matches(table, cache):
+    table.commit(1, 10)
+    cache.get(1)
+    table.now += timedelta(seconds=1)
+    cache.sync()
+    assert cache.stats()["synced"] == 0
+    assert cache.stats()["size"] == 1
+
+
+def test_overlap_catches_a_write_that_commits_after_the_sweep(table, cache):
+    table.commit(1, 10)
+    cache.sync()
+    cache.get(1)
+
+    # A transaction stamps garment 1 now but only commits after the next sweep
+    stamped = table.now + timedelta(seconds=1)
+    table.now += timedelta(seconds=2)
+    cache.sync()
+    assert cache.get(1).quantity == 10
+
+    table.now += timedelta(seconds=1)
+    table.commit(1, 4, stamped=stamped)
+    table.now += timedelta(seconds=1)
+    cache.sync()
+    # Stamped before the previous sweep's watermark, yet still found
+    assert cache.get(1).quantity == 4
+
+
+def test_overlap_is_bounded(table, cache):
+    table.commit(1, 10)
+    cache.sync()
+    cache.get(1)
+    table.now += timedelta(seconds=STOCK_SYNC_OVERLAP * 3)
+    cache.sync()
+
+    # Committed with a stamp older than the overlap window: out of reach by design
+    table.commit(1, 3, stamped=table.now - timedelta(seconds=STOCK_SYNC_OVERLAP + 1))
+    table.now += timedelta(seconds=1)
+    cache.sync()
+    assert cache.get(1).quantity == 10
+
+
+def test_first_sweep_looks_back_over_earlier_loads(table, cache):
+    table.commit(1, 10)
+    cache.get(1)
+    table.commit(1, 6)
+    table.now += timedelta(seconds=1)
+    cache.sync()
+    assert cache.get(1).quantity == 6
+
+
+def test_load_overlapping_a_write_is_not_stored(table, cache, monkeypatch):
+    table.commit(1, 10)
+    select = table.select
+
+    def racing_select(query, params):
+        rows = select(query, params)
+        cache.invalidate([1])  # A local writer commits while the load is in flight
+        return rows
+
+    monkeypatch.setattr(main, "fetch_all", racing_select)
+    assert cache.get(1).quantity == 10
+    assert cache.stats()["size"] == 0